@@ -0,0 +1,34 @@
+"""create app_settings table
+
+Revision ID: 0b6d3e9f2a71
+Revises: f3b8a2d6c419
+Create Date: 2026-10-16 23:14:37.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6d3e9f2a71'
+down_revision: Union[str, None] = 'f3b8a2d6c419'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: key/value settings shared by every API and worker process."""
+    op.create_table(
+        'app_settings',
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('value', sa.String(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('app_settings')
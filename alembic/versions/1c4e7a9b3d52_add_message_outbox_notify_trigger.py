@@ -0,0 +1,45 @@
+"""notify the outbox publisher on message_outbox inserts
+
+Revision ID: 1c4e7a9b3d52
+Revises: 0b6d3e9f2a71
+Create Date: 2026-10-16 23:31:05.664120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c4e7a9b3d52'
+down_revision: Union[str, None] = '0b6d3e9f2a71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: pg_notify('message_outbox') once per inserting statement.
+
+    NOTIFY is transactional, so the publisher is woken only after the rows commit, and
+    a multi-row insert produces a single notification.
+    """
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_message_outbox() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('message_outbox', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER message_outbox_notify
+        AFTER INSERT ON message_outbox
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_message_outbox();
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS message_outbox_notify ON message_outbox")
+    op.execute("DROP FUNCTION IF EXISTS notify_message_outbox()")
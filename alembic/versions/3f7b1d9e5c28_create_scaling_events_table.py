@@ -0,0 +1,44 @@
+"""create scaling_events table
+
+Revision ID: 3f7b1d9e5c28
+Revises: 9d2f6c8a1e47
+Create Date: 2026-10-17 01:26:37.914205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f7b1d9e5c28'
+down_revision: Union[str, None] = '9d2f6c8a1e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: autoscaler decisions, one row per worker-count change."""
+    op.create_table(
+        'scaling_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('stage', sa.String(), nullable=False),
+        sa.Column('action', sa.String(), nullable=False),
+        sa.Column('from_workers', sa.Integer(), nullable=False),
+        sa.Column('to_workers', sa.Integer(), nullable=False),
+        sa.Column('queue_depth', sa.Integer(), nullable=False),
+        sa.Column('oldest_age_seconds', sa.Float(), nullable=True),
+        sa.Column('reason', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_scaling_events_id'), 'scaling_events', ['id'], unique=False)
+    op.create_index(op.f('ix_scaling_events_created_at'), 'scaling_events', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_scaling_events_created_at'), table_name='scaling_events')
+    op.drop_index(op.f('ix_scaling_events_id'), table_name='scaling_events')
+    op.drop_table('scaling_events')
@@ -0,0 +1,49 @@
+"""partial index on unsent outbox rows, sent_at index and message_outbox_archive
+
+Revision ID: 5e9a1f0c7b84
+Revises: 1c4e7a9b3d52
+Create Date: 2026-10-16 23:48:20.137552
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e9a1f0c7b84'
+down_revision: Union[str, None] = '1c4e7a9b3d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: outbox indexes for claims and retention, plus the archive table."""
+    op.create_index(
+        'ix_message_outbox_unsent',
+        'message_outbox',
+        ['id'],
+        unique=False,
+        postgresql_where=sa.text('sent_at IS NULL'),
+    )
+    op.create_index('ix_message_outbox_sent_at', 'message_outbox', ['sent_at'], unique=False)
+    op.create_table(
+        'message_outbox_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('exchange', sa.String(), nullable=False),
+        sa.Column('routing_key', sa.String(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('message_outbox_archive')
+    op.drop_index('ix_message_outbox_sent_at', table_name='message_outbox')
+    op.drop_index('ix_message_outbox_unsent', table_name='message_outbox')
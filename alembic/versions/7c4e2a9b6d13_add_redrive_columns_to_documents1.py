@@ -0,0 +1,42 @@
+"""add redrive_count and last_redriven_at to documents1
+
+Revision ID: 7c4e2a9b6d13
+Revises: 3f7b1d9e5c28
+Create Date: 2026-10-17 03:12:47.905216
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4e2a9b6d13'
+down_revision: Union[str, None] = '3f7b1d9e5c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: stuck-document sweeper bookkeeping."""
+    op.add_column(
+        'documents1',
+        sa.Column('redrive_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.add_column(
+        'documents1',
+        sa.Column('last_redriven_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    # The sweeper scans Pending documents by last activity
+    op.create_index(
+        'ix_documents1_pending_updated_at', 'documents1', ['updated_at'],
+        postgresql_where=sa.text("status = 'Pending'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents1_pending_updated_at', table_name='documents1')
+    op.drop_column('documents1', 'last_redriven_at')
+    op.drop_column('documents1', 'redrive_count')
@@ -0,0 +1,36 @@
+"""add priority_lane and processing_started_at to documents1
+
+Revision ID: 9d2f6c8a1e47
+Revises: 5e9a1f0c7b84
+Create Date: 2026-10-17 00:41:12.508361
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2f6c8a1e47'
+down_revision: Union[str, None] = '5e9a1f0c7b84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: ingestion priority lane and first-pickup time for lane latency."""
+    op.add_column(
+        'documents1',
+        sa.Column('priority_lane', sa.String(), nullable=False, server_default='webhook'),
+    )
+    op.add_column(
+        'documents1',
+        sa.Column('processing_started_at', sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents1', 'processing_started_at')
+    op.drop_column('documents1', 'priority_lane')
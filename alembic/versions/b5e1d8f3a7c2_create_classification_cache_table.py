@@ -0,0 +1,47 @@
+"""create classification_cache table
+
+Revision ID: b5e1d8f3a7c2
+Revises: 7c4e2a9b6d13
+Create Date: 2026-10-17 04:38:05.261847
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e1d8f3a7c2'
+down_revision: Union[str, None] = '7c4e2a9b6d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: persistent tier of the LLM classification cache."""
+    op.create_table(
+        'classification_cache',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('text_sha256', sa.String(length=64), nullable=False),
+        sa.Column('hierarchy_version', sa.String(), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=False),
+        sa.Column('latency_ms', sa.Float(), nullable=False),
+        sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_hit_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        'ix_classification_cache_text_sha256', 'classification_cache', ['text_sha256'], unique=True
+    )
+    # TTL eviction scans by age
+    op.create_index(
+        'ix_classification_cache_created_at', 'classification_cache', ['created_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_classification_cache_created_at', table_name='classification_cache')
+    op.drop_index('ix_classification_cache_text_sha256', table_name='classification_cache')
+    op.drop_table('classification_cache')
@@ -0,0 +1,28 @@
+"""add ocr_metadata to documents1
+
+Revision ID: b7e2d4c1a9f0
+Revises: a8c3b191b682
+Create Date: 2026-10-16 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d4c1a9f0'
+down_revision: Union[str, None] = 'a8c3b191b682'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: record how each page's text was extracted."""
+    op.add_column('documents1', sa.Column('ocr_metadata', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents1', 'ocr_metadata')
@@ -0,0 +1,49 @@
+"""create ocr_cache table
+
+Revision ID: c91f3a7e5d20
+Revises: b7e2d4c1a9f0
+Create Date: 2026-10-16 10:03:17.552913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c91f3a7e5d20'
+down_revision: Union[str, None] = 'b7e2d4c1a9f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: OCR results keyed by source content hash."""
+    op.create_table(
+        'ocr_cache',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('content_sha256', sa.String(length=64), nullable=False),
+        sa.Column('ocr_settings', sa.String(), nullable=False),
+        sa.Column('extracted_text', sa.Text(), nullable=False),
+        sa.Column('ocr_metadata', sa.JSON(), nullable=True),
+        sa.Column('byte_size', sa.BigInteger(), nullable=False),
+        sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_hit_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('ix_ocr_cache_content_sha256', 'ocr_cache', ['content_sha256'], unique=True)
+    # eviction scans by recency
+    op.create_index(
+        'ix_ocr_cache_last_used',
+        'ocr_cache',
+        [sa.text('COALESCE(last_hit_at, created_at)')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ocr_cache_last_used', table_name='ocr_cache')
+    op.drop_index('ix_ocr_cache_content_sha256', table_name='ocr_cache')
+    op.drop_table('ocr_cache')
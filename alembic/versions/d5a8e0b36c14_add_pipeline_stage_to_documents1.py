@@ -0,0 +1,28 @@
+"""add pipeline_stage to documents1
+
+Revision ID: d5a8e0b36c14
+Revises: c91f3a7e5d20
+Create Date: 2026-10-16 11:20:05.734118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a8e0b36c14'
+down_revision: Union[str, None] = 'c91f3a7e5d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: per-document pipeline checkpoint."""
+    op.add_column('documents1', sa.Column('pipeline_stage', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents1', 'pipeline_stage')
@@ -0,0 +1,30 @@
+"""add ocr_confidence and ocr_passes to documents1
+
+Revision ID: e2c7b9f41a63
+Revises: d5a8e0b36c14
+Create Date: 2026-10-16 12:41:52.209377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c7b9f41a63'
+down_revision: Union[str, None] = 'd5a8e0b36c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: per-document OCR confidence and pass count."""
+    op.add_column('documents1', sa.Column('ocr_confidence', sa.Float(), nullable=True))
+    op.add_column('documents1', sa.Column('ocr_passes', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents1', 'ocr_passes')
+    op.drop_column('documents1', 'ocr_confidence')
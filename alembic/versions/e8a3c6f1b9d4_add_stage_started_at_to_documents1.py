@@ -0,0 +1,31 @@
+"""add stage_started_at to documents1
+
+Revision ID: e8a3c6f1b9d4
+Revises: b5e1d8f3a7c2
+Create Date: 2026-10-17 09:14:52.630418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a3c6f1b9d4'
+down_revision: Union[str, None] = 'b5e1d8f3a7c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: worker pickup time of the current pipeline stage."""
+    op.add_column(
+        'documents1',
+        sa.Column('stage_started_at', sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents1', 'stage_started_at')
@@ -0,0 +1,28 @@
+"""add index on documents1.s3_key
+
+Revision ID: f3b8a2d6c419
+Revises: e2c7b9f41a63
+Create Date: 2026-10-16 23:02:11.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8a2d6c419'
+down_revision: Union[str, None] = 'e2c7b9f41a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: index s3_key for idempotent upload finalization."""
+    op.create_index('ix_documents1_s3_key', 'documents1', ['s3_key'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents1_s3_key', table_name='documents1')
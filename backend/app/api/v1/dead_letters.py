@@ -0,0 +1,142 @@
+# backend/app/api/v1/dead_letters.py
+
+import json
+import logging
+from typing import Any, List, Optional
+
+import pika
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+
+from app.rabbitmq import (
+    PIPELINE_QUEUES,
+    RETRY_COUNT_HEADER,
+    ChannelManager,
+    dead_letter_queue,
+)
+
+router = APIRouter(prefix="/api/v1/dlq", tags=["dlq"])
+logger = logging.getLogger("dead_letters")
+
+# Replayed messages are confirmed by the broker before the DLQ copy is acked
+_channels = ChannelManager(confirm=True)
+
+
+class DeadLetterQueue(BaseModel):
+    queue: str
+    dead_letter_queue: str
+    messages: int
+
+
+class DeadLetterMessage(BaseModel):
+    body: Any
+    retry_count: int
+    last_error: Optional[str] = None
+    failed_at: Optional[str] = None
+    headers: dict
+
+
+class ReplayRequest(BaseModel):
+    limit: Optional[int] = None  # None replays the whole DLQ
+
+
+class ReplayResult(BaseModel):
+    queue: str
+    replayed: int
+
+
+def _dlq_for(queue: str) -> str:
+    if queue not in PIPELINE_QUEUES:
+        raise HTTPException(status_code=404, detail=f"No dead-letter queue for '{queue}'")
+    _channels.declare(dead_letter_queue(queue))
+    return dead_letter_queue(queue)
+
+
+def _decode(body: bytes) -> Any:
+    try:
+        return json.loads(body)
+    except ValueError:
+        return body.decode("utf-8", errors="replace")
+
+
+@router.get("", response_model=List[DeadLetterQueue])
+def list_dead_letter_queues():
+    """
+    Message count of each pipeline stage's dead-letter queue.
+    """
+    result = []
+    for queue in PIPELINE_QUEUES:
+        dlq = _dlq_for(queue)
+        with _channels.locked_channel() as channel:
+            frame = channel.queue_declare(queue=dlq, passive=True)
+        result.append(DeadLetterQueue(
+            queue=queue, dead_letter_queue=dlq, messages=frame.method.message_count
+        ))
+    return result
+
+
+@router.get("/{queue}", response_model=List[DeadLetterMessage])
+def peek_dead_letters(queue: str, limit: int = Query(50, ge=1, le=500)):
+    """
+    Inspect up to *limit* messages at the head of *queue*'s DLQ without removing them
+    (they are fetched, then requeued in place).
+    """
+    dlq = _dlq_for(queue)
+    messages = []
+    with _channels.locked_channel() as channel:
+        last_tag = None
+        for _ in range(limit):
+            method, properties, body = channel.basic_get(queue=dlq, auto_ack=False)
+            if method is None:
+                break
+            last_tag = method.delivery_tag
+            headers = properties.headers or {}
+            messages.append(DeadLetterMessage(
+                body=_decode(body),
+                retry_count=int(headers.get(RETRY_COUNT_HEADER, 0)),
+                last_error=headers.get("x-last-error"),
+                failed_at=headers.get("x-failed-at"),
+                headers={k: v for k, v in headers.items() if isinstance(v, (str, int, float, bool))},
+            ))
+        if last_tag is not None:
+            channel.basic_nack(delivery_tag=last_tag, multiple=True, requeue=True)
+    return messages
+
+
+@router.post("/{queue}/replay", response_model=ReplayResult)
+def replay_dead_letters(queue: str, req: ReplayRequest = ReplayRequest()):
+    """
+    Move up to req.limit messages (default: all) from *queue*'s DLQ back onto *queue*
+    with a fresh retry budget. Each message is removed from the DLQ only after its
+    republish is confirmed. At most the messages in the DLQ when the request starts are
+    replayed, so ones that fail permanently again and land back in the DLQ aren't
+    fetched a second time.
+    """
+    dlq = _dlq_for(queue)
+    replayed = 0
+    with _channels.locked_channel() as channel:
+        depth = channel.queue_declare(queue=dlq, passive=True).method.message_count
+        budget = depth if req.limit is None else min(depth, req.limit)
+        while replayed < budget:
+            method, properties, body = channel.basic_get(queue=dlq, auto_ack=False)
+            if method is None:
+                break
+            headers = dict(properties.headers or {})
+            headers[RETRY_COUNT_HEADER] = 0
+            try:
+                channel.basic_publish(
+                    exchange="",
+                    routing_key=queue,
+                    body=body,
+                    properties=pika.BasicProperties(
+                        delivery_mode=2, content_type=properties.content_type, headers=headers
+                    ),
+                )
+            except Exception as e:
+                channel.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+                logger.exception("Replay from %s stopped after %d: %s", dlq, replayed, e)
+                raise HTTPException(status_code=502, detail=f"Replay failed after {replayed}: {e}")
+            channel.basic_ack(delivery_tag=method.delivery_tag)
+            replayed += 1
+    logger.info("Replayed %d message(s) from %s to %s", replayed, dlq, queue)
+    return ReplayResult(queue=queue, replayed=replayed)
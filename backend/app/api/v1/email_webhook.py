@@ -5,7 +5,7 @@ from pydantic import BaseModel
 import base64, uuid, logging
 
 from app.database import SessionLocal
-from app.models import Document1, MessageOutbox
+from app.ingestion import persist_document
 from app.config import AWS_S3_BUCKET, S3_INPUT_PREFIX
 from app.s3_client import s3_client
 from app.metadata_extractor import extract_metadata
@@ -46,7 +46,7 @@ def process_webhook_email(subject: str, body: str, attachments: list[AttachmentI
 
         # OCR
         try:
-            ocr_text = perform_ocr(s3_key)
+            ocr_text = perform_ocr(s3_key, inline=True)
         except Exception as e:
             logger.warning("OCR failed for %s: %s", att.filename, e)
             ocr_text = ""
@@ -62,42 +62,20 @@ def process_webhook_email(subject: str, body: str, attachments: list[AttachmentI
                 "claim_number": "XXXX"
             }
 
-        # Insert Document1
+        # Insert Document1 + outbox message (batch buffer in batch mode) together
         db = SessionLocal()
         try:
-            doc = Document1(
-                filename=att.filename,
-                s3_key=s3_key,
-                extracted_text=ocr_text,
-                status="Pending",
-                **meta
+            doc_id = persist_document(
+                db, att.filename, s3_key, extracted_text=ocr_text, priority_lane="webhook", **meta
             )
-            db.add(doc)
             db.commit()
-            db.refresh(doc)
-            created_ids.append(doc.id)
+            created_ids.append(doc_id)
         except Exception:
             db.rollback()
             logger.exception("DB insert failed for %s", att.filename)
         finally:
             db.close()
 
-        # Enqueue outbox
-        db2 = SessionLocal()
-        try:
-            out = MessageOutbox(
-                exchange="",
-                routing_key="document_queue",
-                payload={"document_id": doc.id, "s3_key": s3_key}
-            )
-            db2.add(out)
-            db2.commit()
-        except Exception:
-            db2.rollback()
-            logger.exception("Outbox enqueue failed for doc %s", doc.id)
-        finally:
-            db2.close()
-
     return created_ids
 
 @router.post("/email-webhook")
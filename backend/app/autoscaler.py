@@ -0,0 +1,268 @@
+# backend/app/autoscaler.py
+
+import math
+import signal
+import subprocess
+import sys
+import threading
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from .config import (
+    AUTOSCALE_OCR_MIN_WORKERS,
+    AUTOSCALE_OCR_MAX_WORKERS,
+    AUTOSCALE_CLASSIFY_MIN_WORKERS,
+    AUTOSCALE_CLASSIFY_MAX_WORKERS,
+    AUTOSCALE_ROUTE_MIN_WORKERS,
+    AUTOSCALE_ROUTE_MAX_WORKERS,
+    AUTOSCALE_BACKLOG_PER_WORKER,
+    AUTOSCALE_MAX_MESSAGE_AGE,
+    AUTOSCALE_INTERVAL,
+    AUTOSCALE_UP_COOLDOWN,
+    AUTOSCALE_DOWN_COOLDOWN,
+    AUTOSCALE_DRAIN_TIMEOUT,
+)
+from .database import SessionLocal
+from .models import Document1, ScalingEvent
+from .rabbitmq import (
+    CLASSIFY_QUEUE,
+    LANE_QUEUES,
+    RECOVERABLE_ERRORS,
+    ROUTE_QUEUE,
+    ChannelManager,
+)
+
+# ─────────────────────────────────── Setup Logging ─────────────────────────────────────────
+logger = logging.getLogger("autoscaler")
+logging.basicConfig(level=logging.INFO)
+
+# stage → (queues it consumes, min workers, max workers)
+STAGE_LIMITS = {
+    "ocr":      (LANE_QUEUES, AUTOSCALE_OCR_MIN_WORKERS, AUTOSCALE_OCR_MAX_WORKERS),
+    "classify": ([CLASSIFY_QUEUE], AUTOSCALE_CLASSIFY_MIN_WORKERS, AUTOSCALE_CLASSIFY_MAX_WORKERS),
+    "route":    ([ROUTE_QUEUE], AUTOSCALE_ROUTE_MIN_WORKERS, AUTOSCALE_ROUTE_MAX_WORKERS),
+}
+
+
+def queue_depth(channels: ChannelManager, queues: List[str]) -> int:
+    """
+    Ready messages across *queues*, via passive queue_declare (each queue is declared
+    once per connection first, so a queue no worker has created yet reads as empty).
+    """
+    total = 0
+    with channels.locked_channel() as channel:
+        for queue_name in queues:
+            channels.declare(queue_name)
+            total += channel.queue_declare(queue=queue_name, passive=True).method.message_count
+    return total
+
+
+def oldest_waiting_age(db, stage: str) -> Optional[float]:
+    """
+    Seconds the oldest document waiting for *stage* has waited, from the pipeline
+    checkpoints: not yet picked up by OCR, or checkpointed at the previous stage.
+    """
+    if stage == "ocr":
+        since = (
+            db.query(func.min(Document1.created_at))
+              .filter(Document1.status == "Pending", Document1.processing_started_at == None)
+        )
+    else:
+        previous = "ocr_done" if stage == "classify" else "classified"
+        since = (
+            db.query(func.min(Document1.updated_at))
+              .filter(Document1.status == "Pending", Document1.pipeline_stage == previous)
+        )
+    oldest = since.scalar()
+    if oldest is None:
+        return None
+    now = db.query(func.now()).scalar()
+    return max((now - oldest).total_seconds(), 0.0)
+
+
+def desired_workers(depth: int, oldest_age: Optional[float], current: int,
+                    min_workers: int, max_workers: int) -> Tuple[int, str]:
+    """
+    Workers needed for *depth* ready messages at AUTOSCALE_BACKLOG_PER_WORKER each,
+    plus one while messages are waiting and the oldest is older than
+    AUTOSCALE_MAX_MESSAGE_AGE (consumers lagging with a modest backlog). Clamped to
+    [min_workers, max_workers]; returns (workers, reason).
+    """
+    desired = math.ceil(depth / max(AUTOSCALE_BACKLOG_PER_WORKER, 1))
+    reason = f"{depth} ready message(s)"
+    if depth and oldest_age is not None and oldest_age > AUTOSCALE_MAX_MESSAGE_AGE \
+            and desired <= current:
+        desired = current + 1
+        reason = f"{depth} ready message(s), oldest waiting {oldest_age:.0f}s"
+    return max(min_workers, min(max_workers, desired)), reason
+
+
+class StagePool:
+    """
+    Worker processes (python -m app.ocr_worker --stage <stage>) for one stage.
+    Scale-down sends SIGTERM to the newest worker, which drains its in-flight
+    documents; one still running after AUTOSCALE_DRAIN_TIMEOUT is killed.
+    """
+
+    def __init__(self, stage: str, min_workers: int, max_workers: int):
+        self.stage = stage
+        self.min_workers = min_workers
+        self.max_workers = max(max_workers, min_workers)
+        self.procs: List[subprocess.Popen] = []
+        self.draining: Dict[subprocess.Popen, float] = {}
+        self.last_scaled = float("-inf")
+
+    def reap(self) -> int:
+        """
+        Forget exited workers; returns how many running (not draining) ones died.
+        """
+        alive = [p for p in self.procs if p.poll() is None]
+        died = len(self.procs) - len(alive)
+        self.procs = alive
+        now = time.monotonic()
+        for p, since in list(self.draining.items()):
+            if p.poll() is not None:
+                del self.draining[p]
+            elif now - since > AUTOSCALE_DRAIN_TIMEOUT:
+                logger.warning("[%s] worker pid=%s did not drain in time; killing", self.stage, p.pid)
+                p.kill()
+        return died
+
+    def start_one(self) -> None:
+        proc = subprocess.Popen(
+            [sys.executable, "-u", "-m", "app.ocr_worker", "--stage", self.stage]
+        )
+        self.procs.append(proc)
+        logger.info("[%s] started worker pid=%s", self.stage, proc.pid)
+
+    def stop_one(self) -> None:
+        proc = self.procs.pop()
+        proc.send_signal(signal.SIGTERM)
+        self.draining[proc] = time.monotonic()
+        logger.info("[%s] draining worker pid=%s", self.stage, proc.pid)
+
+    def stop_all(self) -> None:
+        while self.procs:
+            self.stop_one()
+        deadline = time.monotonic() + AUTOSCALE_DRAIN_TIMEOUT
+        for proc in list(self.draining):
+            try:
+                proc.wait(timeout=max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        self.draining.clear()
+
+
+def record_event(stage: str, action: str, from_workers: int, to_workers: int,
+                 depth: int, oldest_age: Optional[float], reason: str) -> None:
+    logger.info(
+        "[%s] scale %s %d -> %d (%s)", stage, action, from_workers, to_workers, reason
+    )
+    db = SessionLocal()
+    try:
+        db.add(ScalingEvent(
+            stage=stage, action=action, from_workers=from_workers, to_workers=to_workers,
+            queue_depth=depth, oldest_age_seconds=oldest_age, reason=reason,
+        ))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.exception("Could not record scaling event: %s", e)
+    finally:
+        db.close()
+
+
+def scale_stage(pool: StagePool, depth: int, oldest_age: Optional[float]) -> None:
+    """
+    One scaling decision for *pool*. Replacing dead workers below the minimum ignores
+    cooldowns; scaling up jumps straight to the desired count, scaling down removes one
+    worker at a time.
+    """
+    died = pool.reap()
+    current = len(pool.procs)
+    if current < pool.min_workers:
+        for _ in range(pool.min_workers - current):
+            pool.start_one()
+        record_event(
+            pool.stage, "replace" if died else "up", current, pool.min_workers, depth,
+            oldest_age, f"{died} worker(s) exited" if died else "minimum workers",
+        )
+        pool.last_scaled = time.monotonic()
+        return
+
+    desired, reason = desired_workers(
+        depth, oldest_age, current, pool.min_workers, pool.max_workers
+    )
+    since = time.monotonic() - pool.last_scaled
+    if desired > current and since >= AUTOSCALE_UP_COOLDOWN:
+        for _ in range(desired - current):
+            pool.start_one()
+        record_event(pool.stage, "up", current, desired, depth, oldest_age, reason)
+        pool.last_scaled = time.monotonic()
+    elif desired < current and since >= AUTOSCALE_DOWN_COOLDOWN:
+        pool.stop_one()
+        record_event(pool.stage, "down", current, current - 1, depth, oldest_age, reason)
+        pool.last_scaled = time.monotonic()
+
+
+def run_autoscaler(stages: Optional[List[str]] = None) -> None:
+    """
+    Supervise worker processes for *stages* (default: all), re-evaluating every
+    AUTOSCALE_INTERVAL seconds until SIGTERM/SIGINT, then drain every worker.
+    """
+    pools = [
+        StagePool(stage, min_w, max_w)
+        for stage, (_, min_w, max_w) in STAGE_LIMITS.items()
+        if not stages or stage in stages
+    ]
+    channels = ChannelManager()
+    stopping = threading.Event()
+
+    def _shutdown(signum, frame):
+        logger.info("Signal %s: stopping workers", signum)
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+
+    logger.info("Autoscaler started for stage(s) %s", [p.stage for p in pools])
+    try:
+        while not stopping.is_set():
+            for pool in pools:
+                try:
+                    depth = queue_depth(channels, STAGE_LIMITS[pool.stage][0])
+                except RECOVERABLE_ERRORS as e:
+                    logger.warning("[%s] could not read queue depth: %s", pool.stage, e)
+                    channels.close()
+                    depth = 0
+                db = SessionLocal()
+                try:
+                    oldest_age = oldest_waiting_age(db, pool.stage)
+                except Exception as e:
+                    logger.exception("[%s] could not read message age: %s", pool.stage, e)
+                    oldest_age = None
+                finally:
+                    db.close()
+                scale_stage(pool, depth, oldest_age)
+            stopping.wait(AUTOSCALE_INTERVAL)
+    finally:
+        for pool in pools:
+            pool.stop_all()
+        channels.close()
+        logger.info("Autoscaler stopped")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Queue-driven pipeline worker autoscaler")
+    parser.add_argument(
+        "--stage",
+        action="append",
+        choices=list(STAGE_LIMITS),
+        help="stage to supervise (repeatable; default: all)",
+    )
+    run_autoscaler(parser.parse_args().stage)
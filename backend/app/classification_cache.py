@@ -0,0 +1,250 @@
+# backend/app/classification_cache.py
+
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import Integer, String, cast, text, update
+from sqlalchemy.exc import IntegrityError
+
+from .config import (
+    CLASSIFY_CACHE_ENABLED,
+    CLASSIFY_CACHE_TTL_DAYS,
+    CLASSIFY_CACHE_LRU_SIZE,
+    CLASSIFY_CACHE_FLUSH_INTERVAL,
+    HIERARCHY_VERSION_CACHE_TTL,
+)
+from .database import SessionLocal
+from .models import AppSetting, ClassificationCache
+
+logger = logging.getLogger("classification_cache")
+
+# app_settings key bumped by every doc_hierarchy edit
+_VERSION_KEY = "doc_hierarchy_version"
+_version_cache = {"value": None, "read_at": 0.0}
+
+# In-process tier: (text digest, hierarchy fingerprint) → (result, latency_ms, expires_at)
+_lru: "OrderedDict[Tuple[str, str], Tuple[dict, float, float]]" = OrderedDict()
+_lock = threading.Lock()
+# In-process counters (per worker process); persistent hit counts live on the rows and
+# are flushed from _pending_hits every CLASSIFY_CACHE_FLUSH_INTERVAL seconds
+_stats = {"lru_hits": 0, "db_hits": 0, "misses": 0, "saved_ms": 0.0}
+_pending_hits: Counter = Counter()
+_last_flush = time.monotonic()
+
+
+def text_digest(extracted_text: str) -> str:
+    """
+    Digest of the text with case and whitespace normalized, so re-OCRs of the same
+    template that differ only in line breaks or spacing share an entry.
+    """
+    normalized = " ".join(extracted_text.split()).lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def hierarchy_fingerprint(hierarchy_prompt: str) -> str:
+    return hashlib.sha256(hierarchy_prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def hierarchy_version(db) -> str:
+    """
+    Current doc_hierarchy version from app_settings, cached for
+    HIERARCHY_VERSION_CACHE_TTL seconds.
+    """
+    now = time.monotonic()
+    if _version_cache["value"] is None or now - _version_cache["read_at"] >= HIERARCHY_VERSION_CACHE_TTL:
+        row = db.get(AppSetting, _VERSION_KEY)
+        _version_cache["value"] = row.value if row else "0"
+        _version_cache["read_at"] = now
+    return _version_cache["value"]
+
+
+def bump_hierarchy_version(db) -> None:
+    """
+    Record a doc_hierarchy change so every classifier reloads the hierarchy (and stops
+    matching cache entries produced with the old one); the caller commits.
+    """
+    bumped = db.execute(
+        update(AppSetting)
+        .where(AppSetting.key == _VERSION_KEY)
+        .values(value=cast(cast(AppSetting.value, Integer) + 1, String))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not bumped:
+        db.add(AppSetting(key=_VERSION_KEY, value="1"))
+    _version_cache["value"] = None
+
+
+def cache_stats() -> dict:
+    """
+    Hit/miss counters and LLM time saved for this process since start-up.
+    """
+    with _lock:
+        stats = dict(_stats)
+    lookups = stats["lru_hits"] + stats["db_hits"] + stats["misses"]
+    hits = stats["lru_hits"] + stats["db_hits"]
+    stats["hit_rate"] = round(hits / lookups * 100.0, 1) if lookups else 0.0
+    stats["saved_ms"] = round(stats["saved_ms"], 1)
+    return stats
+
+
+def _record(outcome: str, key: Optional[Tuple[str, str]] = None, latency_ms: float = 0.0) -> None:
+    with _lock:
+        _stats[outcome] += 1
+        _stats["saved_ms"] += latency_ms
+        if key is not None:
+            _pending_hits[key] += 1
+        lookups = _stats["lru_hits"] + _stats["db_hits"] + _stats["misses"]
+    if lookups % 100 == 0:
+        logger.info("Classification cache stats: %s", cache_stats())
+
+
+def _remember(key: Tuple[str, str], result: dict, latency_ms: float, expires_at: float) -> None:
+    with _lock:
+        _lru[key] = (result, latency_ms, expires_at)
+        _lru.move_to_end(key)
+        while len(_lru) > CLASSIFY_CACHE_LRU_SIZE:
+            _lru.popitem(last=False)
+
+
+def lookup(digest: str, fingerprint: str) -> Optional[dict]:
+    """
+    Cached classification of the text with *digest* under the hierarchy *fingerprint*,
+    from this process's LRU or else the classification_cache table; None on a miss.
+    """
+    if not CLASSIFY_CACHE_ENABLED:
+        return None
+    key = (digest, fingerprint)
+    with _lock:
+        entry = _lru.get(key)
+        if entry is not None and entry[2] <= time.time():
+            del _lru[key]
+            entry = None
+        if entry is not None:
+            _lru.move_to_end(key)
+    if entry is not None:
+        _record("lru_hits", key, entry[1])
+        _maybe_flush()
+        return dict(entry[0])
+
+    db = SessionLocal()
+    try:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=CLASSIFY_CACHE_TTL_DAYS)
+        row = (
+            db.query(ClassificationCache)
+              .filter(
+                  ClassificationCache.text_sha256 == digest,
+                  ClassificationCache.hierarchy_version == fingerprint,
+                  ClassificationCache.created_at >= cutoff,
+              )
+              .first()
+        )
+        if row is None:
+            _record("misses")
+            return None
+        expires_at = row.created_at.timestamp() + CLASSIFY_CACHE_TTL_DAYS * 86400
+        result = dict(row.result)
+        _remember(key, result, row.latency_ms, expires_at)
+        _record("db_hits", key, row.latency_ms)
+        logger.info("Classification cache hit for %s", digest[:12])
+        return dict(result)
+    except Exception as e:
+        logger.exception("Classification cache lookup failed: %s", e)
+        return None
+    finally:
+        db.close()
+        _maybe_flush()
+
+
+def store(digest: str, fingerprint: str, result: dict, latency_ms: float) -> None:
+    """
+    Cache an LLM classification. An entry for the same text from another hierarchy is
+    replaced; a concurrent insert by another worker is ignored. Empty (failed)
+    classifications are not cached.
+    """
+    if not CLASSIFY_CACHE_ENABLED or not result:
+        return
+    _remember(
+        (digest, fingerprint), dict(result), latency_ms,
+        time.time() + CLASSIFY_CACHE_TTL_DAYS * 86400,
+    )
+    db = SessionLocal()
+    try:
+        row = db.query(ClassificationCache).filter(ClassificationCache.text_sha256 == digest).first()
+        if row is None:
+            row = ClassificationCache(text_sha256=digest)
+            db.add(row)
+        if row.hierarchy_version != fingerprint:
+            row.hit_count = 0
+        row.hierarchy_version = fingerprint
+        row.result            = result
+        row.latency_ms        = latency_ms
+        row.created_at        = datetime.now(timezone.utc)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        logger.debug("Classification cache entry for %s already stored by another worker", digest[:12])
+    except Exception as e:
+        db.rollback()
+        logger.exception("Classification cache store failed: %s", e)
+    finally:
+        db.close()
+
+
+def flush(db) -> int:
+    """
+    Persist hit counts gathered since the last flush and delete entries older than
+    CLASSIFY_CACHE_TTL_DAYS. Returns the number of rows removed.
+    """
+    with _lock:
+        hits = dict(_pending_hits)
+        _pending_hits.clear()
+    try:
+        if hits:
+            db.execute(
+                text("""
+                    UPDATE classification_cache
+                    SET hit_count = hit_count + :hits, last_hit_at = :now
+                    WHERE text_sha256 = :digest AND hierarchy_version = :fingerprint
+                """),
+                [
+                    {"digest": digest, "fingerprint": fingerprint, "hits": n,
+                     "now": datetime.now(timezone.utc)}
+                    for (digest, fingerprint), n in hits.items()
+                ],
+            )
+        cutoff = datetime.now(timezone.utc) - timedelta(days=CLASSIFY_CACHE_TTL_DAYS)
+        removed = db.execute(
+            text("DELETE FROM classification_cache WHERE created_at < :cutoff"),
+            {"cutoff": cutoff},
+        ).rowcount
+        db.commit()
+    except Exception:
+        # keep the counts for the next flush
+        with _lock:
+            _pending_hits.update(hits)
+        raise
+    return removed
+
+
+def _maybe_flush() -> None:
+    global _last_flush
+    now = time.monotonic()
+    with _lock:
+        if now - _last_flush < CLASSIFY_CACHE_FLUSH_INTERVAL:
+            return
+        _last_flush = now
+    db = SessionLocal()
+    try:
+        removed = flush(db)
+        if removed:
+            logger.info("Evicted %d expired classification cache entries", removed)
+    except Exception as e:
+        db.rollback()
+        logger.exception("Classification cache flush failed: %s", e)
+    finally:
+        db.close()
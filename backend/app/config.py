@@ -11,10 +11,71 @@ load_dotenv(dotenv_path=env_path)
 # Database & messaging
 DATABASE_URL   = os.getenv("DATABASE_URL")
 RABBITMQ_URL   = os.getenv("RABBITMQ_URL")
+# AMQP heartbeat (seconds) negotiated with the broker; dead connections are detected
+# after ~2 missed heartbeats and reopened with backoff capped at RABBITMQ_RECONNECT_MAX_DELAY
+RABBITMQ_HEARTBEAT           = int(os.getenv("RABBITMQ_HEARTBEAT", "60"))
+RABBITMQ_RECONNECT_MAX_DELAY = float(os.getenv("RABBITMQ_RECONNECT_MAX_DELAY", "30"))
+# A failed pipeline message is retried through delay queues after
+# MESSAGE_RETRY_BASE_DELAY, 2x, 4x... seconds; after MESSAGE_MAX_ATTEMPTS attempts (or a
+# PermanentError) it moves to the stage's "<queue>.dlq" dead-letter queue
+MESSAGE_MAX_ATTEMPTS     = int(os.getenv("MESSAGE_MAX_ATTEMPTS", "5"))
+MESSAGE_RETRY_BASE_DELAY = int(os.getenv("MESSAGE_RETRY_BASE_DELAY", "10"))
+# OCR priority lanes (ui > webhook > backfill > reprocess): a buffered lower-lane message
+# gains one lane of priority per LANE_AGING_SECONDS waited, so bulk lanes never starve
+LANE_AGING_SECONDS = float(os.getenv("LANE_AGING_SECONDS", "30"))
 
 # Outbox publisher settings
-# Interval (in seconds) at which the outbox_publisher polls for unsent messages
+# The publisher wakes on Postgres NOTIFY from the message_outbox insert trigger; it also
+# sweeps every OUTBOX_SWEEP_INTERVAL seconds as a safety net for missed notifications
+OUTBOX_SWEEP_INTERVAL = int(os.getenv("OUTBOX_SWEEP_INTERVAL", "30"))
+# Polling interval (in seconds) used only when LISTEN is unavailable
 OUTBOX_POLL_INTERVAL = int(os.getenv("OUTBOX_POLL_INTERVAL", "5"))
+# Rows each publisher claims (FOR UPDATE SKIP LOCKED) and marks sent per commit; several
+# publisher replicas can run side by side
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+# "pipelined" publishes a whole claimed batch before waiting and matches publisher confirms
+# by delivery tag; "blocking" waits for each confirm in turn. Rows not confirmed within
+# OUTBOX_CONFIRM_TIMEOUT seconds (or nacked) stay unsent and are retried
+OUTBOX_PUBLISHER_MODE  = os.getenv("OUTBOX_PUBLISHER_MODE", "pipelined")
+OUTBOX_CONFIRM_TIMEOUT = float(os.getenv("OUTBOX_CONFIRM_TIMEOUT", "30"))
+# Retention: sent rows older than OUTBOX_RETENTION_DAYS are moved to message_outbox_archive
+# ("archive") or dropped ("delete"), OUTBOX_RETENTION_CHUNK rows per transaction, at most
+# every OUTBOX_RETENTION_INTERVAL seconds by the publisher
+OUTBOX_RETENTION_MODE     = os.getenv("OUTBOX_RETENTION_MODE", "archive")
+OUTBOX_RETENTION_DAYS     = int(os.getenv("OUTBOX_RETENTION_DAYS", "7"))
+OUTBOX_RETENTION_CHUNK    = int(os.getenv("OUTBOX_RETENTION_CHUNK", "5000"))
+OUTBOX_RETENTION_INTERVAL = int(os.getenv("OUTBOX_RETENTION_INTERVAL", "3600"))
+# Stuck-document sweeper: Pending documents with no progress for STUCK_DOCUMENT_AFTER
+# seconds (doubling after each re-drive) are re-enqueued at their current stage, up to
+# SWEEPER_MAX_REDRIVES times before they are failed; runs every SWEEPER_INTERVAL seconds
+# in the outbox publisher, SWEEPER_BATCH_SIZE documents per transaction
+STUCK_DOCUMENT_AFTER = int(os.getenv("STUCK_DOCUMENT_AFTER", "1800"))
+SWEEPER_MAX_REDRIVES = int(os.getenv("SWEEPER_MAX_REDRIVES", "5"))
+SWEEPER_INTERVAL     = int(os.getenv("SWEEPER_INTERVAL", "300"))
+SWEEPER_BATCH_SIZE   = int(os.getenv("SWEEPER_BATCH_SIZE", "500"))
+
+# Ingestion mode ("realtime" or "batch") is stored in app_settings; INGESTION_MODE is only
+# the default before it is first set. Processes re-read it at most every INGESTION_MODE_CACHE_TTL s
+INGESTION_MODE           = os.getenv("INGESTION_MODE", "realtime")
+INGESTION_MODE_CACHE_TTL = int(os.getenv("INGESTION_MODE_CACHE_TTL", "5"))
+# Batch mode: buffered documents are flushed to document_queue once INGEST_BATCH_SIZE are
+# waiting or the oldest has waited INGEST_BATCH_MAX_WAIT seconds
+INGEST_BATCH_SIZE     = int(os.getenv("INGEST_BATCH_SIZE", "50"))
+INGEST_BATCH_MAX_WAIT = int(os.getenv("INGEST_BATCH_MAX_WAIT", "60"))
+# Documents per batched LLM classification call, and the text budget per document in it
+CLASSIFY_BATCH_SIZE       = int(os.getenv("CLASSIFY_BATCH_SIZE", "10"))
+CLASSIFY_BATCH_TEXT_CHARS = int(os.getenv("CLASSIFY_BATCH_TEXT_CHARS", "4000"))
+# Classification cache: LLM results keyed by normalized extracted text and the hierarchy
+# they were produced with; CLASSIFY_CACHE_LRU_SIZE entries per process in front of the
+# classification_cache table, whose entries expire after CLASSIFY_CACHE_TTL_DAYS. Hit counts
+# are flushed (and expired rows deleted) every CLASSIFY_CACHE_FLUSH_INTERVAL seconds
+CLASSIFY_CACHE_ENABLED        = os.getenv("CLASSIFY_CACHE_ENABLED", "true").lower() == "true"
+CLASSIFY_CACHE_TTL_DAYS       = int(os.getenv("CLASSIFY_CACHE_TTL_DAYS", "7"))
+CLASSIFY_CACHE_LRU_SIZE       = int(os.getenv("CLASSIFY_CACHE_LRU_SIZE", "1000"))
+CLASSIFY_CACHE_FLUSH_INTERVAL = int(os.getenv("CLASSIFY_CACHE_FLUSH_INTERVAL", "60"))
+# Hierarchy edits bump a version in app_settings; classifiers re-check it at most every
+# HIERARCHY_VERSION_CACHE_TTL seconds and reload the hierarchy when it changed
+HIERARCHY_VERSION_CACHE_TTL   = int(os.getenv("HIERARCHY_VERSION_CACHE_TTL", "10"))
 
 # AWS S3 configuration (replacing MinIO)
 AWS_ACCESS_KEY_ID     = os.getenv("AWS_ACCESS_KEY_ID")
@@ -26,9 +87,77 @@ AWS_S3_BUCKET         = os.getenv("AWS_S3_BUCKET")
 S3_INPUT_PREFIX  = os.getenv("S3_INPUT_PREFIX", "input/documents")
 S3_OUTPUT_PREFIX = os.getenv("S3_OUTPUT_PREFIX", "output")
 
+# Streaming uploads: request bodies are forwarded to S3 as multipart parts of this size
+# (S3 minimum 5 MiB); at most two parts per upload are held in memory
+UPLOAD_PART_SIZE = max(int(os.getenv("UPLOAD_PART_SIZE", str(8 * 1024 * 1024))), 5 * 1024 * 1024)
+# /upload/batch: files uploaded to S3 in parallel, and the most files accepted per request
+UPLOAD_BATCH_CONCURRENCY = int(os.getenv("UPLOAD_BATCH_CONCURRENCY", "8"))
+UPLOAD_BATCH_MAX_FILES   = int(os.getenv("UPLOAD_BATCH_MAX_FILES", "500"))
+
+# OCR result cache (keyed by SHA-256 of the source bytes)
+OCR_CACHE_ENABLED        = os.getenv("OCR_CACHE_ENABLED", "true").lower() == "true"
+# Entries not hit for this many days are evicted
+OCR_CACHE_MAX_AGE_DAYS   = int(os.getenv("OCR_CACHE_MAX_AGE_DAYS", "30"))
+# Hard cap on cached entries; least recently used beyond this are evicted
+OCR_CACHE_MAX_ENTRIES    = int(os.getenv("OCR_CACHE_MAX_ENTRIES", "50000"))
+# Minimum seconds between eviction passes in a worker process
+OCR_CACHE_EVICT_INTERVAL = int(os.getenv("OCR_CACHE_EVICT_INTERVAL", "600"))
+
+# Pipeline workers: documents processed concurrently per worker process for each
+# stage (also that stage's RabbitMQ prefetch window)
+OCR_WORKER_CONCURRENCY      = int(os.getenv("OCR_WORKER_CONCURRENCY", "4"))
+CLASSIFY_WORKER_CONCURRENCY = int(os.getenv("CLASSIFY_WORKER_CONCURRENCY", "8"))
+ROUTE_WORKER_CONCURRENCY    = int(os.getenv("ROUTE_WORKER_CONCURRENCY", "4"))
+
+# Autoscaler (python -m app.autoscaler): worker processes per stage between MIN and MAX,
+# sized so each has at most AUTOSCALE_BACKLOG_PER_WORKER ready messages; one more is
+# added while the oldest waiting document is older than AUTOSCALE_MAX_MESSAGE_AGE seconds
+AUTOSCALE_OCR_MIN_WORKERS      = int(os.getenv("AUTOSCALE_OCR_MIN_WORKERS", "1"))
+AUTOSCALE_OCR_MAX_WORKERS      = int(os.getenv("AUTOSCALE_OCR_MAX_WORKERS", "4"))
+AUTOSCALE_CLASSIFY_MIN_WORKERS = int(os.getenv("AUTOSCALE_CLASSIFY_MIN_WORKERS", "1"))
+AUTOSCALE_CLASSIFY_MAX_WORKERS = int(os.getenv("AUTOSCALE_CLASSIFY_MAX_WORKERS", "4"))
+AUTOSCALE_ROUTE_MIN_WORKERS    = int(os.getenv("AUTOSCALE_ROUTE_MIN_WORKERS", "1"))
+AUTOSCALE_ROUTE_MAX_WORKERS    = int(os.getenv("AUTOSCALE_ROUTE_MAX_WORKERS", "2"))
+AUTOSCALE_BACKLOG_PER_WORKER   = int(os.getenv("AUTOSCALE_BACKLOG_PER_WORKER", "20"))
+AUTOSCALE_MAX_MESSAGE_AGE      = float(os.getenv("AUTOSCALE_MAX_MESSAGE_AGE", "60"))
+AUTOSCALE_INTERVAL             = float(os.getenv("AUTOSCALE_INTERVAL", "10"))
+# Minimum seconds after any scaling action before scaling up / down again
+AUTOSCALE_UP_COOLDOWN          = float(os.getenv("AUTOSCALE_UP_COOLDOWN", "30"))
+AUTOSCALE_DOWN_COOLDOWN        = float(os.getenv("AUTOSCALE_DOWN_COOLDOWN", "120"))
+# Seconds a SIGTERMed worker gets to finish in-flight documents before it is killed
+AUTOSCALE_DRAIN_TIMEOUT        = float(os.getenv("AUTOSCALE_DRAIN_TIMEOUT", "300"))
+
 # OpenAI & OCR
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 TESSERACT_CMD  = os.getenv("TESSERACT_CMD")
+# OCR engine: "tesserocr" keeps libtesseract + language models loaded per process,
+# "pytesseract" runs the tesseract binary per call, "auto" prefers tesserocr
+OCR_BACKEND     = os.getenv("OCR_BACKEND", "auto")
+OCR_LANG        = os.getenv("OCR_LANG", "eng")
+TESSDATA_PREFIX = os.getenv("TESSDATA_PREFIX")
+
+# OCR page selection & parallelism
+# Which pages of a multi-page document get OCR'd: "first", "first_n", "all" or "first_last"
+OCR_PAGE_POLICY = os.getenv("OCR_PAGE_POLICY", "first_n")
+# Page budget for the "first_n" policy
+OCR_MAX_PAGES   = int(os.getenv("OCR_MAX_PAGES", "5"))
+# Worker processes rendering + OCR'ing pages; peak memory scales with this, not page count.
+# Only pipeline OCR workers start the pool; the API and email worker OCR inline
+OCR_POOL_SIZE   = int(os.getenv("OCR_POOL_SIZE", str(os.cpu_count() or 2)))
+# Rasterization resolution for PDF pages
+OCR_PDF_DPI     = int(os.getenv("OCR_PDF_DPI", "200"))
+# Adaptive resolution: first pass downsamples images to OCR_TARGET_DPI; pages whose mean
+# word confidence is below OCR_MIN_CONFIDENCE are retried at OCR_RETRY_DPI with deskew/denoise
+OCR_TARGET_DPI     = int(os.getenv("OCR_TARGET_DPI", "200"))
+OCR_RETRY_DPI      = int(os.getenv("OCR_RETRY_DPI", "300"))
+OCR_MIN_CONFIDENCE = float(os.getenv("OCR_MIN_CONFIDENCE", "60"))
+OCR_MAX_PASSES     = int(os.getenv("OCR_MAX_PASSES", "2"))
+# Source objects are streamed to a temp file (in OCR_SPOOL_DIR, default system temp)
+# rather than held in memory; larger objects than this fail the document cleanly
+OCR_MAX_OBJECT_BYTES = int(os.getenv("OCR_MAX_OBJECT_BYTES", str(500 * 1024 * 1024)))
+OCR_SPOOL_DIR        = os.getenv("OCR_SPOOL_DIR") or None
+# Minimum alphanumeric characters for a PDF page's embedded text layer to be used instead of OCR
+OCR_TEXT_LAYER_MIN_CHARS = int(os.getenv("OCR_TEXT_LAYER_MIN_CHARS", "25"))
 
 # Email (Resend) settings
 RESEND_API_KEY    = os.getenv("RESEND_API_KEY")
@@ -36,6 +165,8 @@ RESEND_FROM_EMAIL = os.getenv("RESEND_FROM_EMAIL", "no-reply@yourdomain.com")
 
 # Presigned URL TTL (in seconds; used for private S3 object access)
 PRESIGNED_URL_EXPIRES_IN = int(os.getenv("PRESIGNED_URL_EXPIRES_IN", "3600"))
+# TTL (in seconds) of presigned direct-to-S3 upload URLs from /upload/presign
+PRESIGNED_UPLOAD_EXPIRES_IN = int(os.getenv("PRESIGNED_UPLOAD_EXPIRES_IN", "900"))
 
 #Microsoft Graph API settings
 AZURE_TENANT_ID = os.getenv("AZURE_TENANT_ID")
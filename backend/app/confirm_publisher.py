@@ -0,0 +1,223 @@
+# backend/app/confirm_publisher.py
+
+import logging
+import threading
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import pika
+from pika.spec import Basic
+
+from .rabbitmq import ChannelManager, QUEUE_ARGUMENTS, connection_parameters
+
+logger = logging.getLogger("confirm_publisher")
+
+# (key, exchange, routing_key, body); key identifies the publication in the results
+Publication = Tuple[Hashable, str, str, str]
+
+_PERSISTENT = pika.BasicProperties(delivery_mode=2)
+
+
+class BlockingPublisher:
+    """
+    One synchronous broker round trip per message: BlockingChannel.basic_publish
+    waits for each publisher confirm before returning.
+    """
+
+    def __init__(self):
+        self.manager = ChannelManager(confirm=True)
+        for queue_name in QUEUE_ARGUMENTS:
+            self.manager.declare(queue_name)
+
+    @property
+    def is_open(self) -> bool:
+        return self.manager.is_open
+
+    def publish_batch(self, publications: List[Publication]) -> Dict[Hashable, Optional[str]]:
+        """
+        Publish each message and return {key: None if confirmed, else the error}.
+        """
+        results: Dict[Hashable, Optional[str]] = {}
+        for key, exchange, routing_key, body in publications:
+            try:
+                self.manager.publish(routing_key, body, exchange=exchange, properties=_PERSISTENT)
+                results[key] = None
+            except Exception as e:
+                results[key] = str(e) or type(e).__name__
+        return results
+
+    def close(self) -> None:
+        self.manager.close()
+
+
+class _Batch:
+    def __init__(self, size: int):
+        self.results: Dict[Hashable, Optional[str]] = {}
+        self.remaining = size
+        self.done = threading.Event()
+
+    def resolve(self, key: Hashable, error: Optional[str]) -> None:
+        if key in self.results:
+            return
+        self.results[key] = error
+        self.remaining -= 1
+        if self.remaining <= 0:
+            self.done.set()
+
+
+class ConfirmPublisher:
+    """
+    Pipelined publisher confirms. A pika SelectConnection runs its ioloop on a
+    background thread; publish_batch hands a whole batch to that loop, which publishes
+    it without waiting, and confirms (Basic.Ack / Basic.Nack, possibly "multiple") are
+    matched back to publications by delivery tag. A batch therefore costs roughly one
+    broker round trip instead of one per message.
+    """
+
+    def __init__(self, confirm_timeout: float = 30.0):
+        self.params = connection_parameters()
+        self.confirm_timeout = confirm_timeout
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._connection = None
+        self._channel = None
+        self._open_error: Optional[str] = None
+        self._next_tag = 0
+        self._pending: Dict[int, Tuple[Hashable, _Batch]] = {}
+        self._thread = threading.Thread(target=self._run, name="confirm-publisher", daemon=True)
+
+    # ─── lifecycle (caller thread) ───
+    def start(self, timeout: float = 30.0) -> "ConfirmPublisher":
+        self._thread.start()
+        if not self._ready.wait(timeout) or self._channel is None:
+            self.close()
+            raise RuntimeError(f"Could not open publisher channel: {self._open_error or 'timeout'}")
+        logger.info("Pipelined confirm publisher ready")
+        return self
+
+    @property
+    def is_open(self) -> bool:
+        return self._channel is not None and self._channel.is_open
+
+    def close(self) -> None:
+        conn = self._connection
+        if conn is not None:
+            try:
+                conn.ioloop.add_callback_threadsafe(self._shutdown)
+            except Exception:
+                pass
+        self._thread.join(timeout=10)
+
+    def publish_batch(self, publications: List[Publication]) -> Dict[Hashable, Optional[str]]:
+        """
+        Publish every message with one pass through the ioloop and wait (up to
+        confirm_timeout) for their confirms. Returns {key: None if acked, else the
+        reason: nack, timeout or channel failure}.
+        """
+        if not publications:
+            return {}
+        if not self.is_open:
+            return {key: "publisher channel is closed" for key, *_ in publications}
+
+        batch = _Batch(len(publications))
+        self._connection.ioloop.add_callback_threadsafe(
+            lambda: self._publish_all(publications, batch)
+        )
+        if not batch.done.wait(self.confirm_timeout):
+            with self._lock:
+                for tag, (key, owner) in list(self._pending.items()):
+                    if owner is batch:
+                        del self._pending[tag]
+                for key, *_ in publications:
+                    batch.resolve(key, f"no confirm within {self.confirm_timeout:g}s")
+        return batch.results
+
+    # ─── ioloop thread ───
+    def _run(self) -> None:
+        self._connection = pika.SelectConnection(
+            self.params,
+            on_open_callback=self._on_connection_open,
+            on_open_error_callback=self._on_connection_open_error,
+            on_close_callback=self._on_connection_closed,
+        )
+        self._connection.ioloop.start()
+
+    def _on_connection_open(self, connection) -> None:
+        connection.channel(on_open_callback=self._on_channel_open)
+
+    def _on_connection_open_error(self, connection, error) -> None:
+        self._open_error = str(error)
+        self._ready.set()
+        connection.ioloop.stop()
+
+    def _on_connection_closed(self, connection, reason) -> None:
+        logger.warning("Publisher connection closed: %s", reason)
+        self._fail_pending(f"connection closed: {reason}")
+        self._channel = None
+        self._ready.set()
+        connection.ioloop.stop()
+
+    def _on_channel_open(self, channel) -> None:
+        channel.add_on_close_callback(self._on_channel_closed)
+        channel.confirm_delivery(self._on_confirm)
+        # Declare the pipeline queues before reporting ready; confirms start at tag 1
+        # with the first basic_publish, so declarations don't shift delivery tags
+        remaining = set(QUEUE_ARGUMENTS)
+
+        def on_declared(frame, queue_name):
+            remaining.discard(queue_name)
+            if not remaining:
+                self._channel = channel
+                self._ready.set()
+
+        for queue_name, arguments in QUEUE_ARGUMENTS.items():
+            channel.queue_declare(
+                queue=queue_name,
+                durable=True,
+                arguments=arguments or None,
+                callback=lambda frame, q=queue_name: on_declared(frame, q),
+            )
+
+    def _on_channel_closed(self, channel, reason) -> None:
+        logger.warning("Publisher channel closed: %s", reason)
+        self._fail_pending(f"channel closed: {reason}")
+        if self._connection.is_open:
+            self._connection.close()
+
+    def _shutdown(self) -> None:
+        if self._connection.is_open:
+            self._connection.close()
+        else:
+            self._connection.ioloop.stop()
+
+    def _publish_all(self, publications: List[Publication], batch: _Batch) -> None:
+        for key, exchange, routing_key, body in publications:
+            try:
+                self._channel.basic_publish(
+                    exchange=exchange, routing_key=routing_key, body=body, properties=_PERSISTENT
+                )
+            except Exception as e:
+                with self._lock:
+                    batch.resolve(key, str(e) or type(e).__name__)
+                continue
+            # Delivery tags count every publish on the channel, starting at 1
+            with self._lock:
+                self._next_tag += 1
+                self._pending[self._next_tag] = (key, batch)
+
+    def _on_confirm(self, frame) -> None:
+        method = frame.method
+        error = None if isinstance(method, Basic.Ack) else "nacked by broker"
+        with self._lock:
+            if method.multiple:
+                tags = [t for t in self._pending if t <= method.delivery_tag]
+            else:
+                tags = [method.delivery_tag] if method.delivery_tag in self._pending else []
+            for tag in tags:
+                key, batch = self._pending.pop(tag)
+                batch.resolve(key, error)
+
+    def _fail_pending(self, reason: str) -> None:
+        with self._lock:
+            for key, batch in self._pending.values():
+                batch.resolve(key, reason)
+            self._pending.clear()
@@ -0,0 +1,240 @@
+# backend/app/consumer.py
+
+import datetime
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Sequence, Union
+
+import pika
+
+from .config import MESSAGE_MAX_ATTEMPTS, LANE_AGING_SECONDS
+from .rabbitmq import (
+    QUEUE_ARGUMENTS,
+    RECOVERABLE_ERRORS,
+    RETRY_COUNT_HEADER,
+    connect_with_backoff,
+    dead_letter_queue,
+    declare_queue,
+    queue_family,
+    retry_queue,
+)
+
+logger = logging.getLogger("consumer")
+
+
+class PermanentError(Exception):
+    """
+    Raised by a handler when retrying cannot help (unreadable source, missing object);
+    the message goes straight to the dead-letter queue.
+    """
+
+
+class PooledConsumer:
+    """
+    Consumes *queue_name* with up to *concurrency* messages in flight.
+
+    *queue_name* may also be a list of priority lanes, highest first. Each lane gets
+    its own consumer (and prefetch window); deliveries are buffered on the connection
+    thread and a free handler slot always takes the buffered message with the best
+    effective priority: lane rank minus seconds waited / *aging_seconds*. Higher lanes
+    drain first, but a lower-lane message that has waited long enough still wins.
+
+    pika's BlockingConnection is not thread-safe, so the connection thread only
+    receives deliveries and hands them to a thread pool; each handler runs on a pool
+    thread and its ack/nack is marshalled back onto the connection thread via
+    ``add_callback_threadsafe``. The prefetch window matches the pool size so the
+    broker never pushes more messages than there are threads to run them.
+
+    *handler(body)* returning normally acks the message. If it raises, the message is
+    republished to a delay queue with its x-retry-count header incremented, and comes
+    back after an exponentially growing delay; after MESSAGE_MAX_ATTEMPTS attempts, or
+    on PermanentError, it is moved to "<queue>.dlq" and *on_dead_letter(body, error)* is
+    called. The copy is confirmed by the broker before the original is acked; if that
+    publish fails the original is nacked with requeue instead. Queues without registered
+    retry tiers (see rabbitmq.register_retry_queues) are simply nacked with requeue.
+
+    If the connection drops (heartbeat timeout, broker restart), it is reopened with
+    backoff and consumption resumes; unacked deliveries are redelivered by the broker.
+    """
+
+    def __init__(self, queue_name: Union[str, Sequence[str]], handler: Callable[[bytes], None],
+                 concurrency: int = 1,
+                 on_dead_letter: Optional[Callable[[bytes, str], None]] = None,
+                 aging_seconds: float = LANE_AGING_SECONDS):
+        self.queues = [queue_name] if isinstance(queue_name, str) else list(queue_name)
+        self.queue_name = self.queues[0]
+        self.handler = handler
+        self.on_dead_letter = on_dead_letter
+        self.concurrency = max(concurrency, 1)
+        self.aging_seconds = max(aging_seconds, 0.001)
+        self._conn = None
+        self._channel = None
+        self._pool = None
+        # (lane rank, arrival, delivery_tag, queue, properties, body); connection thread only
+        self._buffer = []
+        self._in_flight = 0
+        self._stopping = threading.Event()
+
+    def _dispatch(self) -> None:
+        # Runs on the connection thread; nothing new starts once stopping or shutting down
+        if self._stopping.is_set() or self._pool is None:
+            return
+        now = time.monotonic()
+        while self._in_flight < self.concurrency and self._buffer:
+            best = min(
+                range(len(self._buffer)),
+                key=lambda i: self._buffer[i][0] - (now - self._buffer[i][1]) / self.aging_seconds,
+            )
+            _, _, delivery_tag, queue, properties, body = self._buffer.pop(best)
+            self._in_flight += 1
+            self._pool.submit(self._work, delivery_tag, queue, properties, body)
+
+    def _settle(self, *args) -> None:
+        # Runs on the connection thread; frees the handler slot for the next delivery
+        self._in_flight -= 1
+        try:
+            self._finish(*args)
+        finally:
+            self._dispatch()
+
+    def _finish(self, delivery_tag: int, ok: bool, properties=None, body: bytes = b"",
+                queue: Optional[str] = None, target: Optional[str] = None,
+                error: str = "") -> None:
+        if not self._channel or not self._channel.is_open:
+            logger.warning("Channel closed before settling delivery_tag=%s", delivery_tag)
+            return
+        if ok:
+            self._channel.basic_ack(delivery_tag=delivery_tag)
+            return
+        if target is None:
+            # Queue without registered retry tiers: plain redelivery
+            self._channel.basic_nack(delivery_tag=delivery_tag, requeue=True)
+            return
+        headers = dict(properties.headers or {}) if properties else {}
+        headers[RETRY_COUNT_HEADER] = int(headers.get(RETRY_COUNT_HEADER, 0)) + 1
+        headers["x-original-queue"] = queue
+        headers["x-last-error"] = error[:1000]
+        headers["x-failed-at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        try:
+            self._channel.basic_publish(
+                exchange="",
+                routing_key=target,
+                body=body,
+                properties=pika.BasicProperties(
+                    delivery_mode=2,
+                    content_type=properties.content_type if properties else None,
+                    headers=headers,
+                ),
+            )
+        except Exception as e:
+            logger.exception("Could not move delivery_tag=%s to %s: %s", delivery_tag, target, e)
+            self._channel.basic_nack(delivery_tag=delivery_tag, requeue=True)
+            return
+        self._channel.basic_ack(delivery_tag=delivery_tag)
+
+    def _work(self, delivery_tag: int, queue: str, properties, body: bytes) -> None:
+        # Runs on a pool thread
+        settle = functools.partial(self._settle, delivery_tag, True)
+        try:
+            self.handler(body)
+        except Exception as e:
+            if dead_letter_queue(queue) not in QUEUE_ARGUMENTS:
+                logger.exception("Handler failed on %s: %s", queue, e)
+                self._conn.add_callback_threadsafe(
+                    functools.partial(self._settle, delivery_tag, False)
+                )
+                return
+            error = f"{type(e).__name__}: {e}"
+            attempts = int((properties.headers or {}).get(RETRY_COUNT_HEADER, 0)) + 1
+            if isinstance(e, PermanentError) or attempts >= MESSAGE_MAX_ATTEMPTS:
+                target = dead_letter_queue(queue)
+                logger.exception(
+                    "Handler failed on %s (attempt %d); dead-lettering: %s",
+                    queue, attempts, e,
+                )
+                if self.on_dead_letter:
+                    try:
+                        self.on_dead_letter(body, error)
+                    except Exception:
+                        logger.exception("on_dead_letter hook failed on %s", queue)
+            else:
+                target = retry_queue(queue, attempts)
+                logger.exception(
+                    "Handler failed on %s (attempt %d/%d); retrying via %s: %s",
+                    queue, attempts, MESSAGE_MAX_ATTEMPTS, target, e,
+                )
+            settle = functools.partial(
+                self._settle, delivery_tag, False, properties, body, queue, target, error
+            )
+        self._conn.add_callback_threadsafe(settle)
+
+    def run(self) -> None:
+        """
+        Block consuming until :meth:`stop` is called, reconnecting whenever the
+        connection drops.
+        """
+        while not self._stopping.is_set():
+            self._conn = connect_with_backoff(self._stopping)
+            if self._conn is None:
+                break
+            try:
+                self._consume()
+            except RECOVERABLE_ERRORS as e:
+                if self._stopping.is_set():
+                    break
+                logger.warning("Lost connection consuming %s (%s); reconnecting", self.queue_name, e)
+
+    def _consume(self) -> None:
+        self._channel = self._conn.channel()
+        # Confirms make the retry/DLQ copy durable before the original is acked
+        self._channel.confirm_delivery()
+        for queue in self.queues:
+            for name in queue_family(queue):
+                declare_queue(self._channel, name)
+        # Per-consumer prefetch: each lane can have a handler pool's worth buffered
+        self._channel.basic_qos(prefetch_count=self.concurrency)
+
+        self._buffer = []
+        self._in_flight = 0
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.concurrency,
+            thread_name_prefix=f"{self.queue_name}-worker",
+        )
+
+        for rank, queue in enumerate(self.queues):
+            def on_message(ch, method, properties, body, rank=rank, queue=queue):
+                self._buffer.append(
+                    (rank, time.monotonic(), method.delivery_tag, queue, properties, body)
+                )
+                self._dispatch()
+
+            self._channel.basic_consume(queue=queue, on_message_callback=on_message)
+        logger.info(
+            "Consuming %s with %d concurrent handler(s)", ", ".join(self.queues), self.concurrency
+        )
+        try:
+            self._channel.start_consuming()
+        finally:
+            pool, self._pool = self._pool, None
+            pool.shutdown(wait=True)
+            if self._conn.is_open:
+                # flush acks queued by handlers that finished during shutdown
+                self._conn.process_data_events(time_limit=0)
+                # deliveries still buffered never started; hand them back to the broker
+                if self._channel.is_open:
+                    for _, _, delivery_tag, _, _, _ in self._buffer:
+                        self._channel.basic_nack(delivery_tag=delivery_tag, requeue=True)
+                self._buffer = []
+                self._conn.close()
+
+    def stop(self) -> None:
+        """
+        Thread-safe request to stop consuming; in-flight handlers are allowed to finish,
+        and buffered deliveries that haven't started are requeued.
+        """
+        self._stopping.set()
+        if self._conn and self._conn.is_open:
+            self._conn.add_callback_threadsafe(self._channel.stop_consuming)
@@ -16,7 +16,8 @@ from .database import SessionLocal
 from . import models
 from .config import AWS_REGION, AWS_S3_BUCKET, S3_INPUT_PREFIX, OPENAI_API_KEY
 from .metadata_extractor import extract_metadata  # unified extractor with synonyms
-from .ocr_worker import perform_ocr  # reuse OCR logic (first page only)
+from .ocr_worker import perform_ocr  # reuse OCR logic (policy-selected pages)
+from .ingestion import persist_document
 
 # ─────────────────────────────────── Configuration & Clients ─────────────────────────────────
 logger = logging.getLogger("email_worker")
@@ -131,7 +132,7 @@ def process_message(msg: email.message.Message):
 
         # 1) Perform OCR on first page for metadata extraction
         try:
-            ocr_text = perform_ocr(s3_key)
+            ocr_text = perform_ocr(s3_key, inline=True)
             logger.info("OCR output length for %s: %d chars", s3_key, len(ocr_text))
         except Exception as e:
             logger.exception("OCR failed for %s: %s", s3_key, e)
@@ -140,20 +141,14 @@ def process_message(msg: email.message.Message):
         # 2) Extract metadata from OCR text and email content
         metadata = extract_metadata(subj, body, ocr_text)
 
-        # Persist Document1
+        # Persist Document1 + outbox message (batch buffer in batch mode) together
         db: Session = SessionLocal()
         try:
-            doc = models.Document1(
-                filename=fname,
-                s3_key=s3_key,
-                extracted_text=text_data,
-                status="Pending",
-                **metadata
+            doc_id = persist_document(
+                db, fname, s3_key, extracted_text=text_data, priority_lane="backfill", **metadata
             )
-            db.add(doc)
             db.commit()
-            db.refresh(doc)
-            logger.info("Created Document1 record id=%s", doc.id)
+            logger.info("Created Document1 record id=%s with outbox message", doc_id)
         except Exception as e:
             db.rollback()
             logger.exception("DB insert failed: %s", e)
@@ -161,23 +156,6 @@ def process_message(msg: email.message.Message):
         finally:
             db.close()
 
-        # Insert into outbox
-        db_out: Session = SessionLocal()
-        try:
-            out = models.MessageOutbox(
-                exchange="",
-                routing_key="document_queue",
-                payload={"doc_id": doc.id, "s3_key": s3_key}
-            )
-            db_out.add(out)
-            db_out.commit()
-            logger.info("Enqueued message_outbox id=%s", out.id)
-        except Exception as e:
-            db_out.rollback()
-            logger.exception("Failed to write to outbox: %s", e)
-        finally:
-            db_out.close()
-
 # ─────────────────────────────────── Main polling loop ──────────────────────────────────────
 def main():
     try:
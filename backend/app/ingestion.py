@@ -0,0 +1,174 @@
+# backend/app/ingestion.py
+
+import os
+import time
+import uuid
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from .config import S3_INPUT_PREFIX, INGESTION_MODE, INGESTION_MODE_CACHE_TTL
+from .models import AppSetting, Document1, MessageOutbox
+from .rabbitmq import DEFAULT_LANE, INGEST_BATCH_ROUTING_KEY, lane_queue
+
+logger = logging.getLogger("ingestion")
+
+INGESTION_MODES = ("realtime", "batch")
+_MODE_KEY = "ingestion_mode"
+_mode_cache = {"value": None, "read_at": 0.0}
+
+# Metadata columns are filled in by the classify stage; until then they hold placeholders
+PLACEHOLDER_METADATA = {
+    "account_number": "XXXX",
+    "policyholder_name": "XXXX",
+    "policy_number": "XXXX",
+    "claim_number": "XXXX",
+}
+
+
+def get_ingestion_mode(db: Session) -> str:
+    """
+    Current ingestion mode from app_settings, cached for INGESTION_MODE_CACHE_TTL seconds
+    so hot ingestion paths don't read it on every document.
+    """
+    now = time.monotonic()
+    if _mode_cache["value"] is None or now - _mode_cache["read_at"] >= INGESTION_MODE_CACHE_TTL:
+        row = db.get(AppSetting, _MODE_KEY)
+        _mode_cache["value"] = row.value if row else INGESTION_MODE
+        _mode_cache["read_at"] = now
+    return _mode_cache["value"]
+
+
+def set_ingestion_mode(db: Session, mode: str) -> None:
+    """
+    Persist *mode* for every API and worker process; the caller commits.
+    """
+    if mode not in INGESTION_MODES:
+        raise ValueError(f"Invalid ingestion mode: {mode}")
+    row = db.get(AppSetting, _MODE_KEY)
+    if row:
+        row.value = mode
+    else:
+        db.add(AppSetting(key=_MODE_KEY, value=mode))
+    _mode_cache["value"] = mode
+    _mode_cache["read_at"] = time.monotonic()
+
+
+def new_input_key(filename: str) -> str:
+    """
+    Unique S3 key for a newly ingested file under S3_INPUT_PREFIX.
+    """
+    return f"{S3_INPUT_PREFIX.rstrip('/')}/{uuid.uuid4()}_{filename}"
+
+
+def filename_from_input_key(s3_key: str) -> Optional[str]:
+    """
+    Inverse of new_input_key; None if *s3_key* is not a key it could have produced.
+    """
+    prefix = f"{S3_INPUT_PREFIX.rstrip('/')}/"
+    if not s3_key.startswith(prefix):
+        return None
+    name = s3_key[len(prefix):]
+    file_id, sep, filename = name.partition("_")
+    if not sep or not filename or "/" in name:
+        return None
+    try:
+        uuid.UUID(file_id)
+    except ValueError:
+        return None
+    return filename
+
+
+def safe_filename(filename: str) -> str:
+    """
+    Client-supplied name reduced to a single path component.
+    """
+    return os.path.basename(filename.replace("\\", "/")) or "upload"
+
+
+def persist_documents(db: Session, docs: List[Dict]) -> List[int]:
+    """
+    Insert one Document1 row per dict in *docs* (filename, s3_key, optional status /
+    error_message / priority_lane / metadata), plus an outbox message for each Pending
+    document: straight to its lane's queue in realtime mode, or to the batch buffer in
+    batch mode. Uses one
+    multi-row INSERT per table inside the caller's transaction; the caller commits.
+    Returns the new document ids in input order.
+    """
+    if not docs:
+        return []
+
+    rows = []
+    for d in docs:
+        row = {
+            **PLACEHOLDER_METADATA,
+            "status": "Pending",
+            "error_message": None,
+            "extracted_text": None,
+            "priority_lane": DEFAULT_LANE,
+        }
+        row.update(d)
+        rows.append(row)
+    # executemany needs every row to bind the same columns
+    columns = set().union(*rows)
+    rows = [{c: row.get(c) for c in columns} for row in rows]
+
+    ids = db.execute(
+        insert(Document1).returning(Document1.id, sort_by_parameter_order=True),
+        rows,
+    ).scalars().all()
+
+    batch_mode = get_ingestion_mode(db) == "batch"
+    messages = [
+        {
+            "exchange": "",
+            "routing_key": (
+                INGEST_BATCH_ROUTING_KEY if batch_mode else lane_queue(row["priority_lane"])
+            ),
+            "payload": {"doc_id": doc_id, "s3_key": row["s3_key"], "lane": row["priority_lane"]},
+        }
+        for doc_id, row in zip(ids, rows)
+        if row["status"] == "Pending"
+    ]
+    if messages:
+        db.execute(insert(MessageOutbox), messages)
+    return list(ids)
+
+
+def persist_document(db: Session, filename: str, s3_key: str,
+                     status: str = "Pending", error_message: Optional[str] = None,
+                     **columns) -> int:
+    """
+    Single-document form of persist_documents.
+    """
+    return persist_documents(db, [{
+        "filename": filename,
+        "s3_key": s3_key,
+        "status": status,
+        "error_message": error_message,
+        **columns,
+    }])[0]
+
+
+def finalize_document(db: Session, s3_key: str, filename: str,
+                      priority_lane: str = DEFAULT_LANE) -> Tuple[int, bool]:
+    """
+    Idempotently create the Pending document (and outbox message) for an object that was
+    uploaded straight to S3. Concurrent calls for the same key are serialized with a
+    transaction-scoped advisory lock, so retries return the existing document instead of
+    creating a duplicate. Returns (document id, created); the caller commits.
+    """
+    if db.bind.dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": s3_key})
+
+    existing = (
+        db.query(Document1.id)
+          .filter(Document1.s3_key == s3_key)
+          .order_by(Document1.id)
+          .first()
+    )
+    if existing:
+        return existing.id, False
+    return persist_document(db, filename, s3_key, priority_lane=priority_lane), True
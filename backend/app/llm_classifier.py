@@ -1,9 +1,11 @@
 import json
 import logging
 import time
+from typing import Dict, List
 
 import openai
-from .config import OPENAI_API_KEY
+from . import classification_cache
+from .config import OPENAI_API_KEY, CLASSIFY_BATCH_SIZE, CLASSIFY_BATCH_TEXT_CHARS
 from .database import SessionLocal
 from .models import DocHierarchy
 
@@ -14,22 +16,28 @@ openai.api_key = OPENAI_API_KEY
 _CACHE_TTL = 600  # seconds
 _last_refresh = 0.0
 _hierarchy_prompt = ""
+_hierarchy_version = None      # app_settings version the prompt was loaded at
+_hierarchy_fingerprint = ""    # classification cache key component for the prompt
 
 def _refresh_hierarchy_cache():
     """
-    Refresh the in-memory hierarchy prompt from the DocHierarchy table every *_CACHE_TTL* seconds.
+    Refresh the in-memory hierarchy prompt from the DocHierarchy table when the hierarchy
+    version changes (doc_hierarchy edits bump it), and at least every *_CACHE_TTL* seconds.
     """
-    global _last_refresh, _hierarchy_prompt
-    if time.time() - _last_refresh < _CACHE_TTL:
-        return
+    global _last_refresh, _hierarchy_prompt, _hierarchy_version, _hierarchy_fingerprint
     db = SessionLocal()
     try:
+        version = classification_cache.hierarchy_version(db)
+        if version == _hierarchy_version and time.time() - _last_refresh < _CACHE_TTL:
+            return
         rows = db.query(DocHierarchy).all()
         triples = sorted({(r.department, r.category, r.subcategory) for r in rows})
         lines = [f"- Department: {dep} | Category: {cat} | Sub-category: {sub}" for dep, cat, sub in triples]
         _hierarchy_prompt = "\n".join(lines)
+        _hierarchy_fingerprint = classification_cache.hierarchy_fingerprint(_hierarchy_prompt)
+        _hierarchy_version = version
         _last_refresh = time.time()
-        logger.info("Hierarchy cache refreshed with %d triples", len(triples))
+        logger.info("Hierarchy cache refreshed with %d triples (version %s)", len(triples), version)
     finally:
         db.close()
 
@@ -37,8 +45,22 @@ def classify_document(extracted_text: str) -> dict:
     """
     Calls the LLM to classify a document according to the DocHierarchy and extracts a summary and action items.
     Returns a dict with keys: department, category, subcategory, summary, action_items.
+    Texts already classified under the current hierarchy are served from the classification cache.
     """
     _refresh_hierarchy_cache()
+    digest = classification_cache.text_digest(extracted_text)
+    cached = classification_cache.lookup(digest, _hierarchy_fingerprint)
+    if cached is not None:
+        return cached
+    started = time.monotonic()
+    result = _classify_one(extracted_text)
+    classification_cache.store(
+        digest, _hierarchy_fingerprint, result, (time.monotonic() - started) * 1000.0
+    )
+    return result
+
+
+def _classify_one(extracted_text: str) -> dict:
     prompt = f"""
 You are an insurance-document classifier. ONLY use the exact department/category/sub-category combos below.
 
@@ -72,3 +94,99 @@ Document Text:
     except Exception as e:
         logger.exception("LLM classification failure: %s", e)
         return {}
+
+
+def _classify_chunk(texts: List[str]) -> List[dict]:
+    """
+    One LLM call for several documents. Any document the response doesn't account for
+    is classified on its own.
+    """
+    documents = "\n\n".join(
+        f"### Document {n}\n{text[:CLASSIFY_BATCH_TEXT_CHARS]}"
+        for n, text in enumerate(texts, 1)
+    )
+    prompt = f"""
+You are an insurance-document classifier. ONLY use the exact department/category/sub-category combos below.
+
+Hierarchy (do NOT invent new names):
+{_hierarchy_prompt}
+
+Classify each of the {len(texts)} documents below independently. Return ONLY a JSON object:
+{{
+  "documents": [
+    {{
+      "document": 1,
+      "department": "...",
+      "category": "...",
+      "subcategory": "...",
+      "summary": "single paragraph; clauses separated by semicolons.",
+      "action_items": ["First item", "Second item", …]
+    }},
+    …
+  ]
+}}
+
+{documents}
+"""
+    by_number = {}
+    try:
+        response = openai.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "Return ONLY the JSON object. No markdown."},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.0,
+        )
+        raw = response.choices[0].message.content.strip()
+        logger.debug("LLM raw batch output: %s", raw)
+        for item in json.loads(raw).get("documents", []):
+            if isinstance(item, dict) and isinstance(item.get("document"), int):
+                by_number[item.pop("document")] = item
+    except Exception as e:
+        logger.exception("Batched LLM classification failure: %s", e)
+
+    results = []
+    for n, text in enumerate(texts, 1):
+        if n in by_number:
+            results.append(by_number[n])
+        else:
+            logger.warning("Batch response missing document %d of %d; classifying alone", n, len(texts))
+            results.append(_classify_one(text))
+    return results
+
+
+def classify_documents(texts: List[str]) -> List[dict]:
+    """
+    Batched classify_document: texts found in the classification cache are served from
+    it, and the distinct remaining texts are sent CLASSIFY_BATCH_SIZE per LLM call (each
+    truncated to CLASSIFY_BATCH_TEXT_CHARS). Returns one result dict per text, in order.
+    """
+    _refresh_hierarchy_cache()
+    fingerprint = _hierarchy_fingerprint
+    digests = [classification_cache.text_digest(text) for text in texts]
+    by_digest: Dict[str, dict] = {}
+    missing: Dict[str, str] = {}
+    for digest, text in zip(digests, texts):
+        if digest in by_digest or digest in missing:
+            continue
+        cached = classification_cache.lookup(digest, fingerprint)
+        if cached is not None:
+            by_digest[digest] = cached
+        else:
+            missing[digest] = text
+
+    pending = list(missing.items())
+    for i in range(0, len(pending), CLASSIFY_BATCH_SIZE):
+        chunk = pending[i:i + CLASSIFY_BATCH_SIZE]
+        started = time.monotonic()
+        if len(chunk) == 1:
+            results = [_classify_one(chunk[0][1])]
+        else:
+            results = _classify_chunk([text for _, text in chunk])
+        # A batched call's latency is shared by its documents
+        latency_ms = (time.monotonic() - started) * 1000.0 / len(chunk)
+        for (digest, _), result in zip(chunk, results):
+            by_digest[digest] = result
+            classification_cache.store(digest, fingerprint, result, latency_ms)
+    return [dict(by_digest[digest]) for digest in digests]
@@ -1,15 +1,18 @@
 # backend/app/main.py
 
-import os
-import uuid
 import json
+import asyncio
 import logging
+from typing import List
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Body, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, UploadFile, File, HTTPException, Depends, Body, WebSocket, WebSocketDisconnect
 from fastapi.responses import RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from sqlalchemy import text
 
@@ -28,15 +31,33 @@ from .api.v1.accounts import router as accounts_v1_router
 from .api.v1.policies import router as policies_v1_router
 from .api.v1.claims import router as claims_v1_router
 from .api.v1.email_webhook import router as webhook_router
+from .api.v1.dead_letters import router as dead_letters_router
 from .s3_client import s3_client
+from .streaming_upload import stream_upload_to_s3, UploadStreamError
+from .ingestion import (
+    new_input_key,
+    safe_filename,
+    filename_from_input_key,
+    persist_document,
+    persist_documents,
+    finalize_document,
+    get_ingestion_mode,
+    set_ingestion_mode,
+    INGESTION_MODES,
+)
+from .schemas import PresignUploadRequest, FinalizeUploadRequest
 
 from .destination_service import process_document_destination
 from .config import (
     AWS_REGION,
     AWS_S3_BUCKET,
-    S3_INPUT_PREFIX,
+    UPLOAD_PART_SIZE,
+    UPLOAD_BATCH_CONCURRENCY,
+    UPLOAD_BATCH_MAX_FILES,
     OUTBOX_POLL_INTERVAL,
     PRESIGNED_URL_EXPIRES_IN,
+    PRESIGNED_UPLOAD_EXPIRES_IN,
+    OCR_MAX_OBJECT_BYTES,
 )
 from .ws_manager import manager  # ← import the WebSocket ConnectionManager
 
@@ -56,9 +77,6 @@ if not AWS_S3_BUCKET:
 #    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
 #)
 
-# simple in-memory toggle
-_ingestion_mode = os.getenv("INGESTION_MODE", "realtime")
-
 # ───────────────────────────────────────── DB dep ───────────────────────────────────────────
 def get_db():
     db = database.SessionLocal()
@@ -117,91 +135,233 @@ async def accounts_updates(ws: WebSocket):
         manager.disconnect(ws)
 
 # ───────────────────────────────────────── API – upload ──────────────────────────────────────
-@app.post("/upload")
+def _record_failed_upload(filename: str, s3_key: str, error: str) -> None:
+    fail_db = database.SessionLocal()
+    try:
+        persist_document(
+            fail_db, filename, s3_key, status="Failed", error_message=error, priority_lane="ui"
+        )
+        fail_db.commit()
+    finally:
+        fail_db.close()
+
+
+def _record_upload(db: Session, filename: str, s3_key: str) -> int:
+    """
+    Insert the Document1 row and its outbox message in one transaction; returns the id.
+    """
+    try:
+        doc_id = persist_document(db, filename, s3_key, priority_lane="ui")
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.exception("DB insert failed: %s", e)
+        raise HTTPException(status_code=500, detail="Database insert failed")
+    logger.info("Created document id=%s with outbox message", doc_id)
+    return doc_id
+
+
+# The body is parsed by hand (see streaming_upload), so describe the form for /docs
+_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
+
+@app.post("/upload", openapi_extra=_UPLOAD_OPENAPI)
 async def upload_document(
-    file: UploadFile = File(...),
+    request: Request,
     db: Session = Depends(get_db),
 ):
-    logger.info("Received upload: %s", file.filename)
-    file_id = str(uuid.uuid4())
-    key_name = f"{file_id}_{file.filename}"
-    s3_key = f"{S3_INPUT_PREFIX.rstrip('/')}/{key_name}"
-    tmp_path = f"/tmp/{key_name}"
-
-    # local temp write
-    content = await file.read()
-    try:
-        with open(tmp_path, "wb") as f:
-            f.write(content)
-    except Exception as e:
-        logger.exception("Local write failed: %s", e)
-        raise HTTPException(status_code=500, detail="File write error")
+    # The file is streamed from the request body to S3 in multipart parts: it is never
+    # read fully into memory or written to local disk, and all blocking boto3/DB calls
+    # run in the threadpool so the event loop keeps serving other requests.
+    target = {}
+
+    def key_for(filename: str) -> str:
+        logger.info("Received upload: %s", filename)
+        target["filename"] = filename
+        target["s3_key"] = new_input_key(filename)
+        return target["s3_key"]
 
-    # AWS S3 upload
     try:
-        s3_client.upload_file(tmp_path, AWS_S3_BUCKET, s3_key)
-        logger.info("Uploaded to S3: %s/%s", AWS_S3_BUCKET, s3_key)
+        filename, s3_key, size = await stream_upload_to_s3(
+            request, s3_client, AWS_S3_BUCKET, key_for
+        )
+        logger.info("Uploaded to S3: %s/%s (%s bytes)", AWS_S3_BUCKET, s3_key, size)
+    except UploadStreamError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except ClientDisconnect:
+        logger.warning("Client disconnected during upload of %s", target.get("filename"))
+        raise HTTPException(status_code=400, detail="Upload interrupted")
     except Exception as e:
         logger.exception("S3 upload failed: %s", e)
-        # Record failure
-        fail_db = database.SessionLocal()
-        try:
-            fail_doc = models.Document1(
-                filename=file.filename,
-                s3_key=s3_key,
-                status="Failed",
-                error_message=str(e),
-                account_number="XXXX",
-                policyholder_name="XXXX",
-                policy_number="XXXX",
-                claim_number="XXXX",
+        if target:
+            # Record failure
+            await run_in_threadpool(
+                _record_failed_upload, target["filename"], target["s3_key"], str(e)
             )
-            fail_db.add(fail_doc)
-            fail_db.commit()
-        finally:
-            fail_db.close()
         raise HTTPException(status_code=500, detail="S3 upload failed")
 
-    # DB record into Document1
+    doc_id = await run_in_threadpool(_record_upload, db, filename, s3_key)
+
+    # Broadcast WebSocket message to notify clients
+    await manager.broadcast({"type": "new_document", "document_id": doc_id})
+
+    return {"message": "Uploaded successfully", "document_id": doc_id}
+
+def _persist_batch(db: Session, docs: List[dict]) -> List[int]:
     try:
-        doc = models.Document1(
-            filename=file.filename,
-            s3_key=s3_key,
-            status="Pending",
-            account_number="XXXX",
-            policyholder_name="XXXX",
-            policy_number="XXXX",
-            claim_number="XXXX",
-        )
-        db.add(doc)
+        ids = persist_documents(db, docs)
         db.commit()
-        db.refresh(doc)
     except Exception as e:
         db.rollback()
-        logger.exception("DB insert failed: %s", e)
+        logger.exception("Batch DB insert failed: %s", e)
         raise HTTPException(status_code=500, detail="Database insert failed")
+    return ids
 
-    # Enqueue in outbox
-    out_db = database.SessionLocal()
+
+@app.post("/upload/batch")
+async def upload_documents_batch(
+    files: List[UploadFile] = File(...),
+    db: Session = Depends(get_db),
+):
+    """
+    Upload many files in one request. Files go to S3 concurrently (at most
+    UPLOAD_BATCH_CONCURRENCY at a time), then every Document1 row and outbox message is
+    written in a single transaction. Files that fail to upload are recorded as Failed
+    documents in the same transaction and reported per file.
+    """
+    if len(files) > UPLOAD_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=413, detail=f"At most {UPLOAD_BATCH_MAX_FILES} files per batch"
+        )
+    logger.info("Received batch upload of %d file(s)", len(files))
+    limit = asyncio.Semaphore(UPLOAD_BATCH_CONCURRENCY)
+    transfer = TransferConfig(multipart_chunksize=UPLOAD_PART_SIZE)
+
+    async def upload(file: UploadFile) -> dict:
+        s3_key = new_input_key(file.filename)
+        async with limit:
+            try:
+                await run_in_threadpool(
+                    s3_client.upload_fileobj, file.file, AWS_S3_BUCKET, s3_key,
+                    Config=transfer,
+                )
+                return {"filename": file.filename, "s3_key": s3_key, "status": "Pending",
+                        "priority_lane": "ui"}
+            except Exception as e:
+                logger.exception("S3 upload failed for %s: %s", file.filename, e)
+                return {"filename": file.filename, "s3_key": s3_key,
+                        "status": "Failed", "error_message": str(e), "priority_lane": "ui"}
+            finally:
+                await file.close()
+
+    docs = await asyncio.gather(*(upload(f) for f in files))
+    doc_ids = await run_in_threadpool(_persist_batch, db, docs)
+
+    results = [
+        {
+            "filename": d["filename"],
+            "document_id": doc_id,
+            "status": "uploaded" if d["status"] == "Pending" else "failed",
+            "error": d.get("error_message"),
+        }
+        for d, doc_id in zip(docs, doc_ids)
+    ]
+    uploaded = [r["document_id"] for r in results if r["status"] == "uploaded"]
+    logger.info("Batch stored: %d uploaded, %d failed", len(uploaded), len(results) - len(uploaded))
+
+    # One notification for the whole batch
+    if uploaded:
+        await manager.broadcast({"type": "new_document", "document_ids": uploaded})
+
+    return {"uploaded": len(uploaded), "failed": len(results) - len(uploaded), "results": results}
+
+# ─────────────────────────────── API – direct-to-S3 upload ──────────────────────────────────
+@app.post("/upload/presign")
+def presign_upload(payload: PresignUploadRequest):
+    # Step 1: hand the client a short-lived URL to upload straight to S3, so file bytes
+    # never pass through the API. Step 2 is /upload/finalize with the returned s3_key.
+    s3_key = new_input_key(safe_filename(payload.filename))
     try:
-        out = models.MessageOutbox(
-            exchange="",
-            routing_key="document_queue",
-            payload={"doc_id": doc.id, "s3_key": s3_key},
+        if payload.method == "post":
+            conditions = [["content-length-range", 1, OCR_MAX_OBJECT_BYTES]]
+            fields = None
+            if payload.content_type:
+                fields = {"Content-Type": payload.content_type}
+                conditions.append({"Content-Type": payload.content_type})
+            post = s3_client.generate_presigned_post(
+                AWS_S3_BUCKET, s3_key, Fields=fields, Conditions=conditions,
+                ExpiresIn=PRESIGNED_UPLOAD_EXPIRES_IN,
+            )
+            return {"s3_key": s3_key, "method": "POST", "url": post["url"],
+                    "fields": post["fields"], "expires_in": PRESIGNED_UPLOAD_EXPIRES_IN}
+        if payload.method != "put":
+            raise HTTPException(status_code=400, detail="method must be 'put' or 'post'")
+
+        params = {"Bucket": AWS_S3_BUCKET, "Key": s3_key}
+        headers = {}
+        if payload.content_type:
+            params["ContentType"] = payload.content_type
+            headers["Content-Type"] = payload.content_type
+        url = s3_client.generate_presigned_url(
+            "put_object", Params=params, ExpiresIn=PRESIGNED_UPLOAD_EXPIRES_IN
         )
-        out_db.add(out)
-        out_db.commit()
-        logger.info("Enqueued outbox id=%s", out.id)
-    except Exception as e:
-        out_db.rollback()
-        logger.exception("Outbox write failed: %s", e)
-    finally:
-        out_db.close()
+    except ClientError as e:
+        logger.exception("Error generating presigned upload: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to generate upload URL")
+    return {"s3_key": s3_key, "method": "PUT", "url": url, "headers": headers,
+            "expires_in": PRESIGNED_UPLOAD_EXPIRES_IN}
 
-    # Broadcast WebSocket message to notify clients
-    await manager.broadcast({"type": "new_document", "document_id": doc.id})
 
-    return {"message": "Uploaded successfully", "document_id": doc.id}
+@app.post("/upload/finalize")
+async def finalize_upload(
+    payload: FinalizeUploadRequest,
+    db: Session = Depends(get_db),
+):
+    # Idempotent: retries for the same s3_key return the same document_id.
+    filename = filename_from_input_key(payload.s3_key)
+    if filename is None:
+        raise HTTPException(status_code=400, detail="s3_key was not issued by /upload/presign")
+
+    try:
+        head = await run_in_threadpool(
+            s3_client.head_object, Bucket=AWS_S3_BUCKET, Key=payload.s3_key
+        )
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            raise HTTPException(status_code=409, detail="Object has not been uploaded yet")
+        logger.exception("head_object failed for %s: %s", payload.s3_key, e)
+        raise HTTPException(status_code=500, detail="Could not verify upload")
+    if head.get("ContentLength", 0) > OCR_MAX_OBJECT_BYTES:
+        raise HTTPException(status_code=413, detail=f"File exceeds {OCR_MAX_OBJECT_BYTES} bytes")
+
+    def _finalize():
+        try:
+            result = finalize_document(db, payload.s3_key, filename, priority_lane="ui")
+            db.commit()
+            return result
+        except Exception as e:
+            db.rollback()
+            logger.exception("Finalize failed for %s: %s", payload.s3_key, e)
+            raise HTTPException(status_code=500, detail="Database insert failed")
+
+    doc_id, created = await run_in_threadpool(_finalize)
+    if created:
+        logger.info("Finalized direct upload %s as document %s", payload.s3_key, doc_id)
+        await manager.broadcast({"type": "new_document", "document_id": doc_id})
+    return {"document_id": doc_id, "created": created}
 
 # ───────────────────────────────── API – list & detail ─────────────────────────────────────
 @app.get("/documents")
@@ -390,17 +550,23 @@ class IngestionModePayload(BaseModel):
     mode: str  # "realtime" or "batch"
 
 @app.get("/ingestion-mode")
-def get_ingestion_mode():
-    return {"mode": _ingestion_mode}
+def get_ingestion_mode_endpoint(db: Session = Depends(get_db)):
+    return {"mode": get_ingestion_mode(db)}
 
 @app.put("/ingestion-mode")
-def set_ingestion_mode(payload: IngestionModePayload):
-    global _ingestion_mode
-    if payload.mode not in ("realtime", "batch"):
+def set_ingestion_mode_endpoint(payload: IngestionModePayload, db: Session = Depends(get_db)):
+    # Stored in app_settings so every API and worker process sees the same mode
+    if payload.mode not in INGESTION_MODES:
         raise HTTPException(status_code=400, detail="Invalid mode")
-    _ingestion_mode = payload.mode
-    logger.info("Ingestion mode set to: %s", _ingestion_mode)
-    return {"mode": _ingestion_mode}
+    try:
+        set_ingestion_mode(db, payload.mode)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.exception("Saving ingestion mode failed: %s", e)
+        raise HTTPException(status_code=500, detail="Could not save ingestion mode")
+    logger.info("Ingestion mode set to: %s", payload.mode)
+    return {"mode": payload.mode}
 
 # ───────────────────────────────── include routers ──────────────────────────────────────────
 app.include_router(bucket_mappings_router, prefix="/bucket-mappings", tags=["Bucket Mappings"])
@@ -411,4 +577,5 @@ app.include_router(account_policy_router)
 app.include_router(accounts_v1_router)                  
 app.include_router(policies_v1_router)                  
 app.include_router(claims_v1_router)  
-app.include_router(webhook_router)                  
+app.include_router(webhook_router)
+app.include_router(dead_letters_router)                  
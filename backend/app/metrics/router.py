@@ -1,3 +1,5 @@
+from typing import List
+
 from fastapi import APIRouter, Depends
 from ..database import SessionLocal
 from . import service, schemas, cache
@@ -35,6 +37,54 @@ def get_overview(db=Depends(get_db)):
     )
 
 
+@router.get("/ocr-cache", response_model=schemas.OcrCacheStats)
+def get_ocr_cache_stats(db=Depends(get_db)):
+    """
+    Returns OCR result cache size and hit rate.
+    """
+    return schemas.OcrCacheStats(**service.ocr_cache_stats(db))
+
+
+@router.get("/classification-cache", response_model=schemas.ClassificationCacheStats)
+def get_classification_cache_stats(db=Depends(get_db)):
+    """
+    Returns LLM classification cache size, hit rate and saved LLM latency.
+    """
+    return schemas.ClassificationCacheStats(**service.classification_cache_stats(db))
+
+
+@router.get("/outbox", response_model=schemas.OutboxStats)
+def get_outbox_stats(db=Depends(get_db)):
+    """
+    Returns outbox backlog and lag (age of the oldest unsent message).
+    """
+    return schemas.OutboxStats(**service.outbox_stats(db))
+
+
+@router.get("/lanes", response_model=List[schemas.LaneStats])
+def get_lane_stats(db=Depends(get_db)):
+    """
+    Returns queue latency per ingestion priority lane.
+    """
+    return [schemas.LaneStats(**row) for row in service.lane_stats(db)]
+
+
+@router.get("/autoscaler", response_model=List[schemas.AutoscalerStats])
+def get_autoscaler_stats(db=Depends(get_db)):
+    """
+    Returns the autoscaler's current worker count and recent scaling activity per stage.
+    """
+    return [schemas.AutoscalerStats(**row) for row in service.autoscaler_stats(db)]
+
+
+@router.get("/sweeper", response_model=schemas.SweeperStats)
+def get_sweeper_stats(db=Depends(get_db)):
+    """
+    Returns stuck documents and how many the sweeper re-drove and recovered.
+    """
+    return schemas.SweeperStats(**service.sweeper_stats(db))
+
+
 @router.get("/debug")
 def debug_metrics(db=Depends(get_db)):
     """Debug endpoint to check what data exists"""
@@ -1,5 +1,7 @@
 # backend/app/metrics/schemas.py
 
+from datetime import datetime
+
 from pydantic import BaseModel
 from typing import List
 
@@ -27,3 +29,54 @@ class Overview(BaseModel):
     latency:   LatencyStats      # Latency statistics for processed documents
     overrides: float             # Percentage of documents overridden
     reroute:   float             # Percentage of processed/No Destination docs successfully rerouted
+
+
+class OcrCacheStats(BaseModel):
+    entries:     int    # Cached OCR results
+    total_bytes: int    # Size of the source documents they cover
+    total_hits:  int    # Lookups served from the cache (since each entry was stored)
+    hit_rate:    float  # hits / (hits + stored entries), as a percentage
+
+
+class ClassificationCacheStats(BaseModel):
+    entries:            int    # Cached LLM classifications (one LLM call each)
+    total_hits:         int    # Classifications served from the cache instead
+    hit_rate:           float  # hits / (hits + stored entries), as a percentage
+    avg_llm_latency_ms: float  # Mean LLM time per cached classification
+    saved_llm_seconds:  float  # LLM time the hits avoided
+
+
+class OutboxStats(BaseModel):
+    unsent:        int    # Messages waiting to be published
+    failing:       int    # ...of which the last publish attempt failed
+    buffered:      int    # Batch-mode documents waiting to be coalesced
+    lag_seconds:   float  # Age of the oldest unsent message (0 when caught up)
+    sent_retained: int    # Sent messages not yet archived by the retention job
+
+
+class LaneStats(BaseModel):
+    lane:                str    # ui, webhook, backfill or reprocess (highest priority first)
+    waiting:             int    # Pending documents not yet picked up by OCR
+    oldest_wait_seconds: float  # ...and how long the oldest of them has waited
+    picked_up_24h:       int    # Documents picked up in the last 24 hours
+    avg_wait_seconds:    float  # Their mean queue wait (created -> first pickup)
+    p95_wait_seconds:    float  # ...and 95th percentile
+
+
+class AutoscalerStats(BaseModel):
+    stage:           str       # ocr, classify or route
+    workers:         int       # Worker processes after the latest scaling action
+    last_action:     str       # up, down or replace (dead workers restarted)
+    last_reason:     str       # Queue depth / message age that triggered it
+    last_scaled_at:  datetime
+    scale_ups_24h:   int
+    scale_downs_24h: int
+    replaced_24h:    int
+
+
+class SweeperStats(BaseModel):
+    stuck:                  int  # Pending documents idle longer than STUCK_DOCUMENT_AFTER
+    awaiting_after_redrive: int  # Re-driven documents still Pending
+    redriven_24h:           int  # Documents re-enqueued by the sweeper in the last 24 hours
+    recovered_24h:          int  # Re-driven documents that completed in the last 24 hours
+    failed_24h:             int  # ...and that failed (errors or sweeper gave up)
@@ -1,4 +1,6 @@
 from sqlalchemy.sql import text
+from ..config import STUCK_DOCUMENT_AFTER
+from ..rabbitmq import INGEST_BATCH_ROUTING_KEY, PRIORITY_LANES
 
 
 def status_breakdown(db):
@@ -112,3 +114,196 @@ def reroute_success(db):
         FROM total, rerouted;
     """)
     return db.execute(sql).scalar_one()
+
+
+def ocr_cache_stats(db):
+    """
+    Returns size and hit statistics for the OCR result cache. Every stored entry
+    represents one miss, so hit rate is hits / (hits + entries).
+    """
+    sql = text("""
+        SELECT
+            COUNT(*)                        AS entries,
+            COALESCE(SUM(byte_size), 0)     AS total_bytes,
+            COALESCE(SUM(hit_count), 0)     AS total_hits
+        FROM ocr_cache;
+    """)
+    row = db.execute(sql).one()
+    lookups = row.total_hits + row.entries
+    return {
+        "entries": row.entries,
+        "total_bytes": row.total_bytes,
+        "total_hits": row.total_hits,
+        "hit_rate": round(row.total_hits / lookups * 100.0, 1) if lookups else 0.0,
+    }
+
+
+def classification_cache_stats(db):
+    """
+    Returns size, hit rate and LLM time saved for the classification cache. Every stored
+    entry represents one LLM call (a miss), so hit rate is hits / (hits + entries); each
+    hit saves the latency of the call that produced the entry. Hits are flushed from the
+    workers every CLASSIFY_CACHE_FLUSH_INTERVAL seconds.
+    """
+    sql = text("""
+        SELECT
+            COUNT(*)                                  AS entries,
+            COALESCE(SUM(hit_count), 0)               AS total_hits,
+            COALESCE(AVG(latency_ms), 0)              AS avg_latency_ms,
+            COALESCE(SUM(hit_count * latency_ms), 0)  AS saved_ms
+        FROM classification_cache;
+    """)
+    row = db.execute(sql).one()
+    lookups = row.total_hits + row.entries
+    return {
+        "entries": row.entries,
+        "total_hits": row.total_hits,
+        "hit_rate": round(row.total_hits / lookups * 100.0, 1) if lookups else 0.0,
+        "avg_llm_latency_ms": round(float(row.avg_latency_ms), 1),
+        "saved_llm_seconds": round(float(row.saved_ms) / 1000.0, 1),
+    }
+
+
+def outbox_stats(db):
+    """
+    Returns outbox health. lag_seconds is the age of the oldest unsent message (0 when
+    caught up); batch-mode buffer rows wait on purpose and are counted separately.
+    """
+    sql = text("""
+        SELECT
+            COUNT(*) FILTER (WHERE routing_key <> :buffer_key)        AS unsent,
+            COUNT(*) FILTER (WHERE routing_key <> :buffer_key
+                             AND error IS NOT NULL)                               AS failing,
+            COUNT(*) FILTER (WHERE routing_key = :buffer_key)          AS buffered,
+            COALESCE(EXTRACT(EPOCH FROM now() - MIN(created_at)
+                     FILTER (WHERE routing_key <> :buffer_key)), 0)    AS lag_seconds
+        FROM message_outbox
+        WHERE sent_at IS NULL;
+    """)
+    row = db.execute(sql, {"buffer_key": INGEST_BATCH_ROUTING_KEY}).one()
+    retained = db.execute(
+        text("SELECT COUNT(*) FROM message_outbox WHERE sent_at IS NOT NULL")
+    ).scalar_one()
+    return {
+        "unsent": row.unsent,
+        "failing": row.failing,
+        "buffered": row.buffered,
+        "lag_seconds": round(float(row.lag_seconds), 3),
+        "sent_retained": retained,
+    }
+
+
+def lane_stats(db):
+    """
+    Returns per-priority-lane queue latency: documents still waiting for their first
+    OCR pickup (and how long the oldest has waited), plus the average and p95 wait
+    (created_at -> processing_started_at) of documents picked up in the last 24 hours.
+    """
+    sql = text("""
+        SELECT
+            priority_lane AS lane,
+            COUNT(*) FILTER (WHERE processing_started_at IS NULL
+                             AND status = 'Pending')                        AS waiting,
+            COALESCE(EXTRACT(EPOCH FROM now() - MIN(created_at)
+                     FILTER (WHERE processing_started_at IS NULL
+                             AND status = 'Pending')), 0)                   AS oldest_wait,
+            COUNT(*) FILTER (WHERE processing_started_at >= now() - interval '24 hours')
+                                                                            AS picked_up,
+            AVG(EXTRACT(EPOCH FROM (processing_started_at - created_at)))
+                FILTER (WHERE processing_started_at >= now() - interval '24 hours')
+                                                                            AS avg_wait,
+            PERCENTILE_CONT(0.95) WITHIN GROUP (
+                ORDER BY EXTRACT(EPOCH FROM (processing_started_at - created_at))
+            ) FILTER (WHERE processing_started_at >= now() - interval '24 hours')
+                                                                            AS p95_wait
+        FROM documents1
+        WHERE processing_started_at IS NULL
+           OR processing_started_at >= now() - interval '24 hours'
+        GROUP BY priority_lane;
+    """)
+    rows = {row.lane: row for row in db.execute(sql)}
+    result = []
+    for lane in PRIORITY_LANES:
+        row = rows.get(lane)
+        result.append({
+            "lane": lane,
+            "waiting": row.waiting if row else 0,
+            "oldest_wait_seconds": round(float(row.oldest_wait), 1) if row else 0.0,
+            "picked_up_24h": row.picked_up if row else 0,
+            "avg_wait_seconds": round(row.avg_wait, 1) if row and row.avg_wait is not None else 0.0,
+            "p95_wait_seconds": round(row.p95_wait, 1) if row and row.p95_wait is not None else 0.0,
+        })
+    return result
+
+
+def autoscaler_stats(db):
+    """
+    Returns per-stage autoscaler state from the scaling_events log: the worker count
+    after the latest action, when and why it happened, and how many scale-ups,
+    scale-downs and dead-worker replacements happened in the last 24 hours.
+    """
+    sql = text("""
+        SELECT DISTINCT ON (stage)
+            stage,
+            to_workers  AS workers,
+            action      AS last_action,
+            reason      AS last_reason,
+            created_at  AS last_scaled_at,
+            COUNT(*) FILTER (WHERE action = 'up'
+                             AND created_at >= now() - interval '24 hours')
+                OVER (PARTITION BY stage)                                   AS ups,
+            COUNT(*) FILTER (WHERE action = 'down'
+                             AND created_at >= now() - interval '24 hours')
+                OVER (PARTITION BY stage)                                   AS downs,
+            COUNT(*) FILTER (WHERE action = 'replace'
+                             AND created_at >= now() - interval '24 hours')
+                OVER (PARTITION BY stage)                                   AS replaced
+        FROM scaling_events
+        ORDER BY stage, created_at DESC, id DESC;
+    """)
+    return [
+        {
+            "stage": row.stage,
+            "workers": row.workers,
+            "last_action": row.last_action,
+            "last_reason": row.last_reason,
+            "last_scaled_at": row.last_scaled_at,
+            "scale_ups_24h": row.ups,
+            "scale_downs_24h": row.downs,
+            "replaced_24h": row.replaced,
+        }
+        for row in db.execute(sql)
+    ]
+
+
+def sweeper_stats(db):
+    """
+    Returns stuck-document sweeper activity: Pending documents idle past the stuck
+    threshold right now, documents re-driven in the last 24 hours, and of the re-driven
+    documents that finished in the last 24 hours, how many were recovered vs. failed.
+    """
+    sql = text("""
+        SELECT
+            COUNT(*) FILTER (WHERE status = 'Pending'
+                             AND updated_at < now() - make_interval(secs => :stuck_after))
+                                                                            AS stuck,
+            COUNT(*) FILTER (WHERE status = 'Pending' AND redrive_count > 0)  AS awaiting,
+            COUNT(*) FILTER (WHERE last_redriven_at >= now() - interval '24 hours')
+                                                                            AS redriven,
+            COUNT(*) FILTER (WHERE redrive_count > 0
+                             AND status NOT IN ('Pending', 'Failed')
+                             AND updated_at >= now() - interval '24 hours')  AS recovered,
+            COUNT(*) FILTER (WHERE redrive_count > 0
+                             AND status = 'Failed'
+                             AND updated_at >= now() - interval '24 hours')  AS failed
+        FROM documents1
+        WHERE status = 'Pending' OR redrive_count > 0;
+    """)
+    row = db.execute(sql, {"stuck_after": STUCK_DOCUMENT_AFTER}).one()
+    return {
+        "stuck": row.stuck,
+        "awaiting_after_redrive": row.awaiting,
+        "redriven_24h": row.redriven,
+        "recovered_24h": row.recovered,
+        "failed_24h": row.failed,
+    }
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, UniqueConstraint, JSON
+from sqlalchemy import Column, Integer, BigInteger, Float, String, Text, DateTime, UniqueConstraint, Index, JSON
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -38,7 +38,7 @@ class Document1(Base):
     __tablename__ = 'documents1'
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, nullable=False)
-    s3_key = Column(String, nullable=False)  # Key in AWS S3 storage
+    s3_key = Column(String, nullable=False, index=True)  # Key in AWS S3 storage
     extracted_text = Column(Text)
     department = Column(String)
     category = Column(String)
@@ -54,6 +54,15 @@ class Document1(Base):
     policyholder_name = Column(String, nullable=True)
     policy_number = Column(String, nullable=True)
     claim_number = Column(String, nullable=True)
+    ocr_metadata = Column(JSON, nullable=True)  # per-page extraction path (text_layer / ocr)
+    ocr_confidence = Column(Float, nullable=True)  # mean Tesseract word confidence over OCR'd pages
+    ocr_passes = Column(Integer, nullable=True)  # OCR passes spent (low-confidence pages retried)
+    pipeline_stage = Column(String, nullable=True)  # last completed stage: ocr_done, classified, routed
+    priority_lane = Column(String, nullable=False, default='webhook', server_default='webhook')  # ui, webhook, backfill, reprocess
+    processing_started_at = Column(DateTime(timezone=True), nullable=True)  # first OCR pickup; queue wait = this - created_at
+    stage_started_at = Column(DateTime(timezone=True), nullable=True)  # worker pickup for the current stage; cleared by its checkpoint
+    redrive_count = Column(Integer, nullable=False, default=0, server_default='0')  # times the stuck-document sweeper re-enqueued it
+    last_redriven_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -66,6 +75,10 @@ class Document1(Base):
         onupdate=func.now(),
         nullable=False
     )
+    __table_args__ = (
+        # The stuck-document sweeper scans Pending documents by last activity
+        Index('ix_documents1_pending_updated_at', 'updated_at', postgresql_where=(status == 'Pending')),
+    )
 
 
 class BucketMapping(Base):
@@ -144,3 +157,89 @@ class MessageOutbox(Base):
     )
     sent_at = Column(DateTime(timezone=True), nullable=True)
     error = Column(Text, nullable=True)
+    __table_args__ = (
+        # Publisher claims scan only unsent rows, however much history is retained
+        Index('ix_message_outbox_unsent', 'id', postgresql_where=sent_at.is_(None)),
+        Index('ix_message_outbox_sent_at', 'sent_at'),
+    )
+
+
+class MessageOutboxArchive(Base):
+    __tablename__ = 'message_outbox_archive'
+    id = Column(Integer, primary_key=True)  # id of the original message_outbox row
+    exchange = Column(String, nullable=False)
+    routing_key = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    error = Column(Text, nullable=True)
+    archived_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+
+class OcrCache(Base):
+    __tablename__ = 'ocr_cache'
+    id = Column(Integer, primary_key=True, index=True)
+    content_sha256 = Column(String(64), nullable=False, unique=True, index=True)
+    ocr_settings = Column(String, nullable=False)  # fingerprint of the OCR config that produced the text
+    extracted_text = Column(Text, nullable=False)
+    ocr_metadata = Column(JSON, nullable=True)
+    byte_size = Column(BigInteger, nullable=False)
+    hit_count = Column(Integer, nullable=False, default=0, server_default='0')
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+    last_hit_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class ClassificationCache(Base):
+    __tablename__ = 'classification_cache'
+    id = Column(Integer, primary_key=True, index=True)
+    text_sha256 = Column(String(64), nullable=False, unique=True, index=True)  # digest of the normalized extracted text
+    hierarchy_version = Column(String, nullable=False)  # fingerprint of the hierarchy prompt that produced the result
+    result = Column(JSON, nullable=False)
+    latency_ms = Column(Float, nullable=False)  # LLM time spent producing it; each hit saves this much
+    hit_count = Column(Integer, nullable=False, default=0, server_default='0')
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        index=True
+    )
+    last_hit_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class AppSetting(Base):
+    __tablename__ = 'app_settings'
+    key = Column(String, primary_key=True)
+    value = Column(String, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False
+    )
+
+
+class ScalingEvent(Base):
+    __tablename__ = 'scaling_events'
+    id = Column(Integer, primary_key=True, index=True)
+    stage = Column(String, nullable=False)  # ocr, classify, route
+    action = Column(String, nullable=False)  # up, down, replace (a worker exited)
+    from_workers = Column(Integer, nullable=False)
+    to_workers = Column(Integer, nullable=False)
+    queue_depth = Column(Integer, nullable=False)  # ready messages across the stage's queues
+    oldest_age_seconds = Column(Float, nullable=True)  # oldest document waiting for the stage
+    reason = Column(String, nullable=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        index=True
+    )
@@ -0,0 +1,116 @@
+# backend/app/ocr_backends.py
+
+import logging
+import threading
+from typing import Optional, Tuple
+
+import pytesseract
+from PIL import Image
+
+from .config import TESSERACT_CMD, OCR_BACKEND, OCR_LANG, TESSDATA_PREFIX
+
+logger = logging.getLogger("ocr_backends")
+
+# ─────────────────────────────────── Configure Tesseract ───────────────────────────────────
+if TESSERACT_CMD:
+    pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+
+
+class OcrBackend:
+    """
+    Interface for turning a PIL image into text.
+    """
+    name = "base"
+
+    def recognize(self, image: Image.Image) -> Tuple[str, float]:
+        """
+        OCR *image* and return (text, mean word confidence 0–100).
+        """
+        raise NotImplementedError
+
+
+class PytesseractBackend(OcrBackend):
+    """
+    Shells out to the tesseract binary for every call: writes a temp image,
+    fork/execs tesseract (which reloads its traineddata) and reads the result back.
+    """
+    name = "pytesseract"
+
+    def recognize(self, image: Image.Image) -> Tuple[str, float]:
+        # One tesseract run: rebuild the text from word boxes instead of calling twice
+        data = pytesseract.image_to_data(
+            image, lang=OCR_LANG, output_type=pytesseract.Output.DICT
+        )
+        lines, confs = {}, []
+        for i, word in enumerate(data["text"]):
+            conf = float(data["conf"][i])
+            if conf < 0 or not word.strip():
+                continue
+            key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            lines.setdefault(key, []).append(word)
+            confs.append(conf)
+        text = "\n".join(" ".join(words) for words in lines.values())
+        return text, (sum(confs) / len(confs) if confs else 0.0)
+
+
+class TesserocrBackend(OcrBackend):
+    """
+    Keeps a libtesseract engine, with its language models loaded, alive for the life
+    of the process. TessBaseAPI is not thread-safe, so each thread gets its own engine.
+    """
+    name = "tesserocr"
+
+    def __init__(self):
+        import tesserocr  # optional dependency; ImportError selects the fallback
+
+        self._tesserocr = tesserocr
+        self._local = threading.local()
+        self._engine()  # fail fast if the engine or language data can't be loaded
+
+    def _engine(self):
+        api = getattr(self._local, "api", None)
+        if api is None:
+            kwargs = {"lang": OCR_LANG}
+            if TESSDATA_PREFIX:
+                kwargs["path"] = TESSDATA_PREFIX
+            api = self._tesserocr.PyTessBaseAPI(**kwargs)
+            self._local.api = api
+            logger.info("Loaded tesserocr engine (lang=%s)", OCR_LANG)
+        return api
+
+    def recognize(self, image: Image.Image) -> Tuple[str, float]:
+        api = self._engine()
+        api.SetImage(image)
+        return api.GetUTF8Text(), float(api.MeanTextConf())
+
+
+_backend: Optional[OcrBackend] = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name: str) -> OcrBackend:
+    """
+    Build the named backend. "auto" prefers the persistent tesserocr engine and falls
+    back to pytesseract when tesserocr is not installed or cannot start.
+    """
+    if name == "pytesseract":
+        return PytesseractBackend()
+    try:
+        return TesserocrBackend()
+    except Exception as e:
+        if name == "tesserocr":
+            raise
+        logger.warning("tesserocr unavailable (%s); falling back to pytesseract", e)
+        return PytesseractBackend()
+
+
+def get_ocr_backend() -> OcrBackend:
+    """
+    Process-wide OCR backend, created on first use and reused across documents.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend(OCR_BACKEND)
+            logger.info("Using OCR backend: %s", _backend.name)
+    return _backend
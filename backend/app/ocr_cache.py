@@ -0,0 +1,175 @@
+# backend/app/ocr_cache.py
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from .config import (
+    OCR_CACHE_ENABLED,
+    OCR_CACHE_MAX_AGE_DAYS,
+    OCR_CACHE_MAX_ENTRIES,
+    OCR_CACHE_EVICT_INTERVAL,
+    OCR_PAGE_POLICY,
+    OCR_MAX_PAGES,
+    OCR_PDF_DPI,
+    OCR_TEXT_LAYER_MIN_CHARS,
+    OCR_TARGET_DPI,
+    OCR_RETRY_DPI,
+    OCR_MIN_CONFIDENCE,
+    OCR_MAX_PASSES,
+    OCR_BACKEND,
+    OCR_LANG,
+)
+from .database import SessionLocal
+from .models import OcrCache
+
+logger = logging.getLogger("ocr_cache")
+
+# Cached text is only reused when it was produced with the same OCR settings
+OCR_SETTINGS_FINGERPRINT = (
+    f"policy={OCR_PAGE_POLICY};max_pages={OCR_MAX_PAGES};"
+    f"dpi={OCR_PDF_DPI};text_min={OCR_TEXT_LAYER_MIN_CHARS};"
+    f"target_dpi={OCR_TARGET_DPI};retry_dpi={OCR_RETRY_DPI};"
+    f"min_conf={OCR_MIN_CONFIDENCE};max_passes={OCR_MAX_PASSES};"
+    f"backend={OCR_BACKEND};lang={OCR_LANG}"
+)
+
+# In-process counters (per worker process); persistent hit counts live on the rows
+_stats = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+_last_eviction = 0.0
+
+
+def cache_stats() -> dict:
+    """
+    Hit/miss counters for this process since start-up.
+    """
+    with _stats_lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total * 100.0, 1) if total else 0.0,
+    }
+
+
+def _count(outcome: str) -> None:
+    with _stats_lock:
+        _stats[outcome] += 1
+        hits, misses = _stats["hits"], _stats["misses"]
+    if (hits + misses) % 100 == 0:
+        logger.info("OCR cache stats: %s", cache_stats())
+
+
+def lookup(digest: str) -> Optional[Tuple[str, dict]]:
+    """
+    Return (extracted_text, ocr_metadata) for *digest* if cached with the current OCR
+    settings, recording the hit; otherwise None.
+    """
+    if not OCR_CACHE_ENABLED:
+        return None
+    db = SessionLocal()
+    try:
+        entry = (
+            db.query(OcrCache)
+              .filter(
+                  OcrCache.content_sha256 == digest,
+                  OcrCache.ocr_settings == OCR_SETTINGS_FINGERPRINT,
+              )
+              .first()
+        )
+        if not entry:
+            _count("misses")
+            return None
+        entry.hit_count = OcrCache.hit_count + 1
+        entry.last_hit_at = datetime.now(timezone.utc)
+        result = (entry.extracted_text, dict(entry.ocr_metadata or {}))
+        db.commit()
+        _count("hits")
+        logger.info("OCR cache hit for %s", digest[:12])
+        return result
+    except Exception as e:
+        db.rollback()
+        logger.exception("OCR cache lookup failed: %s", e)
+        return None
+    finally:
+        db.close()
+
+
+def store(digest: str, byte_size: int, extracted_text: str, ocr_metadata: dict) -> None:
+    """
+    Cache an OCR result. Entries from older OCR settings are replaced; a concurrent
+    insert of the same content by another worker is ignored.
+    """
+    if not OCR_CACHE_ENABLED or not extracted_text:
+        return
+    db = SessionLocal()
+    try:
+        entry = db.query(OcrCache).filter(OcrCache.content_sha256 == digest).first()
+        if entry is None:
+            entry = OcrCache(content_sha256=digest)
+            db.add(entry)
+        entry.ocr_settings   = OCR_SETTINGS_FINGERPRINT
+        entry.extracted_text = extracted_text
+        entry.ocr_metadata   = ocr_metadata
+        entry.byte_size      = byte_size
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        logger.debug("OCR cache entry for %s already stored by another worker", digest[:12])
+    except Exception as e:
+        db.rollback()
+        logger.exception("OCR cache store failed: %s", e)
+    finally:
+        db.close()
+    _maybe_evict()
+
+
+def evict(db) -> int:
+    """
+    Delete entries unused for OCR_CACHE_MAX_AGE_DAYS, then trim the least recently
+    used entries beyond OCR_CACHE_MAX_ENTRIES. Returns the number of rows removed.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=OCR_CACHE_MAX_AGE_DAYS)
+    aged = db.execute(
+        text("DELETE FROM ocr_cache WHERE COALESCE(last_hit_at, created_at) < :cutoff"),
+        {"cutoff": cutoff},
+    ).rowcount
+    overflow = db.execute(
+        text("""
+            DELETE FROM ocr_cache
+            WHERE id IN (
+                SELECT id FROM ocr_cache
+                ORDER BY COALESCE(last_hit_at, created_at) DESC
+                OFFSET :max_entries
+            )
+        """),
+        {"max_entries": OCR_CACHE_MAX_ENTRIES},
+    ).rowcount
+    db.commit()
+    return aged + overflow
+
+
+def _maybe_evict() -> None:
+    global _last_eviction
+    now = time.monotonic()
+    with _stats_lock:
+        if now - _last_eviction < OCR_CACHE_EVICT_INTERVAL:
+            return
+        _last_eviction = now
+    db = SessionLocal()
+    try:
+        removed = evict(db)
+        if removed:
+            logger.info("Evicted %d OCR cache entries", removed)
+    except Exception as e:
+        db.rollback()
+        logger.exception("OCR cache eviction failed: %s", e)
+    finally:
+        db.close()
@@ -1,31 +1,66 @@
 import os
 import json
+import argparse
+import functools
 import logging
 import threading
 import asyncio
+import contextlib
+import datetime
+import hashlib
+import mmap
+import subprocess
+import tempfile
+import multiprocessing
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Tuple
 
 import boto3
 import cv2
 import numpy as np
-import pytesseract
-from PIL import Image
-from pdf2image import convert_from_bytes
+from botocore.exceptions import ClientError
+from PIL import Image, UnidentifiedImageError
+from pdf2image import convert_from_path, pdfinfo_from_path
+from pdf2image.exceptions import PDFPageCountError, PDFSyntaxError
+from sqlalchemy import func, select, update
 from sqlalchemy.exc import SQLAlchemyError
 
-from .config import AWS_S3_BUCKET, AWS_REGION, TESSERACT_CMD
+from .config import (
+    AWS_S3_BUCKET,
+    AWS_REGION,
+    OCR_PAGE_POLICY,
+    OCR_MAX_PAGES,
+    OCR_POOL_SIZE,
+    OCR_PDF_DPI,
+    OCR_TEXT_LAYER_MIN_CHARS,
+    OCR_TARGET_DPI,
+    OCR_RETRY_DPI,
+    OCR_MIN_CONFIDENCE,
+    OCR_MAX_PASSES,
+    OCR_MAX_OBJECT_BYTES,
+    OCR_SPOOL_DIR,
+    OCR_WORKER_CONCURRENCY,
+    CLASSIFY_WORKER_CONCURRENCY,
+    ROUTE_WORKER_CONCURRENCY,
+)
 from .database import SessionLocal
 from .destination_service import process_document_destination
-from .llm_classifier import classify_document
+from .llm_classifier import classify_document, classify_documents
 from .pii_masker import mask_pii
-from .rabbitmq import get_rabbitmq_connection
+from .consumer import PooledConsumer, PermanentError
+from .rabbitmq import (
+    DOCUMENT_QUEUE, CLASSIFY_QUEUE, ROUTE_QUEUE, LANE_QUEUES, INGEST_BATCH_ROUTING_KEY,
+    lane_queue,
+)
+from . import ocr_cache
+from .ocr_backends import get_ocr_backend
 from .notifications import notify_document
-from .models import Document1
+from .models import Document1, MessageOutbox
 from .metadata_extractor import extract_metadata  # shared metadata extractor
 from .ws_manager import manager  # ← import WebSocket manager for broadcasting
 
-# ─────────────────────────────────── Configure Tesseract ───────────────────────────────────
-pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
-
 # ─────────────────────────────────── AWS S3 client ──────────────────────────────────────────
 s3_client = boto3.client(
     "s3",
@@ -41,53 +76,498 @@ logger = logging.getLogger("ocr_worker")
 logger.setLevel(logging.INFO)
 
 
-def fetch_s3_bytes(key: str) -> bytes:
+# ─────────────────────────────────── Streaming S3 fetch ────────────────────────────────────
+_FETCH_CHUNK_BYTES = 1024 * 1024
+
+
+class SourceTooLargeError(Exception):
+    """
+    The source object exceeds OCR_MAX_OBJECT_BYTES.
+    """
+
+
+class UnreadableSourceError(Exception):
+    """
+    The source object is not a decodable image.
+    """
+
+
+class SpooledSource:
+    """
+    An S3 object streamed to a local temp file. Decoders get the file path or a
+    read-only memory map of it, never a full in-memory copy.
+    """
+
+    def __init__(self, path: str, size: int, sha256: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self._mmap = None
+
+    @property
+    def buffer(self):
+        if self._mmap is None:
+            with open(self.path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                logger.debug("mmap still referenced; left to the garbage collector")
+            self._mmap = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+@contextlib.contextmanager
+def fetch_s3_object(key: str) -> Iterator[SpooledSource]:
+    """
+    Stream *key* from S3 to a temp file in fixed-size chunks, hashing as it goes.
+    Raises SourceTooLargeError (before or during the download) when the object is
+    larger than OCR_MAX_OBJECT_BYTES.
+    """
+    resp = s3_client.get_object(Bucket=SOURCE_BUCKET, Key=key)
+    body = resp["Body"]
+    declared = resp.get("ContentLength") or 0
+    if declared > OCR_MAX_OBJECT_BYTES:
+        body.close()
+        raise SourceTooLargeError(
+            f"Source object is {declared} bytes; limit is {OCR_MAX_OBJECT_BYTES}"
+        )
+
+    hasher = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(
+        suffix=os.path.splitext(key)[1].lower(), dir=OCR_SPOOL_DIR
+    )
+    source = None
     try:
-        resp = s3_client.get_object(Bucket=SOURCE_BUCKET, Key=key)
-        data = resp["Body"].read()
-        logger.debug(f"Fetched {len(data)} bytes for key: {key}")
-        return data
-    except Exception as e:
-        logger.exception(f"Failed to fetch S3 object: {e}")
-        return b""
+        with os.fdopen(fd, "wb") as out:
+            for chunk in body.iter_chunks(chunk_size=_FETCH_CHUNK_BYTES):
+                size += len(chunk)
+                if size > OCR_MAX_OBJECT_BYTES:
+                    raise SourceTooLargeError(
+                        f"Source object exceeds the {OCR_MAX_OBJECT_BYTES}-byte limit"
+                    )
+                hasher.update(chunk)
+                out.write(chunk)
+        logger.debug(f"Spooled {size} bytes for key: {key}")
+        source = SpooledSource(path, size, hasher.hexdigest())
+        yield source
+    finally:
+        body.close()
+        if source is not None:
+            source.close()
+        elif os.path.exists(path):
+            os.unlink(path)
+
+
+# ─────────────────────────────────── Adaptive-resolution OCR ───────────────────────────────
+# Long edge of a letter page; converts a target DPI into a pixel budget for photos/scans
+_PAGE_LONG_EDGE_INCHES = 11.0
 
 
-def ocr_from_image_bytes(image_bytes: bytes) -> str:
-    nparr = np.frombuffer(image_bytes, np.uint8)
-    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    if img is None:
+def _scale_to_dpi(gray: np.ndarray, dpi: int) -> np.ndarray:
+    """
+    Downsample *gray* so its long edge is at most a letter page at *dpi*; never upsample.
+    """
+    target = dpi * _PAGE_LONG_EDGE_INCHES
+    long_edge = max(gray.shape[:2])
+    if long_edge <= target:
+        return gray
+    factor = target / long_edge
+    return cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+
+
+def _deskew(gray: np.ndarray) -> np.ndarray:
+    """
+    Rotate *gray* so the dominant text angle (from the ink's min-area rectangle) is level.
+    """
+    _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    coords = cv2.findNonZero(ink)
+    if coords is None:
+        return gray
+    angle = cv2.minAreaRect(coords)[-1]
+    if angle > 45:
+        angle -= 90
+    if abs(angle) < 0.5:
+        return gray
+    h, w = gray.shape[:2]
+    rotation = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    return cv2.warpAffine(
+        gray, rotation, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE
+    )
+
+
+def _binarize(gray: np.ndarray, enhance: bool) -> Image.Image:
+    """
+    First pass: global Otsu threshold. Retry pass: denoise, deskew and threshold
+    adaptively, which copes with uneven lighting in phone photos.
+    """
+    if enhance:
+        gray = _deskew(cv2.fastNlMeansDenoising(gray, None, 10))
+        bw = cv2.adaptiveThreshold(
+            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15
+        )
+    else:
+        _, bw = cv2.threshold(gray, 128, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    return Image.fromarray(bw)
+
+
+def _adaptive_ocr(gray: np.ndarray, load_retry_gray) -> Tuple[str, float, int]:
+    """
+    OCR *gray* once; if Tesseract's mean word confidence is below OCR_MIN_CONFIDENCE,
+    OCR the higher-resolution image from *load_retry_gray()* again with deskew and
+    denoise and keep whichever pass was more confident.
+    Returns (text, confidence, passes).
+    """
+    backend = get_ocr_backend()
+    text, conf = backend.recognize(_binarize(gray, enhance=False))
+    passes = 1
+    if conf < OCR_MIN_CONFIDENCE and OCR_MAX_PASSES > 1:
+        retry_text, retry_conf = backend.recognize(_binarize(load_retry_gray(), enhance=True))
+        passes = 2
+        logger.debug(f"Low-confidence retry: {conf:.1f} → {retry_conf:.1f}")
+        if retry_conf > conf:
+            text, conf = retry_text, retry_conf
+    return text, conf, passes
+
+
+def _summarize_confidence(meta: dict) -> dict:
+    """
+    Roll per-page confidence/passes up to document level in *meta*.
+    """
+    ocr_pages = [p for p in meta["pages"] if "confidence" in p]
+    meta["passes"] = sum(p["passes"] for p in ocr_pages)
+    meta["mean_confidence"] = (
+        round(sum(p["confidence"] for p in ocr_pages) / len(ocr_pages), 1)
+        if ocr_pages else None
+    )
+    return meta
+
+
+def ocr_from_image_buffer(image_buffer, raise_errors: bool = False) -> Tuple[str, dict]:
+    """
+    OCR a single image from a bytes-like buffer (e.g. a memory map), downsampled to
+    OCR_TARGET_DPI first and retried at OCR_RETRY_DPI only when confidence is low.
+    Returns (text, ocr_metadata); failures return empty text unless *raise_errors* is
+    set (an undecodable image raises UnreadableSourceError).
+    """
+    page_meta = {"page": 1, "method": "ocr"}
+    meta = {"page_count": 1, "pages": [page_meta]}
+    gray = cv2.imdecode(np.frombuffer(image_buffer, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        if raise_errors:
+            raise UnreadableSourceError("image could not be decoded")
         logger.error("cv2.imdecode failed")
-        return ""
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    _, thresh = cv2.threshold(gray, 128, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
-    pil_img = Image.fromarray(thresh)
+        return "", meta
     try:
-        return pytesseract.image_to_string(pil_img)
+        text, conf, passes = _adaptive_ocr(
+            _scale_to_dpi(gray, OCR_TARGET_DPI),
+            lambda: _scale_to_dpi(gray, OCR_RETRY_DPI),
+        )
     except Exception as e:
+        if raise_errors:
+            raise
         logger.exception(f"Tesseract error: {e}")
-        return ""
+        return "", meta
+    page_meta.update(confidence=round(conf, 1), passes=passes)
+    return text, _summarize_confidence(meta)
+
+
+# ─────────────────────────────────── Page selection & OCR pool ──────────────────────────────
+PAGE_POLICIES = ("first", "first_n", "all", "first_last")
+
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
 
 
-def ocr_from_pdf_bytes(pdf_bytes: bytes) -> str:
+def select_pages(
+    page_count: int,
+    policy: str = OCR_PAGE_POLICY,
+    max_pages: int = OCR_MAX_PAGES,
+) -> List[int]:
+    """
+    Return the 1-based page numbers to OCR for a document with *page_count* pages,
+    according to the configured page-selection policy.
+    """
+    if page_count <= 0:
+        return []
+    if policy == "first":
+        return [1]
+    if policy == "all":
+        return list(range(1, page_count + 1))
+    if policy == "first_last":
+        return [1] if page_count == 1 else [1, page_count]
+    if policy != "first_n":
+        logger.warning(f"Unknown OCR page policy {policy!r}; falling back to first_n")
+    return list(range(1, min(page_count, max(max_pages, 1)) + 1))
+
+
+def _get_ocr_pool() -> ProcessPoolExecutor:
+    """
+    Lazily create the shared OCR process pool. Uses the "spawn" start method so the
+    pool is safe to create from a process that is already running threads.
+    """
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            _ocr_pool = ProcessPoolExecutor(
+                max_workers=OCR_POOL_SIZE,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"OCR process pool started with {OCR_POOL_SIZE} workers")
+    return _ocr_pool
+
+
+def _ocr_pool_map(fn, *iterables, inline: bool = False) -> list:
+    """
+    Run *fn* over *iterables* in the OCR pool and collect the results in order. A pool
+    broken by a dead child process (OOM kill, segfault in Tesseract) is dropped so the
+    next call starts a fresh one, and BrokenProcessPool propagates: the document is
+    retried rather than saved with empty text. *inline* runs in the calling thread
+    instead, without starting the pool.
+    """
+    global _ocr_pool
+    if inline:
+        return list(map(fn, *iterables))
+    pool = _get_ocr_pool()
+    try:
+        return list(pool.map(fn, *iterables))
+    except BrokenProcessPool:
+        with _ocr_pool_lock:
+            if _ocr_pool is pool:
+                _ocr_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+        logger.error("💥 OCR process pool broke; it will be recreated on the next document")
+        raise
+
+
+def _render_pdf_page_gray(pdf_path: str, page_no: int, dpi: int) -> np.ndarray:
+    images = convert_from_path(
+        pdf_path, dpi=dpi, first_page=page_no, last_page=page_no, grayscale=True
+    )
+    if not images:
+        return np.full((1, 1), 255, dtype=np.uint8)
+    page = images[0]
     try:
-        pages = convert_from_bytes(pdf_bytes)
+        return np.asarray(page.convert("L"))
+    finally:
+        page.close()
+
+
+def _ocr_pdf_page(pdf_path: str, page_no: int) -> Tuple[str, float, int]:
+    """
+    Runs inside a pool process: render exactly one page and OCR it, so each worker
+    holds at most one rasterized page at a time. Low-confidence pages are re-rendered
+    at OCR_RETRY_DPI. Returns (text, confidence, passes).
+    """
+    return _adaptive_ocr(
+        _render_pdf_page_gray(pdf_path, page_no, OCR_PDF_DPI),
+        lambda: _render_pdf_page_gray(pdf_path, page_no, OCR_RETRY_DPI),
+    )
+
+
+def _contiguous_runs(pages: List[int]) -> List[Tuple[int, int]]:
+    """
+    Collapse sorted page numbers into (first, last) runs, e.g. [1, 2, 3, 9] → [(1, 3), (9, 9)].
+    """
+    runs: List[Tuple[int, int]] = []
+    for p in pages:
+        if runs and p == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], p)
+        else:
+            runs.append((p, p))
+    return runs
+
+
+def _has_usable_text(text: str) -> bool:
+    return sum(ch.isalnum() for ch in text) >= OCR_TEXT_LAYER_MIN_CHARS
+
+
+def extract_pdf_text_layer(pdf_path: str, pages: List[int]) -> Dict[int, str]:
+    """
+    Read the embedded text layer of *pages* with poppler's pdftotext (one call per
+    contiguous run of pages). Pages pdftotext cannot read map to "".
+    """
+    texts: Dict[int, str] = {p: "" for p in pages}
+    for first, last in _contiguous_runs(pages):
+        try:
+            proc = subprocess.run(
+                ["pdftotext", "-layout", "-f", str(first), "-l", str(last), pdf_path, "-"],
+                capture_output=True,
+                timeout=60,
+                check=True,
+            )
+        except Exception as e:
+            logger.warning(f"pdftotext failed for pages {first}-{last}: {e}")
+            continue
+        # pdftotext terminates every page with a form feed
+        chunks = proc.stdout.decode("utf-8", errors="ignore").split("\f")
+        for offset, page_no in enumerate(range(first, last + 1)):
+            if offset < len(chunks):
+                texts[page_no] = chunks[offset]
+    return texts
+
+
+def ocr_from_pdf_path(pdf_path: str, raise_errors: bool = False,
+                      inline: bool = False) -> Tuple[str, dict]:
+    """
+    Extract text from the pages chosen by the page-selection policy. Pages with a
+    usable embedded text layer are read directly; only the remaining (scanned) pages
+    are rendered lazily, one at a time, and OCR'd in the OCR pool. Text is joined in
+    page order. Returns (text, ocr_metadata) recording which path each page took;
+    failures return empty text unless *raise_errors* is set.
+    """
+    meta: dict = {"page_count": 0, "pages": []}
+    try:
+        page_count = int(pdfinfo_from_path(pdf_path).get("Pages", 0))
+        meta["page_count"] = page_count
+        pages = select_pages(page_count)
         if not pages:
-            return ""
-        return pytesseract.image_to_string(pages[0])
+            return "", meta
+
+        texts = extract_pdf_text_layer(pdf_path, pages)
+        page_meta = {p: {"page": p, "method": "text_layer"} for p in pages}
+        scanned = [p for p in pages if not _has_usable_text(texts[p])]
+        if scanned:
+            logger.debug(f"OCR'ing scanned pages {scanned} of {page_count}")
+            results = _ocr_pool_map(
+                _ocr_pdf_page, [pdf_path] * len(scanned), scanned, inline=inline
+            )
+            for p, (text, conf, passes) in zip(scanned, results):
+                texts[p] = text
+                page_meta[p] = {
+                    "page": p, "method": "ocr", "confidence": round(conf, 1), "passes": passes
+                }
+
+        meta["pages"] = [page_meta[p] for p in pages]
+        logger.info(
+            f"PDF pages: {len(pages) - len(scanned)} from text layer, {len(scanned)} OCR'd"
+        )
+        return "\n".join(texts[p] for p in pages), _summarize_confidence(meta)
+    except BrokenProcessPool:
+        raise
     except Exception as e:
+        if raise_errors:
+            raise
         logger.exception(f"PDF conversion error: {e}")
-        return ""
+        return "", meta
 
 
-def perform_ocr(s3_key: str) -> str:
-    logger.info(f"▶ Fetching and OCR’ing: {s3_key}")
-    data = fetch_s3_bytes(s3_key)
-    if not data:
-        return ""
+# ─────────────────────────────────── Multi-frame TIFF ──────────────────────────────────────
+_TIFF_MAGIC = (b"II*\x00", b"MM\x00*")
+
+
+def _is_tiff(s3_key: str, source: SpooledSource) -> bool:
     ext = os.path.splitext(s3_key)[1].lower()
-    if ext == ".pdf":
-        return ocr_from_pdf_bytes(data)
-    return ocr_from_image_bytes(data)
+    return ext in (".tif", ".tiff") or bytes(source.buffer[:4]) in _TIFF_MAGIC
+
+
+def _ocr_tiff_frame(tiff_path: str, frame_no: int) -> Tuple[str, float, int]:
+    """
+    Runs inside a pool process: decode exactly one frame of the TIFF and OCR it.
+    Returns (text, confidence, passes).
+    """
+    with Image.open(tiff_path) as im:
+        im.seek(frame_no - 1)
+        gray = np.asarray(im.convert("L"))
+    return _adaptive_ocr(
+        _scale_to_dpi(gray, OCR_TARGET_DPI),
+        lambda: _scale_to_dpi(gray, OCR_RETRY_DPI),
+    )
+
+
+def ocr_from_tiff_path(tiff_path: str, raise_errors: bool = False,
+                       inline: bool = False) -> Tuple[str, dict]:
+    """
+    OCR the frames of a (possibly multi-page) TIFF chosen by the page-selection
+    policy. Frames are decoded lazily, one per pool task, and the text is joined in
+    frame order. Returns (text, ocr_metadata); failures return empty text unless
+    *raise_errors* is set.
+    """
+    meta: dict = {"page_count": 0, "pages": []}
+    try:
+        with Image.open(tiff_path) as im:
+            frame_count = getattr(im, "n_frames", 1)
+        meta["page_count"] = frame_count
+        frames = select_pages(frame_count)
+        if not frames:
+            return "", meta
+
+        logger.debug(f"OCR'ing TIFF frames {frames} of {frame_count}")
+        results = _ocr_pool_map(
+            _ocr_tiff_frame, [tiff_path] * len(frames), frames, inline=inline
+        )
+        texts = []
+        for f, (text, conf, passes) in zip(frames, results):
+            texts.append(text)
+            meta["pages"].append(
+                {"page": f, "method": "ocr", "confidence": round(conf, 1), "passes": passes}
+            )
+        return "\n".join(texts), _summarize_confidence(meta)
+    except BrokenProcessPool:
+        raise
+    except Exception as e:
+        if raise_errors:
+            raise
+        logger.exception(f"TIFF decode error: {e}")
+        return "", meta
+
+
+def perform_ocr_with_metadata(s3_key: str, raise_errors: bool = False,
+                              inline: bool = False) -> Tuple[str, dict]:
+    """
+    Fetch *s3_key* and extract its text. Returns (text, ocr_metadata).
+    Raises SourceTooLargeError for objects over OCR_MAX_OBJECT_BYTES, and
+    BrokenProcessPool if the OCR pool died mid-document. Other failures return empty
+    text unless *raise_errors* is set, in which case they propagate.
+    """
+    logger.info(f"▶ Fetching and OCR’ing: {s3_key}")
+    empty = {"page_count": 0, "pages": []}
+    try:
+        with fetch_s3_object(s3_key) as source:
+            if not source.size:
+                return "", empty
+
+            # Byte-identical sources (forwarded chains, repeat uploads) reuse earlier results
+            cached = ocr_cache.lookup(source.sha256)
+            if cached is not None:
+                text, meta = cached
+                meta["cache_hit"] = True
+                return text, meta
+
+            ext = os.path.splitext(s3_key)[1].lower()
+            if ext == ".pdf":
+                text, meta = ocr_from_pdf_path(source.path, raise_errors, inline)
+            elif _is_tiff(s3_key, source):
+                # cv2.imdecode would only read the first frame of a fax TIFF
+                text, meta = ocr_from_tiff_path(source.path, raise_errors, inline)
+            else:
+                text, meta = ocr_from_image_buffer(source.buffer, raise_errors)
+            ocr_cache.store(source.sha256, source.size, text, meta)
+            return text, meta
+    except (SourceTooLargeError, BrokenProcessPool):
+        raise
+    except Exception as e:
+        if raise_errors:
+            raise
+        logger.exception(f"Failed to fetch S3 object: {e}")
+        return "", empty
+
+
+def perform_ocr(s3_key: str, inline: bool = False) -> str:
+    """
+    Text of *s3_key*. Callers outside the pipeline workers (the API, the email worker)
+    pass inline=True so pages are OCR'd in the calling thread instead of starting an
+    OCR_POOL_SIZE process pool in their process.
+    """
+    return perform_ocr_with_metadata(s3_key, inline=inline)[0]
 
 
 def sanitize_classification(raw: dict) -> dict:
@@ -114,131 +594,450 @@ def sanitize_classification(raw: dict) -> dict:
     }
 
 
-def process_document(ch, method, properties, body):
-    logger.info(f"▶ Received message: {body}")
-    db = SessionLocal()
-    try:
-        msg = json.loads(body)
-        doc_id = msg.get("doc_id")
-        s3_key = msg.get("s3_key")
-        logger.info(f"🔍 Processing doc_id={doc_id}, s3_key={s3_key}")
+def _has_placeholder_metadata(document: Document1) -> bool:
+    return (
+        document.account_number == "XXXX"
+        and document.policyholder_name == "XXXX"
+        and document.policy_number == "XXXX"
+        and document.claim_number == "XXXX"
+    )
 
-        # 1) OCR
-        extracted_text = perform_ocr(s3_key)
 
-        # 2) Classification
-        raw_cls = classify_document(extracted_text)
-        cls = sanitize_classification(raw_cls)
-        logger.info(f"🤖 Classification: {cls}")
-
-        if cls["summary"]:
-            cls["summary"] = mask_pii(cls["summary"])
-            logger.debug("🔒 PII masked in summary")
-
-        # 3) Fetch & update Document1 record
-        document = db.get(Document1, doc_id)
-        if not document:
-            logger.warning(f"Document not found: {doc_id}")
-            ch.basic_ack(delivery_tag=method.delivery_tag)
-            return
+# Checkpoints in pipeline order; each stage advances a document from the one before it
+PIPELINE_STAGES = (None, "ocr_done", "classified", "routed")
 
-        # Always update OCR text
-        document.extracted_text = extracted_text
-
-        # Only extract metadata if still default placeholders
-        if (
-            document.account_number == "XXXX"
-            and document.policyholder_name == "XXXX"
-            and document.policy_number == "XXXX"
-            and document.claim_number == "XXXX"
-        ):
-            metadata = extract_metadata("", "", extracted_text)
-            logger.info(f"🔑 Extracted metadata: {metadata}")
-            document.account_number    = metadata.get("account_number", "XXXX")
-            document.policyholder_name = metadata.get("policyholder_name", "XXXX")
-            document.policy_number     = metadata.get("policy_number", "XXXX")
-            document.claim_number      = metadata.get("claim_number", "XXXX")
-
-        # 4) Update classification fields
-        document.department   = cls["department"]
-        document.category     = cls["category"]
-        document.subcategory  = cls["subcategory"]
-        document.summary      = cls["summary"]
-        document.action_items = cls["action_items"]
-
-        # 5) Routing / copy
-        logger.info("📦 Running destination service")
-        success, error_msg, dest_bucket, dest_key = process_document_destination(
-            document, db, s3_client, SOURCE_BUCKET
-        )
-        if success:
-            document.destination_bucket = dest_bucket
-            document.destination_key   = dest_key
-            document.status            = "Processed"
-            document.error_message     = None
-            logger.info(f"✅ Copied to {dest_bucket}/{dest_key}")
-        else:
-            document.status = (
-                "No Destination"
-                if error_msg.startswith("No matching")
-                else "Failed"
-            )
-            document.error_message = error_msg
-            logger.warning(f"⚠ Destination failed: {error_msg}")
+# Queue of the stage that picks a document up after each checkpoint
+NEXT_STAGE_QUEUE = {"ocr_done": CLASSIFY_QUEUE, "classified": ROUTE_QUEUE}
 
-        db.commit()
-        logger.info(f"✔ DocID={doc_id} status={document.status}")
 
-        # Broadcast new document event after commit
+class StageAlreadyDone(Exception):
+    """
+    Another delivery of the same message checkpointed this stage first.
+    """
+
+
+def _stage_done(document: Document1, done_stage: str) -> bool:
+    stage = document.pipeline_stage if document.pipeline_stage in PIPELINE_STAGES else None
+    return PIPELINE_STAGES.index(stage) >= PIPELINE_STAGES.index(done_stage)
+
+
+def _checkpoint(db, document: Document1, done_stage: str) -> None:
+    """
+    Compare-and-set the document's pipeline_stage from the preceding stage to
+    *done_stage* inside the stage's transaction. The UPDATE row-locks the document, so
+    of two concurrent deliveries only the first to commit moves it; the other matches
+    no row and raises StageAlreadyDone, and its transaction (outbox message included)
+    is rolled back.
+    """
+    previous = PIPELINE_STAGES[PIPELINE_STAGES.index(done_stage) - 1]
+    result = db.execute(
+        update(Document1)
+        .where(Document1.id == document.id)
+        .where(Document1.pipeline_stage.is_not_distinct_from(previous))
+        .values(pipeline_stage=done_stage, stage_started_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        raise StageAlreadyDone(f"DocID={document.id} is already past {previous or 'ingestion'}")
+    document.pipeline_stage = done_stage
+
+
+def _mark_picked_up(db, doc_ids: List[int]) -> None:
+    """
+    Stamp stage_started_at on documents a worker is starting a stage for, committed
+    right away, so the stuck-document sweeper can tell work in progress from a lost
+    message. updated_at is kept: a pickup is not progress.
+    """
+    db.execute(
+        update(Document1)
+        .where(Document1.id.in_(doc_ids))
+        .values(stage_started_at=func.now(), updated_at=Document1.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def _enqueue_stage(db, queue_name: str, doc_id: int) -> None:
+    """
+    Hand the document to the next stage via the outbox, in the same transaction as
+    the checkpoint that completes this stage. Inside a batch the row is buffered
+    under INGEST_BATCH_ROUTING_KEY instead, for _run_batch to coalesce with the rest
+    of the batch (or the outbox publisher, if the batch never finishes).
+    """
+    forward = db.info.get("batch_forward")
+    if forward is None:
+        db.add(MessageOutbox(exchange="", routing_key=queue_name, payload={"doc_id": doc_id}))
+        return
+    row = MessageOutbox(
+        exchange="", routing_key=INGEST_BATCH_ROUTING_KEY,
+        payload={"doc_id": doc_id, "queue": queue_name},
+    )
+    db.add(row)
+    db.flush()
+    forward.append(row.id)
+
+
+def _run_batch(stage_name: str, stage_fn, queue_name: str, done_stage: str,
+               doc_ids: List[int], prepare_batch=None) -> None:
+    """
+    Run *stage_fn* for each document of a batch message, one transaction per document,
+    then forward the documents that completed as a single batch message per next queue.
+    Each document's forward is buffered in the outbox by its own checkpoint transaction
+    and coalesced here, so a crash mid-batch strands nothing. Documents already at
+    *done_stage* (a redelivered batch) are forwarded again; stages skip duplicates.
+    A document that fails leaves the batch and is re-queued on its own (OCR: to its
+    priority lane), so one bad document doesn't redo (or block) the rest.
+    Documents are marked picked up as their own turn starts, so ones still waiting
+    behind a long batch don't look abandoned to the sweeper; a *prepare_batch* step
+    works on every document, so all of them are marked for it.
+    """
+    logger.info(f"▶ [{stage_name}] Batch of {len(doc_ids)} document(s)")
+    extra = {}
+    if prepare_batch:
+        db = SessionLocal()
         try:
-            asyncio.create_task(
-                manager.broadcast({"type": "new_document", "document_id": document.id})
-            )
+            _mark_picked_up(db, doc_ids)
+        finally:
+            db.close()
+        extra = prepare_batch(doc_ids)
+    buffered: List[int] = []
+    already_done: List[int] = []
+    failed: List[Tuple[str, dict]] = []
+    for doc_id in doc_ids:
+        db = SessionLocal()
+        db.info["batch_forward"] = outbox_ids = []
+        # Until the document is loaded its lane is unknown; fall back to the stage queue
+        requeue = (queue_name, {"doc_id": doc_id})
+        try:
+            document = db.get(Document1, doc_id)
+            if not document:
+                logger.warning(f"[{stage_name}] Document not found: {doc_id}")
+                continue
+            if _stage_done(document, done_stage):
+                logger.info(f"⏭ [{stage_name}] DocID={doc_id} already {document.pipeline_stage}")
+                if document.pipeline_stage == done_stage:
+                    already_done.append(doc_id)
+                continue
+            if queue_name in LANE_QUEUES:
+                lane = document.priority_lane
+                requeue = (lane_queue(lane), {"doc_id": doc_id, "lane": lane})
+            _mark_picked_up(db, [doc_id])
+            stage_fn(db, document, {"doc_id": doc_id, **extra.get(doc_id, {})})
+            buffered.extend(outbox_ids)
+        except StageAlreadyDone as e:
+            logger.info(f"⏭ [{stage_name}] {e}")
+            db.rollback()
+        except PermanentError as e:
+            logger.error(f"🛑 [{stage_name}] DocID={doc_id} failed permanently in batch: {e}")
+            db.rollback()
+            mark_dead_lettered(json.dumps({"doc_id": doc_id}).encode(), str(e))
         except Exception as e:
-            logger.exception(f"Failed to broadcast WebSocket message: {e}")
+            logger.exception(f"🛑 [{stage_name}] DocID={doc_id} failed in batch: {e}")
+            db.rollback()
+            failed.append(requeue)
+        finally:
+            db.close()
 
-        # 6) Acknowledge RabbitMQ
-        ch.basic_ack(delivery_tag=method.delivery_tag)
+    db = SessionLocal()
+    try:
+        # Rows the outbox publisher is flushing (or has flushed) already are skipped
+        rows = db.execute(
+            select(MessageOutbox)
+            .where(MessageOutbox.id.in_(buffered), MessageOutbox.sent_at == None)
+            .with_for_update(skip_locked=True)
+        ).scalars().all() if buffered else []
+        forward: Dict[str, List[int]] = {}
+        for row in rows:
+            forward.setdefault(row.payload["queue"], []).append(row.payload["doc_id"])
+            db.delete(row)
+        if already_done and done_stage in NEXT_STAGE_QUEUE:
+            forward.setdefault(NEXT_STAGE_QUEUE[done_stage], []).extend(already_done)
+        for next_queue, ids in forward.items():
+            db.add(MessageOutbox(exchange="", routing_key=next_queue, payload={"doc_ids": ids}))
+        for requeue_to, payload in failed:
+            db.add(MessageOutbox(exchange="", routing_key=requeue_to, payload=payload))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    logger.info(
+        f"✔ [{stage_name}] Batch done: {sum(map(len, forward.values()))} forwarded, "
+        f"{len(failed)} re-queued individually"
+    )
 
-        # 7) Fire off notification in background
+
+def _stage_handler(stage_name: str, stage_fn, queue_name: str, done_stage: str,
+                   prepare_batch=None):
+    """
+    Wrap a stage body with the session and error handling shared by every stage.
+    Returning normally acks the message; raising sends it through the consumer's
+    delayed retries, and PermanentError straight to the dead-letter queue.
+    A document already at or past *done_stage* (a redelivery or duplicate) is acked
+    without redoing any work.
+    Messages carrying "doc_ids" (batch-mode ingestion) are run through _run_batch.
+    """
+    @functools.wraps(stage_fn)
+    def handler(body: bytes) -> None:
+        logger.info(f"▶ [{stage_name}] Received message: {body}")
+        msg = json.loads(body)
+        if "doc_ids" in msg:
+            _run_batch(stage_name, stage_fn, queue_name, done_stage, msg["doc_ids"], prepare_batch)
+            return
+        db = SessionLocal()
         try:
-            threading.Thread(
-                target=notify_document,
-                args=(doc_id, False),  # overridden=False
-                daemon=True
-            ).start()
+            document = db.get(Document1, msg.get("doc_id"))
+            if not document:
+                logger.warning(f"[{stage_name}] Document not found: {msg.get('doc_id')}")
+                return
+            if _stage_done(document, done_stage):
+                logger.info(f"⏭ [{stage_name}] DocID={document.id} already {document.pipeline_stage}")
+                return
+            _mark_picked_up(db, [document.id])
+            stage_fn(db, document, msg)
+        except StageAlreadyDone as e:
+            logger.info(f"⏭ [{stage_name}] {e}")
+            db.rollback()
+        except SQLAlchemyError as db_err:
+            logger.exception(f"🛑 [{stage_name}] DB Error: {db_err}")
+            db.rollback()
+            raise
         except Exception as e:
-            logger.exception(f"Failed to spawn notification thread: {e}")
+            logger.exception(f"🛑 [{stage_name}] Unexpected error: {e}")
+            db.rollback()
+            raise
+        finally:
+            db.close()
 
-    except SQLAlchemyError as db_err:
-        logger.exception(f"🛑 DB Error: {db_err}")
-        db.rollback()
-        ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+    return handler
+
+
+# Source files no retry will ever read
+_UNREADABLE_SOURCE_ERRORS = (
+    UnreadableSourceError, PDFPageCountError, PDFSyntaxError, UnidentifiedImageError
+)
+
+
+def _ocr_stage(db, document: Document1, msg: dict) -> None:
+    """
+    Stage 1 (CPU-bound): fetch the source from S3 and extract its text.
+    """
+    s3_key = msg.get("s3_key") or document.s3_key
+    logger.info(f"🔍 OCR doc_id={document.id}, s3_key={s3_key}")
+    if document.processing_started_at is None:
+        # Queue wait per priority lane is measured up to the first pickup
+        document.processing_started_at = datetime.datetime.now(datetime.timezone.utc)
+    try:
+        extracted_text, ocr_metadata = perform_ocr_with_metadata(s3_key, raise_errors=True)
+    except SourceTooLargeError as e:
+        # Retrying can't help; fail the document instead of the worker
+        logger.warning(f"⚠ DocID={document.id}: {e}")
+        document.status        = "Failed"
+        document.error_message = str(e)
+        db.commit()
+        return
+    except _UNREADABLE_SOURCE_ERRORS as e:
+        raise PermanentError(f"Unreadable source {s3_key}: {e}") from e
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+            raise PermanentError(f"Source object {s3_key} does not exist") from e
+        raise
+
+    document.extracted_text = extracted_text
+    document.ocr_metadata   = ocr_metadata
+    document.ocr_confidence = ocr_metadata.get("mean_confidence")
+    document.ocr_passes     = ocr_metadata.get("passes")
+    _checkpoint(db, document, "ocr_done")
+    _enqueue_stage(db, CLASSIFY_QUEUE, document.id)
+    db.commit()
+    logger.info(f"✔ DocID={document.id} OCR checkpoint saved")
+
+
+def _classify_stage(db, document: Document1, msg: dict) -> None:
+    """
+    Stage 2 (LLM-bound): classify the extracted text and pull out metadata.
+    """
+    extracted_text = document.extracted_text or ""
+
+    # Batches arrive with the classification already done in one batched LLM call
+    raw_cls = msg.get("classification")
+    if raw_cls is None:
+        raw_cls = classify_document(extracted_text)
+    cls = sanitize_classification(raw_cls)
+    logger.info(f"🤖 Classification: {cls}")
+
+    if cls["summary"]:
+        cls["summary"] = mask_pii(cls["summary"])
+        logger.debug("🔒 PII masked in summary")
+
+    # Only extract metadata if still default placeholders
+    if _has_placeholder_metadata(document):
+        metadata = extract_metadata("", "", extracted_text)
+        logger.info(f"🔑 Extracted metadata: {metadata}")
+        document.account_number    = metadata.get("account_number", "XXXX")
+        document.policyholder_name = metadata.get("policyholder_name", "XXXX")
+        document.policy_number     = metadata.get("policy_number", "XXXX")
+        document.claim_number      = metadata.get("claim_number", "XXXX")
+
+    document.department   = cls["department"]
+    document.category     = cls["category"]
+    document.subcategory  = cls["subcategory"]
+    document.summary      = cls["summary"]
+    document.action_items = cls["action_items"]
+    _checkpoint(db, document, "classified")
+    _enqueue_stage(db, ROUTE_QUEUE, document.id)
+    db.commit()
+    logger.info(f"✔ DocID={document.id} classification checkpoint saved")
+
+
+def _route_stage(db, document: Document1, msg: dict) -> None:
+    """
+    Stage 3 (S3/DB-bound): copy to the destination and persist the final status.
+    """
+    logger.info("📦 Running destination service")
+    success, error_msg, dest_bucket, dest_key = process_document_destination(
+        document, db, s3_client, SOURCE_BUCKET
+    )
+    if success:
+        document.destination_bucket = dest_bucket
+        document.destination_key   = dest_key
+        document.status            = "Processed"
+        document.error_message     = None
+        logger.info(f"✅ Copied to {dest_bucket}/{dest_key}")
+    else:
+        document.status = (
+            "No Destination"
+            if error_msg.startswith("No matching")
+            else "Failed"
+        )
+        document.error_message = error_msg
+        logger.warning(f"⚠ Destination failed: {error_msg}")
+
+    _checkpoint(db, document, "routed")
+    db.commit()
+    logger.info(f"✔ DocID={document.id} status={document.status}")
+
+    # Broadcast new document event after commit
+    try:
+        asyncio.create_task(
+            manager.broadcast({"type": "new_document", "document_id": document.id})
+        )
+    except Exception as e:
+        logger.exception(f"Failed to broadcast WebSocket message: {e}")
 
+    # Fire off notification in background
+    try:
+        threading.Thread(
+            target=notify_document,
+            args=(document.id, False),  # overridden=False
+            daemon=True
+        ).start()
     except Exception as e:
-        logger.exception(f"🛑 Unexpected error: {e}")
-        db.rollback()
-        ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+        logger.exception(f"Failed to spawn notification thread: {e}")
 
+
+def _prepare_classify_batch(doc_ids: List[int]) -> Dict[int, dict]:
+    """
+    Classify a whole batch up front with batched LLM calls. Documents not waiting for
+    classification (redelivered batches) are left out, so they cost no LLM call.
+    """
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(Document1.id, Document1.extracted_text)
+              .filter(Document1.id.in_(doc_ids), Document1.pipeline_stage == "ocr_done")
+              .all()
+        )
+    finally:
+        db.close()
+    texts = {row.id: row.extracted_text or "" for row in rows}
+    ids = [doc_id for doc_id in doc_ids if doc_id in texts]
+    results = classify_documents([texts[doc_id] for doc_id in ids])
+    return {doc_id: {"classification": raw} for doc_id, raw in zip(ids, results)}
+
+
+def mark_dead_lettered(body: bytes, error: str) -> None:
+    """
+    on_dead_letter hook: fail the message's documents so they don't sit in a stage
+    forever. Replaying the message from the DLQ reprocesses them.
+    """
+    msg = json.loads(body)
+    doc_ids = msg.get("doc_ids") or [msg.get("doc_id")]
+    db = SessionLocal()
+    try:
+        (
+            db.query(Document1)
+              .filter(Document1.id.in_(doc_ids), Document1.status != "Processed")
+              .update(
+                  {"status": "Failed", "error_message": f"Dead-lettered: {error}"[:1000]},
+                  synchronize_session=False,
+              )
+        )
+        db.commit()
     finally:
         db.close()
+    logger.warning(f"☠ Dead-lettered doc(s) {doc_ids}: {error}")
 
 
-def start_ocr_worker():
-    conn = get_rabbitmq_connection()
-    ch   = conn.channel()
-    queue_name = "document_queue"
+process_ocr_stage      = _stage_handler("ocr", _ocr_stage, DOCUMENT_QUEUE, "ocr_done")
+process_classify_stage = _stage_handler(
+    "classify", _classify_stage, CLASSIFY_QUEUE, "classified",
+    prepare_batch=_prepare_classify_batch,
+)
+process_route_stage    = _stage_handler("route", _route_stage, ROUTE_QUEUE, "routed")
 
-    ch.queue_declare(queue=queue_name, durable=True)
-    ch.basic_qos(prefetch_count=1)
-    ch.basic_consume(
-        queue=queue_name,
-        on_message_callback=process_document
-    )
+# stage name → (queue or priority lanes, handler, concurrent handlers per worker process)
+STAGES = {
+    "ocr":      (LANE_QUEUES, process_ocr_stage, OCR_WORKER_CONCURRENCY),  # priority lanes
+    "classify": (CLASSIFY_QUEUE, process_classify_stage, CLASSIFY_WORKER_CONCURRENCY),
+    "route":    (ROUTE_QUEUE, process_route_stage, ROUTE_WORKER_CONCURRENCY),
+}
 
-    logger.info("🚀 OCR Worker started, waiting for messages…")
-    ch.start_consuming()
+
+def start_ocr_worker(stage: str = "all"):
+    """
+    Consume one pipeline stage, or every stage (each on its own connection and
+    thread) when *stage* is "all".
+    """
+    names = list(STAGES) if stage == "all" else [stage]
+    consumers = []
+    for name in names:
+        queue_name, handler, concurrency = STAGES[name]
+        consumers.append(PooledConsumer(
+            queue_name, handler, concurrency=concurrency, on_dead_letter=mark_dead_lettered
+        ))
+
+    def _shutdown(signum, frame):
+        # SIGTERM (docker stop, autoscaler scale-down): stop taking deliveries and let
+        # in-flight documents finish; anything unacked is redelivered to other workers
+        logger.info(f"🛑 Signal {signum}: draining in-flight documents, then exiting")
+        for c in consumers:
+            c.stop()
+
+    signal.signal(signal.SIGTERM, _shutdown)
+
+    logger.info(f"🚀 OCR Worker started for stage(s) {names}, waiting for messages…")
+    if len(consumers) == 1:
+        consumers[0].run()
+        return
+
+    threads = [
+        threading.Thread(target=c.run, name=f"{c.queue_name}-consumer", daemon=True)
+        for c in consumers
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
 
 
 if __name__ == "__main__":
-    start_ocr_worker()
+    parser = argparse.ArgumentParser(description="Document pipeline worker")
+    parser.add_argument(
+        "--stage",
+        choices=["all", *STAGES],
+        default=os.getenv("PIPELINE_STAGE", "all"),
+        help="pipeline stage to consume (default: all)",
+    )
+    start_ocr_worker(parser.parse_args().stage)
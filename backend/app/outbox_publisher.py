@@ -1,69 +1,280 @@
 import time
 import json
+import select as _select
 import logging
 import datetime
+from typing import Dict, List, Optional
 
-import pika
 from sqlalchemy import select
 
-from .config import RABBITMQ_URL, OUTBOX_POLL_INTERVAL
-from .database import SessionLocal
+from .config import (
+    OUTBOX_POLL_INTERVAL,
+    OUTBOX_SWEEP_INTERVAL,
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_PUBLISHER_MODE,
+    OUTBOX_CONFIRM_TIMEOUT,
+    OUTBOX_RETENTION_INTERVAL,
+    SWEEPER_INTERVAL,
+    INGEST_BATCH_SIZE,
+    INGEST_BATCH_MAX_WAIT,
+)
+from .database import SessionLocal, engine
 from .models import MessageOutbox
-from .rabbitmq import get_rabbitmq_connection
+from .rabbitmq import INGEST_BATCH_ROUTING_KEY, buffer_target
+from .confirm_publisher import BlockingPublisher, ConfirmPublisher
+from .outbox_retention import run_retention
+from .pipeline_sweeper import run_sweeper
 
 # ─────────────────────────────────── Setup Logging ─────────────────────────────────────────
 logger = logging.getLogger("outbox_publisher")
 logging.basicConfig(level=logging.INFO)
 
+# Channel the message_outbox insert trigger notifies (see the outbox_notify migration)
+OUTBOX_NOTIFY_CHANNEL = "message_outbox"
+
+
+def _age_seconds(created_at: datetime.datetime) -> float:
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=datetime.timezone.utc)
+    return (datetime.datetime.now(datetime.timezone.utc) - created_at).total_seconds()
+
+
+def flush_ingest_batches(session, publisher) -> Optional[float]:
+    """
+    Coalesce documents buffered by batch-mode ingestion (or left buffered by a batch
+    stage that didn't finish) into {"doc_ids": [...]} messages, one per priority lane or
+    next-stage queue. A batch goes out once INGEST_BATCH_SIZE documents are waiting
+    or the oldest has waited INGEST_BATCH_MAX_WAIT seconds. Rows are claimed with
+    FOR UPDATE SKIP LOCKED, so concurrent publishers never coalesce the same document.
+    Returns the seconds until the documents still buffered are due, or None if nothing
+    is left buffered.
+    """
+    stmt = (
+        select(MessageOutbox)
+        .where(MessageOutbox.sent_at == None, MessageOutbox.routing_key == INGEST_BATCH_ROUTING_KEY)
+        .order_by(MessageOutbox.id)
+        .limit(INGEST_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    while True:
+        batch = session.execute(stmt).scalars().all()
+        if not batch:
+            session.rollback()
+            return None
+        wait_left = INGEST_BATCH_MAX_WAIT - _age_seconds(batch[0].created_at)
+        if len(batch) < INGEST_BATCH_SIZE and wait_left > 0:
+            session.rollback()  # not due yet; release the claimed rows
+            return wait_left
+
+        # One message per priority lane, so bulk sources don't carry UI uploads with them
+        lanes: Dict[str, List[int]] = {}
+        for r in batch:
+            lanes.setdefault(buffer_target(r.payload), []).append(r.payload["doc_id"])
+        results = publisher.publish_batch([
+            (queue_name, '', queue_name, json.dumps({"doc_ids": doc_ids}))
+            for queue_name, doc_ids in lanes.items()
+        ])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        failed = 0
+        for r in batch:
+            error = results.get(buffer_target(r.payload), "no publish result")
+            if error is None:
+                r.sent_at = now
+                r.error = None
+            else:
+                r.error = error
+                failed += 1
+        session.commit()
+        if failed:
+            logger.error("Failed to publish %d/%d of an ingest batch", failed, len(batch))
+            return OUTBOX_POLL_INTERVAL
+        logger.info(
+            "Published ingest batch of %d document(s) in %d lane(s) (outbox ids %s-%s)",
+            len(batch), len(lanes), batch[0].id, batch[-1].id,
+        )
+
+
+def claim_batch(session, batch_size: int) -> List[MessageOutbox]:
+    """
+    Lock up to *batch_size* of the oldest unsent rows for this transaction. Rows another
+    publisher has already claimed are skipped, so replicas share the backlog without
+    publishing the same row twice.
+    """
+    stmt = (
+        select(MessageOutbox)
+        .where(
+            MessageOutbox.sent_at == None,
+            MessageOutbox.routing_key != INGEST_BATCH_ROUTING_KEY,
+        )
+        .order_by(MessageOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    return session.execute(stmt).scalars().all()
+
+
+def publish_pending(session, publisher, batch_size: int = OUTBOX_BATCH_SIZE) -> Optional[float]:
+    """
+    Publish unsent outbox rows in claimed batches of *batch_size*, marking each batch
+    with a single commit. A row is marked sent only once its publisher confirm has
+    arrived; nacked or timed-out rows keep sent_at NULL with the error recorded and are
+    retried on a later pass. A batch with a failed publish ends the pass, so a broker
+    outage doesn't spin on the same rows. Returns the seconds until buffered batch-mode
+    documents are due (see flush_ingest_batches), or None.
+    """
+    batch_due_in = flush_ingest_batches(session, publisher)
+
+    while True:
+        batch = claim_batch(session, batch_size)
+        if not batch:
+            session.rollback()
+            break
+
+        results = publisher.publish_batch([
+            (msg.id, msg.exchange or '', msg.routing_key, json.dumps(msg.payload))
+            for msg in batch
+        ])
+        failed = 0
+        now = datetime.datetime.now(datetime.timezone.utc)
+        for msg in batch:
+            error = results.get(msg.id, "no publish result")
+            if error is None:
+                msg.sent_at = now
+                msg.error = None
+            else:
+                msg.error = error
+                failed += 1
+                logger.error(f"Failed to publish outbox id={msg.id}: {error}")
+        session.commit()
+        logger.info(
+            f"Published {len(batch) - failed}/{len(batch)} outbox message(s) "
+            f"(ids {batch[0].id}-{batch[-1].id})"
+        )
+        if failed or len(batch) < batch_size:
+            break
+    return batch_due_in
+
+
+def connect_publisher():
+    """
+    Open the RabbitMQ publisher selected by OUTBOX_PUBLISHER_MODE: "pipelined" keeps a
+    whole claimed batch in flight and matches confirms by delivery tag, "blocking" waits
+    for each message's confirm in turn.
+    """
+    if OUTBOX_PUBLISHER_MODE == "blocking":
+        return BlockingPublisher()
+    return ConfirmPublisher(confirm_timeout=OUTBOX_CONFIRM_TIMEOUT).start()
+
+
+class OutboxListener:
+    """
+    Dedicated autocommit connection LISTENing on OUTBOX_NOTIFY_CHANNEL. A statement-level
+    trigger on message_outbox notifies on every insert, delivered when the inserting
+    transaction commits, so the publisher wakes within milliseconds of a new message.
+    """
+
+    def __init__(self):
+        self.conn = None
+
+    def connect(self) -> bool:
+        if engine.dialect.name != "postgresql":
+            return False
+        raw = engine.raw_connection()
+        raw.detach()  # keep the LISTEN session out of the pool
+        self.conn = raw.driver_connection
+        self.conn.autocommit = True
+        with self.conn.cursor() as cur:
+            cur.execute(f"LISTEN {OUTBOX_NOTIFY_CHANNEL}")
+        logger.info("Listening for outbox notifications on '%s'", OUTBOX_NOTIFY_CHANNEL)
+        return True
+
+    def wait(self, timeout: float) -> int:
+        """
+        Block until a notification arrives or *timeout* passes; returns how many
+        notifications were drained (0 on timeout).
+        """
+        if _select.select([self.conn], [], [], timeout) == ([], [], []):
+            return 0
+        self.conn.poll()
+        count = len(self.conn.notifies)
+        self.conn.notifies.clear()
+        return count
+
+    def close(self) -> None:
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+            self.conn = None
+
 
 def publish_outbox_messages():
     """
-    Polls the message_outbox table for unsent messages, publishes them to RabbitMQ,
-    and updates their sent_at and error fields accordingly.
+    Publishes unsent message_outbox rows to RabbitMQ and updates their sent_at and
+    error fields. Wakes on Postgres NOTIFY from the outbox insert trigger; a sweep every
+    OUTBOX_SWEEP_INTERVAL seconds is kept as a safety net for missed notifications.
+    Without LISTEN support (non-Postgres databases) it polls every OUTBOX_POLL_INTERVAL.
+    Outbox retention and the stuck-document sweeper run between passes on their own
+    intervals.
     """
-    # Establish RabbitMQ connection
-    try:
-        conn = get_rabbitmq_connection()
-        channel = conn.channel()
-        # Ensure publisher confirms when possible
-        channel.confirm_delivery()
-        logger.info("Connected to RabbitMQ for outbox publishing.")
-    except Exception as e:
-        logger.exception("Failed to connect to RabbitMQ: %s", e)
-        return
+    publisher = None
+    listener = OutboxListener()
+    listening = False
+    last_retention = 0.0
+    last_sweep = 0.0
 
     while True:
+        if publisher is None or not publisher.is_open:
+            if publisher is not None:
+                publisher.close()
+            try:
+                publisher = connect_publisher()
+                logger.info("Connected to RabbitMQ for outbox publishing (%s).", OUTBOX_PUBLISHER_MODE)
+            except Exception as e:
+                logger.exception("Failed to connect to RabbitMQ: %s", e)
+                publisher = None
+                time.sleep(OUTBOX_POLL_INTERVAL)
+                continue
+
+        if not listening:
+            try:
+                listening = listener.connect()
+            except Exception as e:
+                logger.exception("Could not LISTEN for outbox notifications: %s", e)
+                listener.close()
+
+        # LISTEN is (re-)established before each pass, so inserts committed during the
+        # pass are still seen as a pending notification afterwards
+        batch_due_in = None
         session = SessionLocal()
         try:
-            # Fetch unsent messages
-            stmt = select(MessageOutbox).where(MessageOutbox.sent_at == None)
-            msgs = session.execute(stmt).scalars().all()
-            for msg in msgs:
-                try:
-                    body = json.dumps(msg.payload)
-                    properties = pika.BasicProperties(delivery_mode=2)  # persistent
-                    channel.basic_publish(
-                        exchange=msg.exchange or '',
-                        routing_key=msg.routing_key,
-                        body=body,
-                        properties=properties
-                    )
-                    msg.sent_at = datetime.datetime.utcnow()
-                    msg.error = None
-                    logger.info(f"Published outbox id={msg.id} to '{msg.routing_key}'")
-                except Exception as e:
-                    msg.error = str(e)
-                    logger.exception(f"Failed to publish outbox id={msg.id}: {e}")
-                finally:
-                    session.add(msg)
-                    session.commit()
+            batch_due_in = publish_pending(session, publisher)
         except Exception as e:
             logger.exception("Error polling outbox: %s", e)
             session.rollback()
         finally:
             session.close()
 
-        time.sleep(OUTBOX_POLL_INTERVAL)
+        if time.monotonic() - last_retention >= OUTBOX_RETENTION_INTERVAL:
+            run_retention()
+            last_retention = time.monotonic()
+        if time.monotonic() - last_sweep >= SWEEPER_INTERVAL:
+            run_sweeper()
+            last_sweep = time.monotonic()
+
+        timeout = OUTBOX_SWEEP_INTERVAL if listening else OUTBOX_POLL_INTERVAL
+        if batch_due_in is not None:
+            timeout = min(timeout, batch_due_in)
+        if not listening:
+            time.sleep(timeout)
+            continue
+        try:
+            listener.wait(timeout)
+        except Exception as e:
+            logger.warning("Outbox LISTEN connection lost (%s); reconnecting", e)
+            listener.close()
+            listening = False
 
 
 if __name__ == "__main__":
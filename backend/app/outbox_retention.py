@@ -0,0 +1,80 @@
+# backend/app/outbox_retention.py
+
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from .config import (
+    OUTBOX_RETENTION_MODE,
+    OUTBOX_RETENTION_DAYS,
+    OUTBOX_RETENTION_CHUNK,
+)
+from .database import SessionLocal
+
+logger = logging.getLogger("outbox_retention")
+
+# One chunk of old sent rows, claimed with SKIP LOCKED so concurrent runs don't collide
+_CHUNK = """
+    SELECT id FROM message_outbox
+    WHERE sent_at IS NOT NULL AND sent_at < :cutoff
+    ORDER BY sent_at
+    LIMIT :chunk
+    FOR UPDATE SKIP LOCKED
+"""
+
+_ARCHIVE_CHUNK = text(f"""
+    WITH moved AS (
+        DELETE FROM message_outbox
+        WHERE id IN ({_CHUNK})
+        RETURNING id, exchange, routing_key, payload, created_at, sent_at, error
+    )
+    INSERT INTO message_outbox_archive
+        (id, exchange, routing_key, payload, created_at, sent_at, error)
+    SELECT id, exchange, routing_key, payload, created_at, sent_at, error FROM moved
+""")
+
+_DELETE_CHUNK = text(f"DELETE FROM message_outbox WHERE id IN ({_CHUNK})")
+
+
+def purge_sent(db) -> int:
+    """
+    Archive (or delete, per OUTBOX_RETENTION_MODE) sent rows older than
+    OUTBOX_RETENTION_DAYS, committing every OUTBOX_RETENTION_CHUNK rows so locks and
+    transactions stay short. Unsent rows are never touched. Returns rows removed.
+    """
+    stmt = _DELETE_CHUNK if OUTBOX_RETENTION_MODE == "delete" else _ARCHIVE_CHUNK
+    cutoff = datetime.now(timezone.utc) - timedelta(days=OUTBOX_RETENTION_DAYS)
+    removed = 0
+    while True:
+        count = db.execute(stmt, {"cutoff": cutoff, "chunk": OUTBOX_RETENTION_CHUNK}).rowcount
+        db.commit()
+        removed += count
+        if count < OUTBOX_RETENTION_CHUNK:
+            return removed
+
+
+def run_retention() -> int:
+    db = SessionLocal()
+    try:
+        started = time.monotonic()
+        removed = purge_sent(db)
+        if removed:
+            logger.info(
+                "Outbox retention: %s %d sent row(s) older than %d day(s) in %.1fs",
+                "deleted" if OUTBOX_RETENTION_MODE == "delete" else "archived",
+                removed, OUTBOX_RETENTION_DAYS, time.monotonic() - started,
+            )
+        return removed
+    except Exception as e:
+        db.rollback()
+        logger.exception("Outbox retention failed: %s", e)
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_retention()
@@ -0,0 +1,204 @@
+# backend/app/pipeline_sweeper.py
+
+import time
+import logging
+from collections import Counter
+from typing import Dict, List, Sequence
+
+from sqlalchemy import func, insert, text, update
+
+from .config import (
+    STUCK_DOCUMENT_AFTER,
+    SWEEPER_MAX_REDRIVES,
+    SWEEPER_BATCH_SIZE,
+)
+from .database import SessionLocal
+from .models import Document1, MessageOutbox
+from .rabbitmq import (
+    CLASSIFY_QUEUE,
+    LANE_QUEUES,
+    RECOVERABLE_ERRORS,
+    ROUTE_QUEUE,
+    ChannelManager,
+    lane_queue,
+)
+
+logger = logging.getLogger("pipeline_sweeper")
+
+# Queue that resumes a document after its last completed stage. Documents that never
+# finished OCR go to the lowest lane, so a sweep never delays fresh uploads.
+RESUME_QUEUE = {
+    None:         lane_queue("reprocess"),
+    "ocr_done":   CLASSIFY_QUEUE,
+    "classified": ROUTE_QUEUE,
+}
+
+# Queues a document waits in after each checkpoint ('' = before OCR)
+WAITING_QUEUES = {
+    "":           LANE_QUEUES,
+    "ocr_done":   [CLASSIFY_QUEUE],
+    "classified": [ROUTE_QUEUE],
+}
+
+GIVE_UP_MESSAGE = "Stuck in pipeline; gave up after {} re-drive(s)"
+
+# Reused across sweeps for the queue-depth checks
+_channels = ChannelManager()
+
+# Pending documents with no progress for STUCK_DOCUMENT_AFTER seconds, doubled for each
+# earlier re-drive, that are either
+#   - picked up by a worker for their current stage (stage_started_at) and never
+#     checkpointed: the worker died mid-stage, or
+#   - not picked up since their last checkpoint (updated_at; a re-drive bumps it) while
+#     the queues of that stage hold no ready messages: their message is not waiting in
+#     a backlog, so it was lost.
+# Documents with an unsent, non-failing outbox message are still in flight and skipped;
+# a failing message doesn't count. Claimed with SKIP LOCKED so concurrent sweeps don't collide.
+_CLAIM_STUCK = text("""
+    SELECT d.id, d.s3_key, d.pipeline_stage, d.redrive_count
+    FROM documents1 d
+    WHERE d.status = 'Pending'
+      AND (d.pipeline_stage IS NULL OR d.pipeline_stage IN ('ocr_done', 'classified'))
+      AND (
+          d.stage_started_at < now() - make_interval(
+              secs => :stuck_after * power(2, LEAST(d.redrive_count, :max_redrives)))
+          OR (d.stage_started_at IS NULL
+              AND COALESCE(d.pipeline_stage, '') = ANY(:idle_stages)
+              AND d.updated_at < now() - make_interval(
+                  secs => :stuck_after * power(2, LEAST(d.redrive_count, :max_redrives))))
+      )
+      AND NOT EXISTS (
+          SELECT 1 FROM message_outbox o
+          WHERE o.sent_at IS NULL AND o.error IS NULL
+            AND ((o.payload->>'doc_id')::int = d.id
+                 OR (o.payload::jsonb -> 'doc_ids') @> to_jsonb(d.id))
+      )
+    ORDER BY d.updated_at
+    LIMIT :chunk
+    FOR UPDATE OF d SKIP LOCKED
+""")
+
+# Failing single-document messages of re-driven documents, replaced by the re-drive so
+# the document isn't published twice once the broker recovers
+_DROP_FAILING = text("""
+    DELETE FROM message_outbox
+    WHERE id IN (
+        SELECT id FROM message_outbox
+        WHERE sent_at IS NULL AND error IS NOT NULL
+          AND (payload->>'doc_id')::int = ANY(:ids)
+        FOR UPDATE SKIP LOCKED
+    )
+""")
+
+
+def idle_stages() -> List[str]:
+    """
+    Checkpoints ('' before OCR) whose waiting queues currently hold no ready messages,
+    via passive queue_declare on the sweeper's shared channel. If the depths can't be
+    read none are reported idle, so only documents a worker abandoned mid-stage are
+    re-driven.
+    """
+    try:
+        idle = []
+        with _channels.locked_channel() as channel:
+            for stage, queues in WAITING_QUEUES.items():
+                depth = 0
+                for queue_name in queues:
+                    _channels.declare(queue_name)
+                    depth += channel.queue_declare(queue=queue_name, passive=True).method.message_count
+                if depth == 0:
+                    idle.append(stage)
+        return idle
+    except RECOVERABLE_ERRORS as e:
+        logger.warning("Sweeper could not check queue depths (%r)", e)
+        _channels.close()
+        return []
+
+
+def sweep_stuck(db, idle: Sequence[str] = ()) -> Dict[str, int]:
+    """
+    Re-enqueue stuck Pending documents (lost message, worker died mid-stage) through the
+    outbox to the queue of the stage after their last checkpoint, committing every
+    SWEEPER_BATCH_SIZE documents. Documents no worker has picked up are only re-driven
+    for the checkpoints in *idle* (see idle_stages); elsewhere they may still be queued.
+    A document already re-driven SWEEPER_MAX_REDRIVES times is marked Failed instead.
+    Re-delivering work a worker did finish is harmless: stages skip documents already
+    past them. Returns counts per resume queue, plus "failed".
+    """
+    params = {
+        "stuck_after": STUCK_DOCUMENT_AFTER,
+        "max_redrives": SWEEPER_MAX_REDRIVES,
+        "chunk": SWEEPER_BATCH_SIZE,
+        "idle_stages": list(idle),
+    }
+    counts: Counter = Counter()
+    while True:
+        rows = db.execute(_CLAIM_STUCK, params).all()
+        redrive = [r for r in rows if r.redrive_count < SWEEPER_MAX_REDRIVES]
+        give_up = [r.id for r in rows if r.redrive_count >= SWEEPER_MAX_REDRIVES]
+
+        if give_up:
+            db.execute(
+                update(Document1)
+                .where(Document1.id.in_(give_up))
+                .values(
+                    status="Failed",
+                    error_message=GIVE_UP_MESSAGE.format(SWEEPER_MAX_REDRIVES),
+                )
+            )
+            logger.warning("Gave up on stuck document(s) %s", give_up)
+            counts["failed"] += len(give_up)
+
+        if redrive:
+            ids = [r.id for r in redrive]
+            db.execute(_DROP_FAILING, {"ids": ids})
+            db.execute(
+                update(Document1)
+                .where(Document1.id.in_(ids))
+                .values(
+                    redrive_count=Document1.redrive_count + 1,
+                    last_redriven_at=func.now(),
+                    stage_started_at=None,
+                )
+            )
+            messages = []
+            for r in redrive:
+                payload = {"doc_id": r.id}
+                if r.pipeline_stage is None:
+                    payload.update(s3_key=r.s3_key, lane="reprocess")
+                queue_name = RESUME_QUEUE[r.pipeline_stage]
+                messages.append({"exchange": "", "routing_key": queue_name, "payload": payload})
+                counts[queue_name] += 1
+            db.execute(insert(MessageOutbox), messages)
+
+        db.commit()
+        if len(rows) < SWEEPER_BATCH_SIZE:
+            return dict(counts)
+
+
+def run_sweeper() -> Dict[str, int]:
+    db = SessionLocal()
+    try:
+        started = time.monotonic()
+        counts = sweep_stuck(db, idle_stages())
+        if counts:
+            failed = counts.pop("failed", 0)
+            logger.info(
+                "Sweeper: re-drove %d stuck document(s) (%s), failed %d after %d re-drive(s) in %.1fs",
+                sum(counts.values()),
+                ", ".join(f"{q}: {n}" for q, n in sorted(counts.items())) or "none",
+                failed, SWEEPER_MAX_REDRIVES, time.monotonic() - started,
+            )
+            counts["failed"] = failed
+        return counts
+    except Exception as e:
+        db.rollback()
+        logger.exception("Sweeper failed: %s", e)
+        return {}
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_sweeper()
@@ -1,25 +1,256 @@
+import contextlib
+import logging
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
 import pika
-from .config import RABBITMQ_URL
+from pika.exceptions import AMQPConnectionError, ChannelClosed, ChannelWrongStateError
 
+from .config import (
+    RABBITMQ_URL,
+    RABBITMQ_HEARTBEAT,
+    RABBITMQ_RECONNECT_MAX_DELAY,
+    MESSAGE_MAX_ATTEMPTS,
+    MESSAGE_RETRY_BASE_DELAY,
+)
 
-def get_rabbitmq_connection():
+logger = logging.getLogger("rabbitmq")
+
+# Document pipeline queues, one per stage
+DOCUMENT_QUEUE = "document_queue"   # fetch + OCR (fed by ingestion)
+CLASSIFY_QUEUE = "classify_queue"   # LLM classification + metadata extraction
+ROUTE_QUEUE    = "route_queue"      # S3 copy + final status
+
+# Priority lanes of the OCR stage, highest first. Ingestion picks a lane by source; the
+# OCR consumer drains higher lanes first, aging waiting messages so lower lanes still move.
+# The default lane keeps the original queue name, so messages queued before lanes existed
+# are still consumed.
+PRIORITY_LANES = ("ui", "webhook", "backfill", "reprocess")
+DEFAULT_LANE = "webhook"
+
+
+def lane_queue(lane: Optional[str]) -> str:
+    if lane == DEFAULT_LANE or lane not in PRIORITY_LANES:
+        return DOCUMENT_QUEUE
+    return f"{DOCUMENT_QUEUE}.{lane}"
+
+
+LANE_QUEUES = [lane_queue(lane) for lane in PRIORITY_LANES]
+
+# Every queue a pipeline worker consumes (each has retry tiers and a dead-letter queue)
+PIPELINE_QUEUES = (*LANE_QUEUES, CLASSIFY_QUEUE, ROUTE_QUEUE)
+
+# Outbox-only routing key for buffered single-document rows: documents ingested in batch
+# mode, and documents a batch stage forwards (payload "queue" names the next stage's
+# queue). The outbox publisher coalesces these rows into {"doc_ids": [...]} messages
+INGEST_BATCH_ROUTING_KEY = "document_queue.batch"
+
+
+def buffer_target(payload: dict) -> str:
+    """
+    Queue a buffered outbox row is coalesced into: the next stage's queue for a batch
+    stage forward, else the priority lane of an ingested document.
+    """
+    return payload.get("queue") or lane_queue(payload.get("lane"))
+
+
+# Declaration arguments for every queue the app uses. RabbitMQ rejects a redeclare with
+# different arguments (PRECONDITION_FAILED), so all declarations go through declare_queue
+QUEUE_ARGUMENTS: Dict[str, dict] = {queue_name: {} for queue_name in PIPELINE_QUEUES}
+
+# Message header counting how many times a pipeline message has failed
+RETRY_COUNT_HEADER = "x-retry-count"
+
+# Delay (seconds) of each retry tier: base, 2x base, 4x base... one per retry attempt
+RETRY_DELAYS = [MESSAGE_RETRY_BASE_DELAY * 2 ** i for i in range(max(MESSAGE_MAX_ATTEMPTS - 1, 0))]
+
+
+def dead_letter_queue(queue_name: str) -> str:
+    return f"{queue_name}.dlq"
+
+
+def retry_queue(queue_name: str, attempt: int) -> str:
+    """
+    Delay queue for the *attempt*-th retry (1-based). Tiers are named by their delay, so
+    changing MESSAGE_RETRY_BASE_DELAY declares new queues instead of clashing with the
+    x-message-ttl of existing ones.
+    """
+    delay = RETRY_DELAYS[min(attempt, len(RETRY_DELAYS)) - 1]
+    return f"{queue_name}.retry.{delay}s"
+
+
+def queue_family(queue_name: str) -> List[str]:
+    """
+    *queue_name* plus its retry tiers and dead-letter queue, where registered.
+    """
+    names = [queue_name]
+    if dead_letter_queue(queue_name) in QUEUE_ARGUMENTS:
+        names += [f"{queue_name}.retry.{d}s" for d in RETRY_DELAYS]
+        names.append(dead_letter_queue(queue_name))
+    return names
+
+
+def register_retry_queues(queue_name: str) -> None:
+    """
+    Register the delay tiers and dead-letter queue of a work queue. Messages expire out
+    of a tier after its TTL and are dead-lettered straight back onto *queue_name*.
+    """
+    for delay in RETRY_DELAYS:
+        QUEUE_ARGUMENTS[f"{queue_name}.retry.{delay}s"] = {
+            "x-message-ttl": delay * 1000,
+            "x-dead-letter-exchange": "",
+            "x-dead-letter-routing-key": queue_name,
+        }
+    QUEUE_ARGUMENTS[dead_letter_queue(queue_name)] = {}
+
+
+for _queue in PIPELINE_QUEUES:
+    register_retry_queues(_queue)
+
+# Failures after which the connection is dropped and reopened (a broker nack is not one)
+RECOVERABLE_ERRORS = (AMQPConnectionError, ChannelClosed, ChannelWrongStateError, OSError)
+
+
+def connection_parameters() -> pika.URLParameters:
     params = pika.URLParameters(RABBITMQ_URL)
-    # disable AMQP-level heartbeats so pika.BlockingConnection isn't closed by RabbitMQ
-    params.heartbeat = 0
-    # increase the blocked connection timeout to prevent unexpected closures
+    # Heartbeats let both sides notice a dead peer; they are serviced by whichever thread
+    # drives the connection's I/O (start_consuming, process_data_events or the ioloop)
+    params.heartbeat = RABBITMQ_HEARTBEAT
     params.blocked_connection_timeout = 300
-    connection = pika.BlockingConnection(params)
-    return connection
+    return params
 
 
-def publish_message(queue_name: str, message: str):
-    connection = get_rabbitmq_connection()
-    channel = connection.channel()
-    channel.queue_declare(queue=queue_name, durable=True)
-    channel.basic_publish(
-        exchange='',
-        routing_key=queue_name,
-        body=message,
-        properties=pika.BasicProperties(delivery_mode=2)
+def get_rabbitmq_connection():
+    return pika.BlockingConnection(connection_parameters())
+
+
+def connect_with_backoff(stop: Optional[threading.Event] = None):
+    """
+    Open a BlockingConnection, retrying with jittered exponential backoff (capped at
+    RABBITMQ_RECONNECT_MAX_DELAY) until it succeeds or *stop* is set. Returns None if
+    stopped first.
+    """
+    delay = 1.0
+    while stop is None or not stop.is_set():
+        try:
+            return get_rabbitmq_connection()
+        except RECOVERABLE_ERRORS as e:
+            wait = random.uniform(delay / 2, delay)
+            logger.warning("RabbitMQ connection failed (%r); retrying in %.1fs", e, wait)
+            if stop is not None:
+                stop.wait(wait)
+            else:
+                time.sleep(wait)
+            delay = min(delay * 2, RABBITMQ_RECONNECT_MAX_DELAY)
+    return None
+
+
+def declare_queue(channel, queue_name: str):
+    return channel.queue_declare(
+        queue=queue_name, durable=True, arguments=QUEUE_ARGUMENTS.get(queue_name) or None
     )
-    connection.close()
+
+
+class ChannelManager:
+    """
+    Long-lived connection and channel shared by one process. The connection is opened
+    lazily, reopened with backoff after a failure, and each queue is declared once per
+    connection. BlockingConnection is not thread-safe, so every use goes through the
+    manager's lock.
+    """
+
+    def __init__(self, confirm: bool = False):
+        self.confirm = confirm
+        self._lock = threading.RLock()
+        self._conn = None
+        self._channel = None
+        self._declared = set()
+
+    @property
+    def is_open(self) -> bool:
+        return self._channel is not None and self._channel.is_open
+
+    def _open(self):
+        self._reset()
+        self._conn = connect_with_backoff()
+        self._channel = self._conn.channel()
+        if self.confirm:
+            self._channel.confirm_delivery()
+        logger.info("Opened RabbitMQ channel (confirms=%s)", self.confirm)
+
+    def _reset(self) -> None:
+        if self._conn is not None:
+            try:
+                if self._conn.is_open:
+                    self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+        self._channel = None
+        self._declared.clear()
+
+    def channel(self):
+        """
+        Return the open channel, reconnecting if needed. Pending I/O is processed first
+        so heartbeats are answered and a connection the broker has dropped is noticed
+        here rather than on the next publish.
+        """
+        with self._lock:
+            if self.is_open:
+                try:
+                    self._conn.process_data_events(time_limit=0)
+                except RECOVERABLE_ERRORS as e:
+                    logger.warning("RabbitMQ connection lost (%s); reconnecting", e)
+            if not self.is_open:
+                self._open()
+            return self._channel
+
+    @contextlib.contextmanager
+    def locked_channel(self):
+        """
+        Hold the manager's lock for a multi-step operation (basic_get + ack loops).
+        """
+        with self._lock:
+            yield self.channel()
+
+    def declare(self, queue_name: str) -> None:
+        with self._lock:
+            channel = self.channel()
+            if queue_name not in self._declared:
+                declare_queue(channel, queue_name)
+                self._declared.add(queue_name)
+
+    def publish(self, routing_key: str, body, exchange: str = "", properties=None) -> None:
+        """
+        Publish one persistent message, reconnecting and retrying once if the
+        connection turns out to be dead. Publishing to the default exchange declares
+        the target queue first (once per connection).
+        """
+        properties = properties or pika.BasicProperties(delivery_mode=2)
+        with self._lock:
+            for attempt in (1, 2):
+                try:
+                    if not exchange and routing_key in QUEUE_ARGUMENTS:
+                        self.declare(routing_key)
+                    self.channel().basic_publish(
+                        exchange=exchange, routing_key=routing_key, body=body, properties=properties
+                    )
+                    return
+                except RECOVERABLE_ERRORS as e:
+                    if attempt == 2:
+                        raise
+                    logger.warning("Publish on %s failed (%s); reconnecting", routing_key, e)
+                    self._reset()
+
+    def close(self) -> None:
+        with self._lock:
+            self._reset()
+
+
+_publisher = ChannelManager()
+
+
+def publish_message(queue_name: str, message: str):
+    _publisher.publish(queue_name, message)
@@ -12,6 +12,7 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from .. import models, database
+from ..classification_cache import bump_hierarchy_version
 
 router = APIRouter(
     prefix="/doc-hierarchy",
@@ -89,6 +90,7 @@ def create_node(node: HierarchyCreate, db: Session = Depends(get_db)):
     """
     rec = models.DocHierarchy(**node.dict())
     db.add(rec)
+    bump_hierarchy_version(db)
     try:
         db.commit()
         db.refresh(rec)
@@ -117,6 +119,7 @@ def update_node(
     update_data = node.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(rec, field, value)
+    bump_hierarchy_version(db)
 
     try:
         db.commit()
@@ -139,6 +142,7 @@ def delete_node(node_id: int, db: Session = Depends(get_db)):
     if not rec:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Node not found")
     db.delete(rec)
+    bump_hierarchy_version(db)
     db.commit()
 
 
@@ -230,4 +234,7 @@ async def import_tree(
     else:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported file type")
 
+    if imported:
+        bump_hierarchy_version(db)
+        db.commit()
     return {"imported": imported, "skipped": skipped}
@@ -31,6 +31,16 @@ class Document1Out(DocumentOut):
         orm_mode = True
 
 
+class PresignUploadRequest(BaseModel):
+    filename: str
+    content_type: Optional[str] = None
+    method: str = "put"  # "put" (presigned URL) or "post" (presigned form with size limit)
+
+
+class FinalizeUploadRequest(BaseModel):
+    s3_key: str
+
+
 class EmailSettingBase(BaseModel):
     department: str
     email_addresses: str   # Comma-separated list
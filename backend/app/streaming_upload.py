@@ -0,0 +1,227 @@
+# backend/app/streaming_upload.py
+
+import asyncio
+import codecs
+import logging
+from typing import Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+try:
+    import python_multipart as multipart
+    from python_multipart.multipart import parse_options_header
+except ModuleNotFoundError:  # python-multipart < 0.0.13
+    import multipart
+    from multipart.multipart import parse_options_header
+
+from .config import UPLOAD_PART_SIZE, OCR_MAX_OBJECT_BYTES
+
+logger = logging.getLogger("streaming_upload")
+
+
+class UploadStreamError(Exception):
+    """
+    The request body is not a usable single-file multipart upload.
+    """
+    def __init__(self, detail: str, status_code: int = 400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class S3MultipartWriter:
+    """
+    Forwards bytes to an S3 object in UPLOAD_PART_SIZE parts. One part uploads in a
+    worker thread while the next one fills, so memory per upload is bounded at two
+    parts. Uploads smaller than one part become a single put_object.
+    """
+
+    def __init__(self, client, bucket: str, key: str, part_size: int = UPLOAD_PART_SIZE):
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size
+        self.size = 0
+        self._buf = bytearray()
+        self._upload_id: Optional[str] = None
+        self._parts = []
+        self._part_no = 0
+        self._in_flight: Optional[asyncio.Future] = None
+
+    def _upload_part(self, part_no: int, body: bytes) -> None:
+        resp = self.client.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+            PartNumber=part_no, Body=body,
+        )
+        self._parts.append({"PartNumber": part_no, "ETag": resp["ETag"]})
+
+    async def _flush_part(self) -> None:
+        if self._upload_id is None:
+            resp = await run_in_threadpool(
+                self.client.create_multipart_upload, Bucket=self.bucket, Key=self.key
+            )
+            self._upload_id = resp["UploadId"]
+        if self._in_flight is not None:
+            await self._in_flight
+        body = bytes(self._buf[:self.part_size])
+        del self._buf[:self.part_size]
+        self._part_no += 1
+        self._in_flight = asyncio.ensure_future(
+            run_in_threadpool(self._upload_part, self._part_no, body)
+        )
+
+    async def write(self, data: bytes) -> None:
+        self.size += len(data)
+        self._buf += data
+        while len(self._buf) >= self.part_size:
+            await self._flush_part()
+
+    async def close(self) -> int:
+        """
+        Upload whatever is buffered and complete the object; returns its size.
+        """
+        if self._upload_id is None:
+            await run_in_threadpool(
+                self.client.put_object, Bucket=self.bucket, Key=self.key, Body=bytes(self._buf)
+            )
+            self._buf = bytearray()
+            return self.size
+
+        if self._buf:
+            await self._flush_part()
+        await self._in_flight
+        self._in_flight = None
+        await run_in_threadpool(
+            self.client.complete_multipart_upload,
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+            MultipartUpload={"Parts": self._parts},
+        )
+        return self.size
+
+    async def abort(self) -> None:
+        if self._in_flight is not None:
+            try:
+                await self._in_flight
+            except Exception:
+                pass
+        if self._upload_id is not None:
+            try:
+                await run_in_threadpool(
+                    self.client.abort_multipart_upload,
+                    Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+                )
+            except Exception as e:
+                logger.warning("Abort of multipart upload %s failed: %s", self.key, e)
+
+
+class _SingleFileParser:
+    """
+    python-multipart callbacks that pick out the first file part named *field*.
+    Callbacks are synchronous, so file bytes are queued and written by the async loop.
+    """
+
+    def __init__(self, field: str, charset: str):
+        self.field = field
+        self.charset = charset
+        self.filename: Optional[str] = None
+        self.pending = []  # file bytes parsed but not yet written
+        self.file_done = False
+        self._in_file = False
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self) -> None:
+        self._disposition = b""
+        self._in_file = False
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        name = options.get(b"name", b"").decode(self.charset, errors="replace")
+        if name != self.field or b"filename" not in options:
+            return
+        if self.filename is not None:
+            raise UploadStreamError("Only one file may be uploaded per request")
+        self.filename = options[b"filename"].decode(self.charset, errors="replace")
+        self._in_file = True
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self.pending.append(data[start:end])
+
+    def on_part_end(self) -> None:
+        if self._in_file:
+            self.file_done = True
+            self._in_file = False
+
+
+async def stream_upload_to_s3(
+    request: Request,
+    client,
+    bucket: str,
+    key_for: Callable[[str], str],
+    field: str = "file",
+):
+    """
+    Stream the *field* file of a multipart/form-data request straight into S3 at
+    key_for(filename), without buffering the whole body or spooling it to disk.
+    Returns (filename, s3_key, size).
+    """
+    content_type = request.headers.get("content-type", "")
+    _, params = parse_options_header(content_type)
+    if not content_type.startswith("multipart/form-data") or b"boundary" not in params:
+        raise UploadStreamError("Expected multipart/form-data with a file field")
+    charset = params.get(b"charset", b"utf-8").decode("latin-1")
+    try:
+        charset = codecs.lookup(charset).name
+    except LookupError:
+        charset = "latin-1"
+
+    state = _SingleFileParser(field, charset)
+    parser = multipart.MultipartParser(params[b"boundary"], state.callbacks())
+    writer: Optional[S3MultipartWriter] = None
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if state.filename is not None and writer is None:
+                writer = S3MultipartWriter(client, bucket, key_for(state.filename))
+            for data in state.pending:
+                await writer.write(data)
+                if writer.size > OCR_MAX_OBJECT_BYTES:
+                    raise UploadStreamError(
+                        f"File exceeds {OCR_MAX_OBJECT_BYTES} bytes", status_code=413
+                    )
+            state.pending.clear()
+        parser.finalize()
+        if writer is None or not state.file_done:
+            raise UploadStreamError(f"Missing file field '{field}'")
+        size = await writer.close()
+    except BaseException:
+        if writer is not None:
+            await writer.abort()
+        raise
+    return state.filename, writer.key, size
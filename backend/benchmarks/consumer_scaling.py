@@ -0,0 +1,90 @@
+"""
+Measures how PooledConsumer throughput (docs/sec) scales with the number of
+concurrent handlers.
+
+Each synthetic "document" burns a little CPU and then sleeps, standing in for the
+pipeline's stage handlers: CPU-bound OCR (process_ocr_stage), the LLM round trip of
+classification (process_classify_stage) and the S3 copy of routing
+(process_route_stage). Tune --cpu-ms/--io-seconds to model one stage.
+Requires a reachable RabbitMQ at RABBITMQ_URL; uses a throwaway queue.
+
+    cd backend
+    python -m benchmarks.consumer_scaling --messages 200 --concurrency 1,2,4,8,16
+"""
+import argparse
+import threading
+import time
+
+import pika
+
+from app.consumer import PooledConsumer
+from app.rabbitmq import get_rabbitmq_connection
+
+QUEUE = "bench_consumer_scaling"
+
+
+def _publish(n: int) -> None:
+    conn = get_rabbitmq_connection()
+    ch = conn.channel()
+    ch.queue_declare(queue=QUEUE, durable=True)
+    ch.queue_purge(queue=QUEUE)
+    for i in range(n):
+        ch.basic_publish(
+            exchange="",
+            routing_key=QUEUE,
+            body=str(i).encode(),
+            properties=pika.BasicProperties(delivery_mode=2),
+        )
+    conn.close()
+
+
+def _burn(ms: float) -> None:
+    end = time.perf_counter() + ms / 1000.0
+    while time.perf_counter() < end:
+        pass
+
+
+def run_once(messages: int, concurrency: int, io_seconds: float, cpu_ms: float) -> float:
+    _publish(messages)
+    done = 0
+    lock = threading.Lock()
+    finished = threading.Event()
+
+    def handler(body: bytes) -> None:
+        nonlocal done
+        _burn(cpu_ms)
+        time.sleep(io_seconds)
+        with lock:
+            done += 1
+            if done == messages:
+                finished.set()
+
+    consumer = PooledConsumer(QUEUE, handler, concurrency=concurrency)
+    runner = threading.Thread(target=consumer.run, daemon=True)
+    start = time.perf_counter()
+    runner.start()
+    finished.wait()
+    elapsed = time.perf_counter() - start
+    consumer.stop()
+    runner.join()
+    return messages / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--concurrency", default="1,2,4,8,16")
+    parser.add_argument("--io-seconds", type=float, default=0.25, help="simulated I/O wait per doc (LLM call, S3 copy)")
+    parser.add_argument("--cpu-ms", type=float, default=5.0, help="simulated local CPU per doc")
+    args = parser.parse_args()
+
+    print(f"{'N':>4}  {'docs/sec':>10}  {'speedup':>8}")
+    baseline = None
+    for n in (int(x) for x in args.concurrency.split(",")):
+        rate = run_once(args.messages, n, args.io_seconds, args.cpu_ms)
+        baseline = baseline or rate
+        print(f"{n:>4}  {rate:>10.2f}  {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Reproducible synthetic document corpus for OCR benchmarks.
+
+Every document type the pipeline sees in production is represented: digital PDFs
+(real text layer), scanned PDFs (image-only pages), phone photos (large, tilted,
+unevenly lit JPEGs), multi-page fax TIFFs and rotated scans. The same seed always
+produces byte-identical files.
+
+    cd backend
+    python -m benchmarks.corpus ./bench_corpus --docs-per-type 3
+"""
+import argparse
+import os
+import random
+import time
+from typing import Dict, List
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+DOC_TYPES = ("digital_pdf", "scanned_pdf", "phone_jpeg", "multipage_tiff", "rotated_scan")
+
+WORDS = (
+    "policy claim insured premium deductible coverage endorsement liability carrier "
+    "effective expiration declaration vehicle property loss adjuster renewal limit "
+    "occurrence aggregate schedule location inspection payment invoice notice"
+).split()
+
+# PDF metadata timestamps are pinned so output is byte-identical across runs
+_FIXED_DATE = time.strptime("2025-01-01", "%Y-%m-%d")
+
+# Letter page at 200 DPI
+PAGE_W, PAGE_H = 1700, 2200
+
+
+def _font(size: int):
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def _lines(rng: random.Random, n: int) -> List[str]:
+    lines = [
+        f"Policy Number: POL-{rng.randint(100000, 999999)}",
+        f"Account Number: {rng.randint(10000000, 99999999)}",
+        f"Claim Number: CLM-{rng.randint(1000, 9999)}",
+    ]
+    while len(lines) < n:
+        lines.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 9))).capitalize())
+    return lines
+
+
+def _page_image(lines: List[str], scale: float = 1.0) -> Image.Image:
+    w, h = int(PAGE_W * scale), int(PAGE_H * scale)
+    img = Image.new("L", (w, h), 255)
+    draw = ImageDraw.Draw(img)
+    font = _font(int(30 * scale))
+    y = int(120 * scale)
+    for line in lines:
+        draw.text((int(120 * scale), y), line, fill=0, font=font)
+        y += int(52 * scale)
+        if y > h - int(120 * scale):
+            break
+    return img
+
+
+def _scan_noise(img: Image.Image, rng: random.Random) -> Image.Image:
+    arr = np.asarray(img, dtype=np.int16)
+    noise = np.random.default_rng(rng.randint(0, 2**31)).normal(0, 12, arr.shape)
+    return Image.fromarray(np.clip(arr + noise, 0, 255).astype(np.uint8))
+
+
+def _pdf_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def text_pdf(pages: List[List[str]]) -> bytes:
+    """
+    Minimal PDF with a real text layer (Helvetica), one content stream per page.
+    """
+    objects: Dict[int, bytes] = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids, n = [], 4
+    for lines in pages:
+        ops = " ".join(f"({_pdf_escape(l)}) Tj T*" for l in lines)
+        stream = f"BT /F1 12 Tf 16 TL 72 720 Td {ops} ET".encode("latin-1")
+        objects[n] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {n + 1} 0 R >>"
+        ).encode()
+        objects[n + 1] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        kids.append(n)
+        n += 2
+    objects[2] = (
+        f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>"
+    ).encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for i in sorted(objects):
+        offsets[i] = len(out)
+        out += b"%d 0 obj\n" % i + objects[i] + b"\nendobj\n"
+    xref = len(out)
+    size = max(objects) + 1
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    out += b"".join(b"%010d 00000 n \n" % offsets[i] for i in range(1, size))
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref)
+    return bytes(out)
+
+
+def _phone_photo(lines: List[str], rng: random.Random) -> Image.Image:
+    """
+    A 12 MP "photo" of a page: tilted, off-centre, with a lighting gradient and blur.
+    """
+    page = _page_image(lines, scale=1.3).rotate(
+        rng.uniform(-4, 4), expand=True, fillcolor=255
+    )
+    photo = Image.new("L", (4032, 3024), 90)
+    photo.paste(page.resize((int(page.width * 1.1), int(page.height * 1.1))).rotate(90, expand=True),
+                (rng.randint(0, 200), rng.randint(0, 100)))
+    gradient = np.linspace(0.75, 1.05, photo.width)[None, :]
+    arr = np.clip(np.asarray(photo, dtype=np.float32) * gradient, 0, 255).astype(np.uint8)
+    return _scan_noise(Image.fromarray(arr).filter(ImageFilter.GaussianBlur(1.2)), rng).convert("RGB")
+
+
+def generate(out_dir: str, docs_per_type: int = 3, seed: int = 42) -> Dict[str, List[str]]:
+    """
+    Write the corpus under *out_dir*/<doc_type>/ and return {doc_type: [relative keys]}.
+    """
+    rng = random.Random(seed)
+    manifest: Dict[str, List[str]] = {t: [] for t in DOC_TYPES}
+    for doc_type in DOC_TYPES:
+        os.makedirs(os.path.join(out_dir, doc_type), exist_ok=True)
+
+    for i in range(docs_per_type):
+        key = f"digital_pdf/digital_{i}.pdf"
+        pages = [_lines(rng, 40) for _ in range(rng.randint(3, 12))]
+        with open(os.path.join(out_dir, key), "wb") as f:
+            f.write(text_pdf(pages))
+        manifest["digital_pdf"].append(key)
+
+        key = f"scanned_pdf/scanned_{i}.pdf"
+        scans = [_scan_noise(_page_image(_lines(rng, 35)), rng) for _ in range(rng.randint(2, 6))]
+        scans[0].save(os.path.join(out_dir, key), "PDF", resolution=200,
+                      save_all=True, append_images=scans[1:],
+                      creationDate=_FIXED_DATE, modDate=_FIXED_DATE)
+        manifest["scanned_pdf"].append(key)
+
+        key = f"phone_jpeg/photo_{i}.jpg"
+        _phone_photo(_lines(rng, 30), rng).save(os.path.join(out_dir, key), "JPEG", quality=85)
+        manifest["phone_jpeg"].append(key)
+
+        key = f"multipage_tiff/fax_{i}.tif"
+        frames = [_page_image(_lines(rng, 35)).point(lambda p: 255 if p > 128 else 0).convert("1")
+                  for _ in range(rng.randint(3, 8))]
+        frames[0].save(os.path.join(out_dir, key), save_all=True,
+                       append_images=frames[1:], compression="group4", dpi=(200, 200))
+        manifest["multipage_tiff"].append(key)
+
+        key = f"rotated_scan/rotated_{i}.png"
+        angle = rng.choice([rng.uniform(-6, 6), 90.0, 180.0])
+        _scan_noise(_page_image(_lines(rng, 35)), rng).rotate(
+            angle, expand=True, fillcolor=255
+        ).save(os.path.join(out_dir, key))
+        manifest["rotated_scan"].append(key)
+
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("out_dir")
+    parser.add_argument("--docs-per-type", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    manifest = generate(args.out_dir, args.docs_per_type, args.seed)
+    for doc_type, keys in manifest.items():
+        print(f"{doc_type:<16} {len(keys)} file(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+A directory-backed stand-in for the subset of the boto3 S3 client that the OCR
+path uses (get_object with a streaming Body), so benchmarks measure OCR rather
+than network transfer.
+"""
+import os
+
+
+class _Body:
+    def __init__(self, path: str):
+        self._f = open(path, "rb")
+
+    def iter_chunks(self, chunk_size: int = 1024 * 1024):
+        while True:
+            chunk = self._f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self, amt=None) -> bytes:
+        return self._f.read() if amt is None else self._f.read(amt)
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class LocalS3:
+    def __init__(self, root: str):
+        self.root = root
+
+    def get_object(self, Bucket: str, Key: str) -> dict:
+        path = os.path.join(self.root, Key)
+        return {"Body": _Body(path), "ContentLength": os.path.getsize(path)}
@@ -0,0 +1,85 @@
+"""
+Compares per-page OCR latency of the pytesseract (subprocess per call) and
+tesserocr (persistent engine) backends on small synthetic page images. Each page
+goes through recognize(), the text-plus-confidence call the OCR workers make.
+
+    cd backend
+    python -m benchmarks.ocr_backends --pages 50 --width 1200 --height 400
+"""
+import argparse
+import random
+import statistics
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+
+from app.ocr_backends import create_backend
+
+WORDS = (
+    "policy claim insured premium deductible coverage endorsement liability "
+    "carrier effective expiration declaration vehicle property loss adjuster"
+).split()
+
+
+def _font(size: int):
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def synthetic_page(rng: random.Random, width: int, height: int) -> Image.Image:
+    """
+    A white grayscale image with a few lines of insurance-flavoured words.
+    """
+    img = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(img)
+    font = _font(28)
+    y = 20
+    while y < height - 40:
+        line = " ".join(rng.choice(WORDS) for _ in range(6))
+        draw.text((30, y), f"{line} {rng.randint(10000, 99999)}", fill=0, font=font)
+        y += 45
+    return img
+
+
+def bench(name: str, images) -> dict:
+    backend = create_backend(name)
+    backend.recognize(images[0])  # warm-up (engine load for tesserocr)
+    timings = []
+    for img in images:
+        start = time.perf_counter()
+        backend.recognize(img)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    timings.sort()
+    return {
+        "backend": backend.name,
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": timings[len(timings) // 2],
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--width", type=int, default=1200)
+    parser.add_argument("--height", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    images = [synthetic_page(rng, args.width, args.height) for _ in range(args.pages)]
+
+    print(f"{'backend':<12} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for name in ("pytesseract", "tesserocr"):
+        try:
+            r = bench(name, images)
+        except Exception as e:
+            print(f"{name:<12} unavailable: {e}")
+            continue
+        print(f"{r['backend']:<12} {r['mean_ms']:>9.1f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+OCR throughput benchmark: runs perform_ocr against a synthetic corpus served from a
+local S3 stand-in and reports pages/sec, p50/p95 latency per page and peak RSS for
+each document type. Results are written as JSON so runs can be compared.
+
+Each document type runs in a fresh process, so peak RSS (the process plus its OCR
+pool workers) is attributable to that type. The OCR result cache is disabled.
+
+    cd backend
+    python -m benchmarks.ocr_throughput --corpus ./bench_corpus --output after.json \
+        --compare before.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import time
+from typing import Dict, List
+
+from benchmarks import corpus
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _run_doc_type(corpus_dir: str, keys: List[str], results) -> None:
+    """
+    Child-process entry point: OCR every document of one type and report stats.
+    """
+    from app import ocr_worker
+    from benchmarks.local_s3 import LocalS3
+
+    ocr_worker.s3_client = LocalS3(corpus_dir)
+
+    page_ms: List[float] = []
+    pages = 0
+    start = time.perf_counter()
+    for key in keys:
+        t0 = time.perf_counter()
+        _, meta = ocr_worker.perform_ocr_with_metadata(key)
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+        n = max(len(meta.get("pages", [])), 1)
+        page_ms.extend([elapsed_ms / n] * n)
+        pages += n
+    total = time.perf_counter() - start
+
+    # Reap pool workers so their peak RSS shows up in RUSAGE_CHILDREN
+    if ocr_worker._ocr_pool is not None:
+        ocr_worker._ocr_pool.shutdown(wait=True)
+
+    page_ms.sort()
+    # ru_maxrss is KiB on Linux
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    child_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024.0
+    results.put({
+        "documents": len(keys),
+        "pages": pages,
+        "seconds": round(total, 3),
+        "pages_per_sec": round(pages / total, 3) if total else 0.0,
+        "p50_page_ms": round(_percentile(page_ms, 50), 1),
+        "p95_page_ms": round(_percentile(page_ms, 95), 1),
+        "peak_rss_mb": round(self_rss, 1),
+        "peak_pool_worker_rss_mb": round(child_rss, 1),
+    })
+
+
+def run(corpus_dir: str, manifest: Dict[str, List[str]]) -> Dict[str, dict]:
+    ctx = multiprocessing.get_context("spawn")
+    out: Dict[str, dict] = {}
+    for doc_type, keys in manifest.items():
+        results = ctx.Queue()
+        proc = ctx.Process(target=_run_doc_type, args=(corpus_dir, keys, results))
+        proc.start()
+        out[doc_type] = results.get()
+        proc.join()
+    return out
+
+
+def _print_report(results: Dict[str, dict], baseline: Dict[str, dict]) -> None:
+    print(f"{'doc type':<16} {'pages':>6} {'pages/s':>9} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'RSS MB':>8} {'pool MB':>8} {'Δ pages/s':>10}")
+    for doc_type, r in results.items():
+        delta = ""
+        old = baseline.get(doc_type)
+        if old and old.get("pages_per_sec"):
+            delta = f"{(r['pages_per_sec'] / old['pages_per_sec'] - 1) * 100:+.1f}%"
+        print(f"{doc_type:<16} {r['pages']:>6} {r['pages_per_sec']:>9.2f} "
+              f"{r['p50_page_ms']:>9.1f} {r['p95_page_ms']:>9.1f} "
+              f"{r['peak_rss_mb']:>8.1f} {r['peak_pool_worker_rss_mb']:>8.1f} {delta:>10}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default="./bench_corpus", help="corpus directory")
+    parser.add_argument("--docs-per-type", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--types", default=",".join(corpus.DOC_TYPES))
+    parser.add_argument("--output", default="ocr_benchmark.json")
+    parser.add_argument("--compare", help="earlier JSON result to diff against")
+    args = parser.parse_args()
+
+    # Children inherit this environment; no database or real bucket is touched
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("AWS_S3_BUCKET", "benchmark")
+    os.environ["OCR_CACHE_ENABLED"] = "false"
+
+    manifest = corpus.generate(args.corpus, args.docs_per_type, args.seed)
+    wanted = args.types.split(",")
+    manifest = {t: keys for t, keys in manifest.items() if t in wanted}
+
+    results = run(args.corpus, manifest)
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "host": {"python": platform.python_version(), "cpus": os.cpu_count()},
+        "corpus": {"docs_per_type": args.docs_per_type, "seed": args.seed},
+        "ocr_settings": {
+            k: os.environ[k] for k in sorted(os.environ) if k.startswith("OCR_")
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f).get("results", {})
+    _print_report(results, baseline)
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
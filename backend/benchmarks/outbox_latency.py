@@ -0,0 +1,77 @@
+"""
+Enqueue-to-publish latency of the outbox publisher: inserts outbox rows one at a time
+(each in its own transaction, like the ingestion paths) for a throwaway routing key and
+measures sent_at - created_at once the running publisher has sent them.
+
+Run against the services in .env with app.outbox_publisher running. Messages go to a
+routing key with no bound queue, so RabbitMQ drops them.
+
+    cd backend
+    python -m benchmarks.outbox_latency --messages 200 --interval 0.05
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import text
+
+from app.database import SessionLocal
+from app.models import MessageOutbox
+
+ROUTING_KEY = "benchmark.outbox_latency"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between inserts")
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    ids = []
+    try:
+        for i in range(args.messages):
+            row = MessageOutbox(exchange="", routing_key=ROUTING_KEY, payload={"n": i})
+            db.add(row)
+            db.commit()
+            ids.append(row.id)
+            time.sleep(args.interval)
+
+        deadline = time.monotonic() + args.timeout
+        while time.monotonic() < deadline:
+            pending = db.execute(
+                text("SELECT COUNT(*) FROM message_outbox WHERE id = ANY(:ids) AND sent_at IS NULL"),
+                {"ids": ids},
+            ).scalar()
+            if not pending:
+                break
+            time.sleep(0.2)
+
+        latencies = [
+            r[0] * 1000.0
+            for r in db.execute(
+                text(
+                    "SELECT EXTRACT(EPOCH FROM (sent_at - created_at)) FROM message_outbox "
+                    "WHERE id = ANY(:ids) AND sent_at IS NOT NULL"
+                ),
+                {"ids": ids},
+            )
+        ]
+        db.execute(text("DELETE FROM message_outbox WHERE id = ANY(:ids)"), {"ids": ids})
+        db.commit()
+    finally:
+        db.close()
+
+    if not latencies:
+        print("No messages were published; is app.outbox_publisher running?")
+        return
+    latencies.sort()
+    print(f"published {len(latencies)}/{len(ids)}")
+    print(f"p50 {statistics.median(latencies):.1f} ms   "
+          f"p95 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]:.1f} ms   "
+          f"max {latencies[-1]:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
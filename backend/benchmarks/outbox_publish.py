@@ -0,0 +1,68 @@
+"""
+Outbox publisher throughput vs. claim batch size: fills message_outbox with N rows for a
+throwaway routing key, then times publish_pending draining them at each batch size and publisher mode
+(blocking: one confirm round trip per message; pipelined: confirms matched by delivery tag).
+
+Runs against the database and RabbitMQ in .env. Stop app.outbox_publisher first, or it
+will share the backlog (safely, via SKIP LOCKED) and skew the numbers. Messages go to a
+routing key with no bound queue, so RabbitMQ drops them.
+
+    cd backend
+    python -m benchmarks.outbox_publish --messages 5000 --batch-sizes 1,10,100,500 \
+        --modes blocking,pipelined
+"""
+import argparse
+import time
+
+from sqlalchemy import insert, text
+
+from app.database import SessionLocal
+from app.models import MessageOutbox
+from app.config import OUTBOX_CONFIRM_TIMEOUT
+from app.confirm_publisher import BlockingPublisher, ConfirmPublisher
+from app.outbox_publisher import publish_pending
+
+ROUTING_KEY = "benchmark.outbox_publish"
+
+
+def run(publisher, messages: int, batch_size: int) -> float:
+    db = SessionLocal()
+    try:
+        db.execute(
+            insert(MessageOutbox),
+            [{"exchange": "", "routing_key": ROUTING_KEY, "payload": {"n": i}} for i in range(messages)],
+        )
+        db.commit()
+
+        start = time.perf_counter()
+        publish_pending(db, publisher, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+
+        db.execute(text("DELETE FROM message_outbox WHERE routing_key = :rk"), {"rk": ROUTING_KEY})
+        db.commit()
+    finally:
+        db.close()
+    return messages / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--batch-sizes", default="1,10,100,500")
+    parser.add_argument("--modes", default="blocking,pipelined")
+    args = parser.parse_args()
+
+    print(f"{'mode':>10} {'batch size':>10} {'msgs/sec':>10}")
+    for mode in args.modes.split(","):
+        if mode == "blocking":
+            publisher = BlockingPublisher()
+        else:
+            publisher = ConfirmPublisher(confirm_timeout=OUTBOX_CONFIRM_TIMEOUT).start()
+        try:
+            for size in (int(s) for s in args.batch_sizes.split(",")):
+                print(f"{mode:>10} {size:>10} {run(publisher, args.messages, size):>10.0f}")
+        finally:
+            publisher.close()
+
+if __name__ == "__main__":
+    main()
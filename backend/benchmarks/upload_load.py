@@ -0,0 +1,156 @@
+"""
+Concurrent-upload load test against a running API: N clients POST files of a given
+size to /upload while a probe polls a cheap endpoint, so event-loop stalls show up as
+probe latency. Reports uploads/sec, MB/sec, p50/p95 upload latency and probe p50/p95/max.
+
+Every upload creates a real document (and pipeline work) in the target environment.
+
+    cd backend
+    python -m benchmarks.upload_load --url http://localhost:8000 --clients 1,4,16 \
+        --size-mb 20 --uploads 32 --output after.json --compare before.json
+"""
+import argparse
+import http.client
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from urllib.parse import urlparse
+
+SLICE = 64 * 1024
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+def _connection(url: str) -> http.client.HTTPConnection:
+    u = urlparse(url)
+    cls = http.client.HTTPSConnection if u.scheme == "https" else http.client.HTTPConnection
+    return cls(u.hostname, u.port, timeout=600)
+
+
+def upload_once(url: str, payload: bytes, filename: str) -> float:
+    """
+    POST *payload* as a multipart file, streamed in 64 KiB slices; returns seconds.
+    """
+    boundary = uuid.uuid4().hex
+    head = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{boundary}--\r\n".encode()
+    view = memoryview(payload)
+
+    def body():
+        yield head
+        for i in range(0, len(view), SLICE):
+            yield view[i:i + SLICE]
+        yield tail
+
+    conn = _connection(url)
+    start = time.perf_counter()
+    conn.request(
+        "POST", "/upload", body=body(),
+        headers={
+            "Content-Type": f"multipart/form-data; boundary={boundary}",
+            "Content-Length": str(len(head) + len(payload) + len(tail)),
+        },
+    )
+    resp = conn.getresponse()
+    resp.read()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    if resp.status != 200:
+        raise RuntimeError(f"upload failed: HTTP {resp.status}")
+    return elapsed
+
+
+def _probe(url: str, stop: threading.Event, samples: List[float], interval: float) -> None:
+    while not stop.is_set():
+        conn = _connection(url)
+        start = time.perf_counter()
+        try:
+            conn.request("GET", "/ingestion-mode")
+            conn.getresponse().read()
+            samples.append((time.perf_counter() - start) * 1000.0)
+        finally:
+            conn.close()
+        stop.wait(interval)
+
+
+def run(url: str, clients: int, uploads: int, payload: bytes, probe_interval: float) -> dict:
+    probe_ms: List[float] = []
+    stop = threading.Event()
+    prober = threading.Thread(target=_probe, args=(url, stop, probe_ms, probe_interval))
+    prober.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = list(pool.map(
+            lambda i: upload_once(url, payload, f"loadtest_{i}.bin"), range(uploads)
+        ))
+    total = time.perf_counter() - start
+    stop.set()
+    prober.join()
+
+    mb = len(payload) * uploads / (1024 * 1024)
+    return {
+        "clients": clients,
+        "uploads": uploads,
+        "uploads_per_sec": round(uploads / total, 3),
+        "mb_per_sec": round(mb / total, 2),
+        "p50_upload_s": round(_percentile(latencies, 50), 3),
+        "p95_upload_s": round(_percentile(latencies, 95), 3),
+        "probe_p50_ms": round(_percentile(probe_ms, 50), 1),
+        "probe_p95_ms": round(_percentile(probe_ms, 95), 1),
+        "probe_max_ms": round(max(probe_ms, default=0.0), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--clients", default="1,4,16", help="comma-separated concurrency levels")
+    parser.add_argument("--uploads", type=int, default=32, help="uploads per concurrency level")
+    parser.add_argument("--size-mb", type=float, default=20)
+    parser.add_argument("--probe-interval", type=float, default=0.1)
+    parser.add_argument("--output", default="upload_benchmark.json")
+    parser.add_argument("--compare", help="earlier JSON result to diff against")
+    args = parser.parse_args()
+
+    payload = os.urandom(int(args.size_mb * 1024 * 1024))
+    results = [
+        run(args.url, int(c), args.uploads, payload, args.probe_interval)
+        for c in args.clients.split(",")
+    ]
+    with open(args.output, "w") as f:
+        json.dump({"url": args.url, "size_mb": args.size_mb, "results": results}, f, indent=2)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {r["clients"]: r for r in json.load(f)["results"]}
+
+    print(f"{'clients':>7} {'uploads/s':>10} {'MB/s':>8} {'p50 s':>7} {'p95 s':>7} "
+          f"{'probe p95':>10} {'probe max':>10} {'Δ MB/s':>8}")
+    for r in results:
+        delta = ""
+        old = baseline.get(r["clients"])
+        if old and old.get("mb_per_sec"):
+            delta = f"{(r['mb_per_sec'] / old['mb_per_sec'] - 1) * 100:+.1f}%"
+        print(f"{r['clients']:>7} {r['uploads_per_sec']:>10.2f} {r['mb_per_sec']:>8.1f} "
+              f"{r['p50_upload_s']:>7.2f} {r['p95_upload_s']:>7.2f} "
+              f"{r['probe_p95_ms']:>10.1f} {r['probe_max_ms']:>10.1f} {delta:>8}")
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+# backend/tests/conftest.py
+
+import os
+import tempfile
+
+# app.config reads the environment at import time; point it at a throwaway SQLite DB
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="docpipe-tests-"), "test.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_PATH}")
+os.environ.setdefault("AWS_S3_BUCKET", "test-bucket")
+os.environ.setdefault("AWS_REGION", "us-east-1")
+
+import pytest
+
+from app import models
+from app.database import SessionLocal, engine
+
+
+@pytest.fixture
+def db():
+    models.Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        models.Base.metadata.drop_all(engine)
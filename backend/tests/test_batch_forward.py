@@ -0,0 +1,101 @@
+# backend/tests/test_batch_forward.py
+
+from app import ocr_worker
+from app.models import Document1, MessageOutbox
+from app.rabbitmq import CLASSIFY_QUEUE, DOCUMENT_QUEUE, INGEST_BATCH_ROUTING_KEY, lane_queue
+
+
+def _fake_ocr_stage(fail_ids=()):
+    def stage(db, document, msg):
+        if document.id in fail_ids:
+            raise RuntimeError("tesseract crashed")
+        document.extracted_text = f"text of {document.id}"
+        ocr_worker._checkpoint(db, document, "ocr_done")
+        ocr_worker._enqueue_stage(db, CLASSIFY_QUEUE, document.id)
+        db.commit()
+    return stage
+
+
+def _add_docs(db, *stages):
+    docs = [
+        Document1(filename=f"{i}.pdf", s3_key=f"input/{i}.pdf", status="Pending", pipeline_stage=stage)
+        for i, stage in enumerate(stages)
+    ]
+    db.add_all(docs)
+    db.commit()
+    return [d.id for d in docs]
+
+
+def _outbox(db):
+    db.expire_all()
+    return [(r.routing_key, r.payload) for r in db.query(MessageOutbox).order_by(MessageOutbox.id)]
+
+
+def test_forward_is_buffered_with_the_checkpoint(db):
+    (doc_id,) = _add_docs(db, None)
+    db.info["batch_forward"] = outbox_ids = []
+    _fake_ocr_stage()(db, db.get(Document1, doc_id), {"doc_id": doc_id})
+    db.info.pop("batch_forward")
+
+    # Committed together: a crash before the batch finishes leaves the forward buffered
+    assert len(outbox_ids) == 1
+    assert _outbox(db) == [
+        (INGEST_BATCH_ROUTING_KEY, {"doc_id": doc_id, "queue": CLASSIFY_QUEUE}),
+    ]
+    assert db.get(Document1, doc_id).pipeline_stage == "ocr_done"
+
+
+def test_batch_coalesces_forwards_and_requeues_failures_to_their_lane(db):
+    new_id, done_id, bad_id, routed_id = _add_docs(db, None, "ocr_done", None, "routed")
+    db.get(Document1, bad_id).priority_lane = "backfill"
+    db.commit()
+
+    ocr_worker._run_batch(
+        "ocr", _fake_ocr_stage(fail_ids={bad_id}), DOCUMENT_QUEUE, "ocr_done",
+        [new_id, done_id, bad_id, routed_id],
+    )
+
+    assert _outbox(db) == [
+        (CLASSIFY_QUEUE, {"doc_ids": [new_id, done_id]}),
+        # Re-queued on its own, in the lane it was ingested into
+        (lane_queue("backfill"), {"doc_id": bad_id, "lane": "backfill"}),
+    ]
+
+
+def test_failure_before_the_document_loads_is_requeued_to_the_stage_queue(db, monkeypatch):
+    flaky_id, bad_id = _add_docs(db, None, None)
+    db.get(Document1, bad_id).priority_lane = "ui"
+    db.commit()
+    stage_done = ocr_worker._stage_done
+
+    def flaky_stage_done(document, done_stage):
+        if document.id == flaky_id:
+            raise RuntimeError("server closed the connection unexpectedly")
+        return stage_done(document, done_stage)
+
+    monkeypatch.setattr(ocr_worker, "_stage_done", flaky_stage_done)
+    ocr_worker._run_batch(
+        "ocr", _fake_ocr_stage(fail_ids={bad_id}), DOCUMENT_QUEUE, "ocr_done", [flaky_id, bad_id],
+    )
+
+    # Each failure is re-queued once, for its own document
+    assert _outbox(db) == [
+        (DOCUMENT_QUEUE, {"doc_id": flaky_id}),
+        (lane_queue("ui"), {"doc_id": bad_id, "lane": "ui"}),
+    ]
+
+
+def test_documents_are_marked_picked_up_on_their_own_turn(db):
+    first_id, second_id = _add_docs(db, None, None)
+    stage = _fake_ocr_stage()
+    seen = {}
+
+    def recording_stage(session, document, msg):
+        started = dict(session.query(Document1.id, Document1.stage_started_at).all())
+        seen[document.id] = (started[first_id] is not None, started[second_id] is not None)
+        stage(session, document, msg)
+
+    ocr_worker._run_batch("ocr", recording_stage, DOCUMENT_QUEUE, "ocr_done", [first_id, second_id])
+
+    # While the first runs, the second isn't stamped yet (it could sit behind a long batch)
+    assert seen == {first_id: (True, False), second_id: (False, True)}
@@ -0,0 +1,79 @@
+# backend/tests/test_consumer_shutdown.py
+
+import time
+
+from app.consumer import PooledConsumer
+
+
+class _FakeChannel:
+    is_open = True
+
+    def __init__(self, consumer, deliveries):
+        self.consumer = consumer
+        self.deliveries = deliveries
+        self.callbacks = []
+        self.acked = []
+        self.nacked = []
+
+    def confirm_delivery(self):
+        pass
+
+    def queue_declare(self, queue, durable=True, arguments=None):
+        pass
+
+    def basic_qos(self, prefetch_count):
+        pass
+
+    def basic_consume(self, queue, on_message_callback):
+        self.callbacks.append(on_message_callback)
+
+    def start_consuming(self):
+        method = type("Method", (), {})
+        for tag in range(1, self.deliveries + 1):
+            method.delivery_tag = tag
+            self.callbacks[0](self, method, None, b"{}")
+        # SIGTERM arrives while the first delivery is still being handled
+        self.consumer.stop()
+
+    def stop_consuming(self):
+        pass
+
+    def basic_ack(self, delivery_tag):
+        self.acked.append(delivery_tag)
+
+    def basic_nack(self, delivery_tag, requeue):
+        self.nacked.append((delivery_tag, requeue))
+
+
+class _FakeConnection:
+    def __init__(self, channel):
+        self._channel = channel
+        self.pending = []
+        self.is_open = True
+
+    def channel(self):
+        return self._channel
+
+    def add_callback_threadsafe(self, callback):
+        self.pending.append(callback)
+
+    def process_data_events(self, time_limit=0):
+        pending, self.pending = self.pending, []
+        for callback in pending:
+            callback()
+
+    def close(self):
+        self.is_open = False
+
+
+def test_stop_acks_in_flight_and_requeues_buffered_deliveries():
+    consumer = PooledConsumer("test_queue", lambda body: time.sleep(0.2), concurrency=1)
+    channel = _FakeChannel(consumer, deliveries=3)
+    consumer._conn = _FakeConnection(channel)
+
+    consumer._consume()
+
+    assert channel.acked == [1]
+    assert channel.nacked == [(2, True), (3, True)]
+    assert consumer._buffer == []
+    assert not consumer._conn.is_open
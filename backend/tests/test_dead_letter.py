@@ -0,0 +1,84 @@
+# backend/tests/test_dead_letter.py
+
+import contextlib
+import json
+import shutil
+import types
+
+import pytest
+from pdf2image.exceptions import PDFPageCountError
+
+from app import ocr_worker
+from app.consumer import PooledConsumer
+from app.models import Document1
+from app.rabbitmq import DOCUMENT_QUEUE, dead_letter_queue
+
+
+class _FakeConnection:
+    """
+    Captures the settle callback a handler thread hands to the connection thread.
+    """
+
+    def __init__(self):
+        self.callbacks = []
+
+    def add_callback_threadsafe(self, callback):
+        self.callbacks.append(callback)
+
+
+@pytest.fixture
+def corrupt_pdf(tmp_path, monkeypatch):
+    path = tmp_path / "scan.pdf"
+    path.write_bytes(b"%PDF-1.4\n\x00\x17garbage, not a pdf body\n%%EOF")
+
+    @contextlib.contextmanager
+    def fetch(key):
+        yield ocr_worker.SpooledSource(str(path), path.stat().st_size, "0" * 64)
+
+    monkeypatch.setattr(ocr_worker, "fetch_s3_object", fetch)
+    monkeypatch.setattr(ocr_worker.ocr_cache, "lookup", lambda digest: None)
+    if shutil.which("pdfinfo") is None:
+        # Without poppler, fail the way pdfinfo does on a damaged file
+        def pdfinfo(pdf_path):
+            raise PDFPageCountError("Unable to get page count.\nSyntax Error: Couldn't find trailer dictionary")
+
+        monkeypatch.setattr(ocr_worker, "pdfinfo_from_path", pdfinfo)
+    return path
+
+
+def test_corrupt_pdf_raises_instead_of_returning_empty_text(corrupt_pdf):
+    with pytest.raises(PDFPageCountError):
+        ocr_worker.ocr_from_pdf_path(str(corrupt_pdf), raise_errors=True)
+    assert ocr_worker.ocr_from_pdf_path(str(corrupt_pdf))[0] == ""
+
+
+def test_undecodable_image_raises_unreadable_source():
+    with pytest.raises(ocr_worker.UnreadableSourceError):
+        ocr_worker.ocr_from_image_buffer(b"\xff\xd8 not really a jpeg", raise_errors=True)
+
+
+def test_corrupt_pdf_is_dead_lettered(db, corrupt_pdf):
+    doc = Document1(filename="scan.pdf", s3_key="input/scan.pdf", status="Pending")
+    db.add(doc)
+    db.commit()
+
+    consumer = PooledConsumer(
+        DOCUMENT_QUEUE, ocr_worker.process_ocr_stage,
+        on_dead_letter=ocr_worker.mark_dead_lettered,
+    )
+    consumer._conn = _FakeConnection()
+    body = json.dumps({"doc_id": doc.id, "s3_key": doc.s3_key}).encode()
+    consumer._work(1, DOCUMENT_QUEUE, types.SimpleNamespace(headers={}), body)
+
+    # First attempt, yet routed straight to the dead-letter queue
+    (settle,) = consumer._conn.callbacks
+    delivery_tag, ok, _, _, queue, target, error = settle.args
+    assert (delivery_tag, ok, queue) == (1, False, DOCUMENT_QUEUE)
+    assert target == dead_letter_queue(DOCUMENT_QUEUE)
+    assert "PermanentError" in error
+
+    db.expire_all()
+    doc = db.get(Document1, doc.id)
+    assert doc.status == "Failed"
+    assert doc.error_message.startswith("Dead-lettered")
+    assert doc.pipeline_stage is None
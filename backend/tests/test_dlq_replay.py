@@ -0,0 +1,70 @@
+# backend/tests/test_dlq_replay.py
+
+import collections
+import contextlib
+import types
+
+from app.api.v1 import dead_letters
+from app.rabbitmq import DOCUMENT_QUEUE, dead_letter_queue
+
+
+class _BouncingChannel:
+    """
+    A DLQ whose replayed messages fail permanently again: every publish to the work
+    queue lands straight back in the DLQ.
+    """
+
+    def __init__(self, depth):
+        self.dlq = collections.deque(f"msg-{i}".encode() for i in range(depth))
+        self.next_tag = 0
+        self.published = 0
+
+    def queue_declare(self, queue, passive=False):
+        assert queue == dead_letter_queue(DOCUMENT_QUEUE)
+        return types.SimpleNamespace(method=types.SimpleNamespace(message_count=len(self.dlq)))
+
+    def basic_get(self, queue, auto_ack=False):
+        if not self.dlq:
+            return None, None, None
+        self.next_tag += 1
+        body = self.dlq.popleft()
+        return types.SimpleNamespace(delivery_tag=self.next_tag), types.SimpleNamespace(
+            headers={}, content_type="application/json"), body
+
+    def basic_publish(self, exchange, routing_key, body, properties):
+        self.published += 1
+        self.dlq.append(body)
+
+    def basic_ack(self, delivery_tag):
+        pass
+
+
+class _Channels:
+    def __init__(self, channel):
+        self._channel = channel
+
+    def declare(self, queue_name):
+        pass
+
+    @contextlib.contextmanager
+    def locked_channel(self):
+        yield self._channel
+
+
+def _replay(monkeypatch, depth, limit):
+    channel = _BouncingChannel(depth)
+    monkeypatch.setattr(dead_letters, "_channels", _Channels(channel))
+    result = dead_letters.replay_dead_letters(DOCUMENT_QUEUE, dead_letters.ReplayRequest(limit=limit))
+    return result.replayed, channel.published
+
+
+def test_replay_all_stops_at_the_starting_depth(monkeypatch):
+    assert _replay(monkeypatch, depth=3, limit=None) == (3, 3)
+
+
+def test_replay_limit_below_depth(monkeypatch):
+    assert _replay(monkeypatch, depth=3, limit=2) == (2, 2)
+
+
+def test_replay_limit_above_depth(monkeypatch):
+    assert _replay(monkeypatch, depth=2, limit=10) == (2, 2)
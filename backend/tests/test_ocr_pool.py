@@ -0,0 +1,50 @@
+# backend/tests/test_ocr_pool.py
+
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app import ocr_worker
+
+
+class _BrokenPool:
+    def __init__(self):
+        self.shut_down = False
+
+    def map(self, fn, *iterables):
+        raise BrokenProcessPool("A child process terminated abruptly")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def test_broken_pool_is_replaced_and_the_failure_surfaces(tmp_path, monkeypatch):
+    path = tmp_path / "fax.tif"
+    Image.fromarray(np.full((8, 8), 255, dtype=np.uint8)).save(path)
+    broken = _BrokenPool()
+    monkeypatch.setattr(ocr_worker, "_ocr_pool", broken)
+
+    # Not swallowed into empty text, even without raise_errors
+    with pytest.raises(BrokenProcessPool):
+        ocr_worker.ocr_from_tiff_path(str(path))
+    assert broken.shut_down
+    assert ocr_worker._ocr_pool is None
+
+
+def test_inline_ocr_never_starts_the_pool(tmp_path, monkeypatch):
+    path = tmp_path / "fax.tif"
+    frames = [Image.fromarray(np.full((8, 8), v, dtype=np.uint8)) for v in (40, 80)]
+    frames[0].save(path, save_all=True, append_images=frames[1:])
+
+    def no_pool():
+        raise AssertionError("inline OCR started the process pool")
+
+    monkeypatch.setattr(ocr_worker, "_get_ocr_pool", no_pool)
+    monkeypatch.setattr(
+        ocr_worker, "_adaptive_ocr", lambda gray, retry: (f"level-{int(gray[0, 0])}", 90.0, 1)
+    )
+    text, meta = ocr_worker.ocr_from_tiff_path(str(path), raise_errors=True, inline=True)
+    assert text.startswith("level-40")
+    assert meta["page_count"] == 2
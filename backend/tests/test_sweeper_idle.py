@@ -0,0 +1,56 @@
+# backend/tests/test_sweeper_idle.py
+
+import contextlib
+import types
+
+import pika.exceptions
+
+from app import pipeline_sweeper
+from app.rabbitmq import CLASSIFY_QUEUE, ROUTE_QUEUE, lane_queue
+
+
+class _Channels:
+    """
+    Stands in for the sweeper's ChannelManager; every check reuses one channel.
+    """
+
+    def __init__(self, depths, error=None):
+        self.depths = depths
+        self.error = error
+        self.declared = []
+        self.closed = False
+
+    def declare(self, queue_name):
+        self.declared.append(queue_name)
+
+    def queue_declare(self, queue, passive=False):
+        assert passive
+        if self.error:
+            raise self.error
+        return types.SimpleNamespace(
+            method=types.SimpleNamespace(message_count=self.depths.get(queue, 0))
+        )
+
+    @contextlib.contextmanager
+    def locked_channel(self):
+        yield self
+
+    def close(self):
+        self.closed = True
+
+
+def test_stages_with_empty_queues_are_idle(monkeypatch):
+    channels = _Channels({lane_queue("backfill"): 4, ROUTE_QUEUE: 0, CLASSIFY_QUEUE: 0})
+    monkeypatch.setattr(pipeline_sweeper, "_channels", channels)
+
+    # One backlogged lane keeps every pre-OCR document from looking lost
+    assert pipeline_sweeper.idle_stages() == ["ocr_done", "classified"]
+    assert CLASSIFY_QUEUE in channels.declared
+
+
+def test_unreadable_depths_report_nothing_idle(monkeypatch):
+    channels = _Channels({}, error=pika.exceptions.AMQPConnectionError("gone"))
+    monkeypatch.setattr(pipeline_sweeper, "_channels", channels)
+
+    assert pipeline_sweeper.idle_stages() == []
+    assert channels.closed
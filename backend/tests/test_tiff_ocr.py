@@ -0,0 +1,97 @@
+# backend/tests/test_tiff_ocr.py
+
+import functools
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app import ocr_worker
+
+
+class _InlinePool:
+    """
+    Runs pool tasks in the test process, in submission order.
+    """
+
+    def map(self, fn, *iterables):
+        return map(fn, *iterables)
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def _fake_ocr(gray, load_retry_gray):
+    # Each synthetic frame is a flat fill; "recognize" it by its grey level
+    return f"frame-{int(gray[0, 0])}", 90.0, 1
+
+
+@pytest.fixture
+def fax_tiff(tmp_path, monkeypatch):
+    """
+    Five-frame TIFF whose frame N is filled with grey level N * 10.
+    """
+    path = tmp_path / "fax.tif"
+    frames = [Image.fromarray(np.full((16, 12), n * 10, dtype=np.uint8)) for n in range(1, 6)]
+    frames[0].save(path, save_all=True, append_images=frames[1:], compression="tiff_deflate")
+    monkeypatch.setattr(ocr_worker, "_get_ocr_pool", _InlinePool)
+    monkeypatch.setattr(ocr_worker, "_adaptive_ocr", _fake_ocr)
+    return str(path)
+
+
+def _use_policy(monkeypatch, policy, max_pages=3):
+    monkeypatch.setattr(
+        ocr_worker, "select_pages",
+        functools.partial(ocr_worker.select_pages, policy=policy, max_pages=max_pages),
+    )
+
+
+def test_all_frames_in_frame_order(fax_tiff, monkeypatch):
+    _use_policy(monkeypatch, "all")
+    text, meta = ocr_worker.ocr_from_tiff_path(fax_tiff, raise_errors=True)
+
+    assert meta["page_count"] == 5
+    assert text.split("\n") == ["frame-10", "frame-20", "frame-30", "frame-40", "frame-50"]
+    assert [p["page"] for p in meta["pages"]] == [1, 2, 3, 4, 5]
+    assert meta["passes"] == 5 and meta["mean_confidence"] == 90.0
+
+
+def test_first_n_policy_caps_the_frames(fax_tiff, monkeypatch):
+    _use_policy(monkeypatch, "first_n", max_pages=3)
+    text, meta = ocr_worker.ocr_from_tiff_path(fax_tiff, raise_errors=True)
+
+    assert meta["page_count"] == 5
+    assert text.split("\n") == ["frame-10", "frame-20", "frame-30"]
+
+
+def test_first_last_policy(fax_tiff, monkeypatch):
+    _use_policy(monkeypatch, "first_last")
+    text, meta = ocr_worker.ocr_from_tiff_path(fax_tiff, raise_errors=True)
+
+    assert text.split("\n") == ["frame-10", "frame-50"]
+    assert [p["page"] for p in meta["pages"]] == [1, 5]
+
+
+def test_single_frame_tiff(tmp_path, monkeypatch):
+    path = tmp_path / "page.tif"
+    Image.fromarray(np.full((16, 12), 70, dtype=np.uint8)).save(path)
+    monkeypatch.setattr(ocr_worker, "_get_ocr_pool", _InlinePool)
+    monkeypatch.setattr(ocr_worker, "_adaptive_ocr", _fake_ocr)
+    _use_policy(monkeypatch, "all")
+
+    text, meta = ocr_worker.ocr_from_tiff_path(str(path), raise_errors=True)
+    assert (text, meta["page_count"]) == ("frame-70", 1)
+
+
+@pytest.mark.parametrize("policy, page_count, max_pages, expected", [
+    ("first", 5, 3, [1]),
+    ("first_n", 5, 3, [1, 2, 3]),
+    ("first_n", 2, 3, [1, 2]),
+    ("all", 4, 1, [1, 2, 3, 4]),
+    ("first_last", 5, 3, [1, 5]),
+    ("first_last", 1, 3, [1]),
+    ("bogus", 5, 2, [1, 2]),
+    ("all", 0, 3, []),
+])
+def test_select_pages(policy, page_count, max_pages, expected):
+    assert ocr_worker.select_pages(page_count, policy, max_pages) == expected